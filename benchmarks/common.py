@@ -0,0 +1,45 @@
+"""Shared helpers for the benchmark scripts."""
+import json
+import time
+from typing import Dict, List
+
+from voice_assistant.metrics import summarize  # noqa: F401 (re-exported for the benchmarks)
+
+
+class StageTimer:
+    """Collects wall-clock samples per named stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, stage: str, func):
+        """Return ``func`` instrumented to record each call under ``stage``."""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: summarize(values) for stage, values in self.samples.items()}
+
+
+def print_stages(stages: Dict[str, Dict[str, float]]):
+    print(f"{'stage':<14}{'calls':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in stages.items():
+        if not stats["count"]:
+            continue
+        print(
+            f"{stage:<14}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+            f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}"
+        )
+
+
+def write_json(path: str, report: Dict):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,115 @@
+"""Concurrent reads and writes: default SQLite engine vs. the tuned shared one.
+
+Writer threads stand in for the API and the command handlers adding and
+completing tasks one transaction at a time; reader threads stand in for
+the reminder dispatcher and task listings. Each mode runs on its own fresh
+file prefilled with ``--tasks`` tasks, once with a plain ``create_engine``
+(rollback journal, full fsync) and once with the registry's engine (WAL,
+``synchronous=NORMAL``, mmap, pooled). Reports throughput, latency
+percentiles and failed calls per side.
+
+    python -m benchmarks.db_concurrency --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from benchmarks.common import summarize
+from voice_assistant.db.database import Database
+
+
+def run(db: Database, readers: int, writers: int, seconds: float, users: int, seed: int):
+    stop = threading.Event()
+    samples = {"read": [], "write": []}
+    failures = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    now = datetime(2026, 10, 17, 12, 0)
+
+    def record(kind, started, ok):
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples[kind].append(elapsed)
+            failures[kind] += not ok
+
+    def reader(index):
+        rng = random.Random(seed + index)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                if rng.random() < 0.5:
+                    db.get_due_tasks(now, user_id=rng.randint(1, users), limit=50)
+                else:
+                    db.get_tasks(user_id=rng.randint(1, users), limit=50)
+                record("read", started, True)
+            except Exception:
+                record("read", started, False)
+
+    def writer(index):
+        rng = random.Random(seed + 1000 + index)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                if rng.random() < 0.7:
+                    ok = db.add_task("api write", now + timedelta(minutes=rng.randint(-60, 60)),
+                                     user_id=rng.randint(1, users)) is not None
+                else:
+                    ok = db.complete_tasks([rng.randint(1, 1000)]) >= 0
+                record("write", started, ok)
+            except Exception:
+                record("write", started, False)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {kind: (summarize(values), failures[kind]) for kind, values in samples.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="Writer threads")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per mode")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Tasks to prefill")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    now = datetime(2026, 10, 17, 12, 0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("default", "tuned"):
+            url = f"sqlite:///{os.path.join(tmp, mode + '.db')}"
+            db = Database(url) if mode == "tuned" else Database(url, engine=create_engine(url))
+            per_user = args.tasks // args.users
+            for user in range(1, args.users + 1):
+                db.add_tasks(((f"task {i}", now + timedelta(minutes=rng.randint(-600, 600)))
+                              for i in range(per_user)), user_id=user)
+            results[mode] = run(db, args.readers, args.writers, args.seconds, args.users, args.seed)
+            db.engine.dispose()
+
+    print(f"\n📊 {args.readers} readers + {args.writers} writers for {args.seconds:.0f} s, "
+          f"{args.tasks:,} tasks")
+    print(f"{'engine':<9}{'kind':<7}{'ops/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'failed':>8}")
+    for mode, kinds in results.items():
+        for kind, (stats, failed) in kinds.items():
+            rate = stats.get("count", 0) / args.seconds
+            print(f"{mode:<9}{kind:<7}{rate:>9,.0f}{stats.get('p50_ms', 0):>9.2f}"
+                  f"{stats.get('p99_ms', 0):>9.2f}{stats.get('max_ms', 0):>9.1f}{failed:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Latency and accuracy of the fallback intent classifier on misheard commands.
+
+Trains ``HashedNgramClassifier`` on synthetic command logs labelled by the
+regex rules (chatter hand-labelled ``none``), then scores held-out commands
+with ASR-style errors that no pattern matches anymore: confusable words,
+dropped words and dropped letters. Prediction is timed one utterance at a
+time, pinned to one core where the OS allows it, against a per-utterance
+budget; the exit code is 1 if p99 exceeds it. Also checks that neither
+``torch`` nor ``transformers`` got imported. Needs no model or audio.
+
+    python -m benchmarks.intent_classifier --utterances 20000 --budget-ms 1.0
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import summarize
+from voice_assistant.nlu.classifier import NO_INTENT, HashedNgramClassifier, train, training_examples
+from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+_TASKS = [
+    "buy milk", "call mom", "water the plants", "take my medicine", "stretch", "read a chapter",
+    "pay the electricity bill", "book a dentist appointment", "go for a run", "email the landlord",
+]
+_TEMPLATES = [
+    "add task {task}", "add a task to {task}", "create a task {task}", "remind me to {task}",
+    "show my tasks", "list tasks", "what are my tasks", "what do i need to do", "show my to do list",
+    "remind me to {task} at {hour}pm", "set a reminder to {task} in {n} minutes",
+    "remind me to {task} on friday", "delete task {n}", "remove task {n}", "mark task {n} as done",
+    "complete task {n}", "what can you do", "what commands can i say",
+]
+_CHATTER = [
+    "what's the weather like", "play some music", "thanks buddy", "never mind", "how are you today",
+    "tell me a joke", "i'm going for a walk", "okay", "turn up the volume", "who won the game last night",
+    "what time is it", "good morning", "call me a taxi", "i feel tired", "stop",
+]
+# Words a recognizer commonly mishears in these commands
+_CONFUSIONS = {
+    "add": "at", "task": "tusk", "tasks": "desks", "to": "too", "remind": "remain", "reminder": "remainder",
+    "delete": "the lead", "mark": "mike", "show": "so", "what": "want", "list": "least", "create": "great",
+}
+
+
+def make_logs(count: int, rng: random.Random):
+    records = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            records.append({"text": rng.choice(_CHATTER), "label": NO_INTENT})
+        else:
+            text = rng.choice(_TEMPLATES).format(
+                task=rng.choice(_TASKS), hour=rng.randint(1, 12), n=rng.randint(1, 30))
+            records.append({"text": text})
+    return records
+
+
+def mishear(text: str, rng: random.Random) -> str:
+    words = text.split()
+    kind = rng.random()
+    confusable = [i for i, word in enumerate(words) if word in _CONFUSIONS]
+    if kind < 0.5 and confusable:
+        i = rng.choice(confusable)
+        words[i] = _CONFUSIONS[words[i]]
+    elif kind < 0.75 and len(words) > 2:
+        del words[rng.randrange(len(words))]
+    else:
+        i = rng.randrange(len(words))
+        if len(words[i]) > 3:
+            j = rng.randrange(len(words[i]))
+            words[i] = words[i][:j] + words[i][j + 1:]
+    return " ".join(words)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=20000, help="Synthetic logged utterances")
+    parser.add_argument("--dim", type=int, default=2 ** 16, help="Hash buckets")
+    parser.add_argument("--threshold", type=float, default=0.7, help="Lowest probability accepted")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="p99 prediction budget per utterance")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+
+    rng = random.Random(args.seed)
+    records = make_logs(args.utterances, rng)
+    split = int(len(records) * 0.9)
+    texts, labels = training_examples(records[:split])
+    start = time.perf_counter()
+    model = train(texts, labels, dim=args.dim)
+    train_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "intent_model.npz")
+        model.save(path)
+        size_kb = os.path.getsize(path) / 1024
+        start = time.perf_counter()
+        model = HashedNgramClassifier.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    # Held-out commands, misheard until no pattern matches them
+    rules = IntentRecognizer()
+    test_texts, test_labels = training_examples(records[split:])
+    misheard = []
+    for text, label in zip(test_texts, test_labels):
+        for _ in range(5):
+            noisy = mishear(text, rng)
+            if rules._match_rules(noisy) is None:
+                misheard.append((noisy, label))
+                break
+
+    samples, outcomes = [], {"recovered": 0, "missed": 0, "wrong": 0, "rejected": 0, "false_accept": 0}
+    for text, label in misheard:
+        started = time.perf_counter()
+        predicted, probability = model.predict(text)
+        samples.append(time.perf_counter() - started)
+        if probability < args.threshold:
+            predicted = NO_INTENT
+        if label == NO_INTENT:
+            outcomes["rejected" if predicted == NO_INTENT else "false_accept"] += 1
+        elif predicted == label:
+            outcomes["recovered"] += 1
+        else:
+            outcomes["missed" if predicted == NO_INTENT else "wrong"] += 1
+
+    latency = summarize(samples)
+    commands = len(misheard) - outcomes["rejected"] - outcomes["false_accept"]
+    chatter = outcomes["rejected"] + outcomes["false_accept"]
+    heavy = sorted(name for name in ("torch", "transformers") if name in sys.modules)
+
+    print(f"\n📊 Fallback intent classifier ({len(model.labels)} labels, {model.dim} buckets)")
+    print(f"Trained on:       {len(texts)} utterances in {train_s:.1f} s")
+    print(f"Model file:       {size_kb:.0f} KiB, loads in {load_ms:.1f} ms")
+    print(f"Misheard test:    {commands} commands, {chatter} chatter (no pattern matches any)")
+    print(f"Recovered:        {outcomes['recovered'] / max(commands, 1):.1%} of commands "
+          f"({outcomes['wrong']} wrong intent, {outcomes['missed']} below threshold)")
+    print(f"False accepts:    {outcomes['false_accept'] / max(chatter, 1):.1%} of chatter")
+    print(f"Latency:          p50 {latency['p50_ms'] * 1000:.0f} µs, p99 {latency['p99_ms'] * 1000:.0f} µs")
+    print(f"ML frameworks:    {', '.join(heavy) if heavy else 'none imported'}")
+
+    if heavy or latency["p99_ms"] > args.budget_ms:
+        print(f"\n❌ Over the {args.budget_ms} ms budget or pulled in {heavy}")
+        return 1
+    print(f"\n✅ p99 within the {args.budget_ms} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Intent matching cost as the number of intents grows.
+
+Compares the combined single-pass matcher in ``IntentRecognizer`` with the
+per-pattern loop it replaced (every intent, every regex, in dict order) on
+a corpus of command-like utterances. Synthetic smart-home style intents are
+added to model a growing catalogue. Only matching is timed; time parsing
+for reminders is the same in both. ``differ`` counts distinct utterances
+where priorities pick another intent than dict order did, i.e. reminders
+with a time. Needs no model or audio.
+
+    python -m benchmarks.intent_matcher --intents 0 50 200 500
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from benchmarks.common import summarize
+from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+_ROOMS = "kitchen bedroom office garage hallway patio basement attic".split()
+_TASKS = "buy milk call mom water the plants take medicine stretch read a chapter".split()
+_CHATTER = (
+    "what's the weather like", "play some music", "thanks buddy", "never mind",
+    "how are you today", "tell me a joke", "i'm going for a walk", "okay",
+)
+
+
+def add_synthetic_intents(recognizer: IntentRecognizer, count: int):
+    for i in range(count):
+        recognizer.add_intent(f"device{i}", [
+            rf"(?:turn|switch) (?P<state>on|off) (?:the )?device{i}(?: in the (?P<room>\w+))?",
+            rf"set device{i} to (?P<level>\d+)(?: percent)?",
+        ])
+
+
+def make_corpus(count: int, intents: int, rng: random.Random):
+    utterances = []
+    for _ in range(count):
+        kind = rng.random()
+        task = " ".join(rng.sample(_TASKS, 2))
+        if kind < 0.2:
+            utterances.append(f"remind me to {task} at {rng.randint(1, 12)}pm")
+        elif kind < 0.35:
+            utterances.append(f"add task {task}")
+        elif kind < 0.45:
+            utterances.append(rng.choice(["show my tasks", "what do i need to do", "list tasks"]))
+        elif kind < 0.55:
+            utterances.append(f"mark task {rng.randint(1, 20)} as done")
+        elif kind < 0.75 and intents:
+            utterances.append(f"turn on device{rng.randrange(intents)} in the {rng.choice(_ROOMS)}")
+        else:
+            utterances.append(rng.choice(_CHATTER))
+    return utterances
+
+
+def legacy_matcher(recognizer: IntentRecognizer):
+    """The per-pattern loop previously inlined in ``IntentRecognizer.recognize``."""
+    compiled = {
+        intent: [re.compile(p, re.IGNORECASE) for p in patterns]
+        for intent, patterns in recognizer.intent_patterns.items()
+    }
+
+    def match(text):
+        for intent_name, patterns in compiled.items():
+            for pattern in patterns:
+                found = pattern.match(text)
+                if found:
+                    return intent_name, found
+        return None
+    return match
+
+
+def time_per_call(match, utterances, rounds: int = 5):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in utterances:
+            match(text)
+        samples.append((time.perf_counter() - start) / len(utterances))
+    return summarize(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intents", type=int, nargs="+", default=[0, 50, 200, 500],
+                        help="Synthetic intents to add on top of the built-in ones")
+    parser.add_argument("--utterances", type=int, default=5000, help="Utterances per round")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print("\n📊 Intent matching, µs per utterance")
+    print(f"{'intents':>8}{'patterns':>10}{'build ms':>10}{'legacy':>10}{'combined':>10}{'speedup':>9}{'differ':>8}")
+    for count in args.intents:
+        rng = random.Random(args.seed)
+        utterances = make_corpus(args.utterances, count, rng)
+        recognizer = IntentRecognizer()
+        start = time.perf_counter()
+        add_synthetic_intents(recognizer, count)
+        recognizer.matcher  # compile
+        build_ms = (time.perf_counter() - start) * 1000
+        patterns = sum(len(p) for p in recognizer.intent_patterns.values())
+
+        legacy = legacy_matcher(recognizer)
+        combined = recognizer.matcher.match
+        # Utterances where priorities pick a different intent than dict order did
+        differ = 0
+        for text in set(utterances):
+            before, after = legacy(text), recognizer.recognize(text)
+            differ += (before[0] if before else None) != (after.name if after else None)
+
+        legacy_time = time_per_call(legacy, utterances)
+        combined_time = time_per_call(combined, utterances)
+        print(f"{len(recognizer.intent_patterns):>8}{patterns:>10}{build_ms:>10.1f}"
+              f"{legacy_time['p50_ms'] * 1000:>10.2f}{combined_time['p50_ms'] * 1000:>10.2f}"
+              f"{legacy_time['p50_ms'] / combined_time['p50_ms']:>8.1f}x{differ:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
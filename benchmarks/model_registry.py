@@ -0,0 +1,91 @@
+"""Startup time and memory of the shared Vosk model registry.
+
+Reports the cold load of a model, the cost of later lookups and recognizer
+creation, and how much memory forked workers share with the parent.
+
+    python -m benchmarks.model_registry --model ~/.cache/vosk/vosk-model-en-us-0.22 --workers 4
+    python -m benchmarks.model_registry --model ... --legacy 3
+
+``--legacy N`` also loads the model N more times without the registry, which
+is what starting the assistant used to do.
+"""
+import argparse
+import os
+import sys
+import time
+
+from voice_assistant.asr.models import current_rss_mb, process_pool, registry
+
+
+def _private_mb() -> float:
+    """Memory only this process maps (not shared with the parent), in MB."""
+    private_kb = 0
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    private_kb += int(line.split()[1])
+    except OSError:
+        return float("nan")
+    return private_kb / 1024
+
+
+def _worker_report(model_path: str) -> dict:
+    start = time.perf_counter()
+    registry.new_recognizer(model_path)
+    return {
+        "pid": os.getpid(),
+        "recognizer_ms": (time.perf_counter() - start) * 1000,
+        "rss_mb": current_rss_mb(),
+        "private_mb": _private_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", required=True, help="Vosk model path")
+    parser.add_argument("--workers", type=int, default=0, help="Forked workers to start")
+    parser.add_argument("--legacy", type=int, default=0, help="Extra unshared loads for comparison")
+    args = parser.parse_args(argv)
+
+    base_rss = current_rss_mb()
+    start = time.perf_counter()
+    registry.get_model(args.model)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        registry.get_model(args.model)
+    lookup_us = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    recognizers = [registry.new_recognizer(args.model) for _ in range(20)]
+    recognizer_ms = (time.perf_counter() - start) / len(recognizers) * 1000
+
+    print("\n📊 Model registry")
+    print(f"Cold load:        {cold:.2f} s, +{current_rss_mb() - base_rss:.0f} MB RSS")
+    print(f"Cached lookup:    {lookup_us:.3f} µs")
+    print(f"New recognizer:   {recognizer_ms:.2f} ms")
+
+    if args.legacy:
+        from vosk import Model
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        copies = [Model(args.model) for _ in range(args.legacy)]
+        print(f"Legacy +{len(copies)} loads: {time.perf_counter() - start:.2f} s, "
+              f"+{current_rss_mb() - rss_before:.0f} MB RSS")
+        del copies
+
+    if args.workers:
+        with process_pool([args.model], max_workers=args.workers) as pool:
+            reports = list(pool.map(_worker_report, [args.model] * args.workers))
+        print(f"\n{'worker':<10}{'recognizer ms':>15}{'RSS MB':>10}{'private MB':>12}")
+        for report in reports:
+            print(f"{report['pid']:<10}{report['recognizer_ms']:>15.2f}"
+                  f"{report['rss_mb']:>10.0f}{report['private_mb']:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
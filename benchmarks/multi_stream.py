@@ -0,0 +1,66 @@
+"""Throughput and per-stream latency of the multi-stream wake word engine.
+
+Replays the same recording as N independent streams through
+``WakeWordEngine`` and reports, per stream, the worker it was pinned to,
+frames processed and chunk latency (dispatch to result), plus the aggregate
+real-time factor. With ``--realtime`` the streams are paced like live
+capture, which shows latency under a sustained load rather than throughput.
+
+    python -m benchmarks.multi_stream --model ~/.cache/vosk/vosk-model-small-en-us-0.15 --streams 16
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.engine import WakeWordEngine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", default="test_recording.wav", help="16 kHz mono 16-bit WAV to replay")
+    parser.add_argument("--model", help="Vosk model path (defaults to the downloaded spotting model)")
+    parser.add_argument("--streams", type=int, default=8, help="Concurrent streams")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--repeat", type=int, default=5, help="Times to loop the recording per stream")
+    parser.add_argument("--realtime", action="store_true", help="Pace streams like live capture")
+    parser.add_argument("--full-vocabulary", action="store_true", help="Disable grammar spotting")
+    args = parser.parse_args(argv)
+
+    audio, sample_rate = load_wav(args.wav)
+    audio = np.tile(audio, args.repeat)
+
+    engine = WakeWordEngine(
+        sample_rate=sample_rate,
+        model_path=args.model,
+        workers=args.workers,
+        use_grammar=not args.full_vocabulary
+    )
+    with engine:
+        start = time.perf_counter()
+        for index in range(args.streams):
+            engine.add_stream(f"stream{index}", ArraySource(audio, sample_rate, realtime=args.realtime))
+        engine.wait()
+        wall = time.perf_counter() - start
+        stats = engine.stats()
+
+    audio_s = sum(stream["audio_s"] for stream in stats.values())
+    print(f"\n📊 {args.streams} streams on {engine.num_workers} workers")
+    print(f"Audio:         {audio_s:.1f} s total")
+    print(f"Wall time:     {wall:.2f} s")
+    print(f"Real-time x:   {wall / audio_s:.4f} aggregate\n")
+    print(f"{'stream':<10}{'worker':>7}{'frames':>8}{'dropped':>9}{'wakes':>7}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for stream_id, stream in stats.items():
+        latency = stream["latency"]
+        print(f"{stream_id:<10}{stream['worker']:>7}{stream['frames']:>8}{stream['dropped']:>9}"
+              f"{len(stream['detections']):>7}{latency.get('p50_ms', 0):>9.2f}"
+              f"{latency.get('p95_ms', 0):>9.2f}{latency.get('p99_ms', 0):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Task storage at scale: bulk writes and the indexed due-reminder query.
+
+Fills a fresh SQLite file with ``--tasks`` tasks spread over ``--users``
+users, most with a reminder within a week either side of now, and times:
+single-row vs. batched inserts, bulk completion, due-reminder queries per
+user (the reminder checker's poll) and bulk trigger marking. Prints the
+query plan of the due query, and with ``--compare-unindexed`` reruns the
+queries with the task indexes dropped.
+
+    python -m benchmarks.task_store --tasks 1000000 --compare-unindexed
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from benchmarks.common import summarize
+from voice_assistant.db.database import Database
+
+
+def time_due_queries(db: Database, users: int, queries: int, now: datetime, rng: random.Random):
+    samples, rows = [], 0
+    for _ in range(queries):
+        user = rng.randint(1, users)
+        started = time.perf_counter()
+        rows += len(db.get_due_tasks(now, user_id=user, limit=100))
+        samples.append(time.perf_counter() - started)
+    return summarize(samples), rows / queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks to store")
+    parser.add_argument("--users", type=int, default=1000, help="Users the tasks belong to")
+    parser.add_argument("--batch", type=int, default=10_000, help="Tasks per bulk call")
+    parser.add_argument("--single", type=int, default=2000, help="Tasks added one call each, for comparison")
+    parser.add_argument("--queries", type=int, default=2000, help="Due-reminder queries to time")
+    parser.add_argument("--compare-unindexed", action="store_true", help="Rerun the due queries without the index")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    now = datetime(2026, 10, 17, 12, 0)
+    week = 7 * 24 * 3600
+
+    def reminder():
+        return now + timedelta(seconds=rng.uniform(-week, week)) if rng.random() < 0.6 else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(f"sqlite:///{os.path.join(tmp, 'tasks.db')}")
+
+        started = time.perf_counter()
+        for i in range(args.single):
+            db.add_task(f"single {i}", reminder(), user_id=rng.randint(1, args.users))
+        single_rate = args.single / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        ids = []
+        per_user = args.tasks // args.users
+        for user in range(1, args.users + 1):
+            for start in range(0, per_user, args.batch):
+                count = min(args.batch, per_user - start)
+                ids += db.add_tasks(((f"task {start + i}", reminder()) for i in range(count)), user_id=user)
+        add_s = time.perf_counter() - started
+
+        completed = rng.sample(ids, len(ids) // 5)
+        started = time.perf_counter()
+        for start in range(0, len(completed), args.batch):
+            db.complete_tasks(completed[start:start + args.batch])
+        complete_s = time.perf_counter() - started
+
+        indexed, due_rows = time_due_queries(db, args.users, args.queries, now, rng)
+
+        due = [task["id"] for user in range(1, 11) for task in db.get_due_tasks(now, user_id=user)]
+        started = time.perf_counter()
+        triggered = db.mark_reminders_triggered(due)
+        trigger_s = time.perf_counter() - started
+
+        with db.engine.connect() as connection:
+            plan = connection.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE user_id = 1 AND is_completed = 0 "
+                "AND reminder_triggered = 0 AND reminder_time <= '2026-10-17' ORDER BY reminder_time"
+            )).fetchall()
+
+        print(f"\n📊 Task store, {len(ids) + args.single:,} tasks over {args.users} users")
+        print(f"Single-row adds:  {single_rate:>12,.0f} tasks/s (one transaction each)")
+        print(f"Bulk adds:        {len(ids) / add_s:>12,.0f} tasks/s ({args.batch} per transaction)")
+        print(f"Bulk completes:   {len(completed) / complete_s:>12,.0f} tasks/s")
+        print(f"Bulk triggers:    {triggered / trigger_s if trigger_s else 0:>12,.0f} tasks/s ({triggered} reminders)")
+        print(f"Due query:        p50 {indexed['p50_ms']:.3f} ms, p99 {indexed['p99_ms']:.3f} ms "
+              f"({due_rows:.0f} rows avg, limit 100)")
+        print(f"Query plan:       {plan[0][-1]}")
+
+        if args.compare_unindexed:
+            with db.engine.begin() as connection:
+                connection.execute(text("DROP INDEX ix_tasks_user_due"))
+                connection.execute(text("DROP INDEX ix_tasks_user_completed"))
+            unindexed, _ = time_due_queries(db, args.users, max(args.queries // 20, 10), now, rng)
+            print(f"Without index:    p50 {unindexed['p50_ms']:.3f} ms, p99 {unindexed['p99_ms']:.3f} ms "
+                  f"({unindexed['p50_ms'] / indexed['p50_ms']:.0f}x slower)")
+        db.engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
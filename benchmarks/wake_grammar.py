@@ -0,0 +1,88 @@
+"""CPU cost of grammar-constrained wake spotting versus full-vocabulary decoding.
+
+Cuts a recording into voiced bursts with the detector, then feeds the same
+bursts to a full-vocabulary recognizer (the previous behaviour) and to a
+grammar-constrained one, measuring CPU time per burst and the detections each
+produces.
+
+    python -m benchmarks.wake_grammar --wav test_recording.wav --repeat 5
+
+Models default to the ones the recognizer downloads into ~/.cache/vosk.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import print_stages, summarize
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.detector import WakeWordDetector
+from voice_assistant.wake_word.recognizer import WakeWordRecognizer
+
+
+def collect_bursts(audio: np.ndarray, sample_rate: int) -> list:
+    """Voiced bursts exactly as the detector hands them to the recognizer."""
+    detector = WakeWordDetector(sample_rate=sample_rate)
+    detector.debug = False
+    bursts = []
+    detector.start_listening(callback=bursts.append, source=ArraySource(audio, sample_rate))
+    return bursts
+
+
+def measure(recognizer: WakeWordRecognizer, bursts: list) -> dict:
+    cpu = []
+    detections = 0
+    for burst in bursts:
+        start = time.process_time()
+        detections += recognizer.accept_waveform(burst)
+        recognizer.reset()
+        cpu.append(time.process_time() - start)
+    return {"cpu": summarize(cpu), "detections": detections}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", default="test_recording.wav", help="16 kHz mono 16-bit WAV to replay")
+    parser.add_argument("--repeat", type=int, default=3, help="Times to loop the recording")
+    parser.add_argument("--full-model", help="Full-vocabulary Vosk model path")
+    parser.add_argument("--grammar-model", help="Vosk model with runtime grammar support")
+    parser.add_argument("--wake-phrase", action="append", dest="wake_phrases",
+                        help="Wake phrase to spot (repeatable)")
+    args = parser.parse_args(argv)
+
+    audio, sample_rate = load_wav(args.wav)
+    bursts = collect_bursts(np.tile(audio, args.repeat), sample_rate)
+    wake_phrases = args.wake_phrases or ["hey buddy", "hey balance buddy", "okay buddy"]
+
+    results = {}
+    for mode, model_path, use_grammar in (
+        ("full", args.full_model, False),
+        ("grammar", args.grammar_model, True),
+    ):
+        recognizer = WakeWordRecognizer(
+            wake_phrases=wake_phrases,
+            model_path=model_path,
+            sample_rate=sample_rate,
+            use_grammar=use_grammar
+        )
+        if use_grammar and not recognizer.use_grammar:
+            print("❌ The grammar model does not support runtime grammars")
+            return 1
+        results[mode] = measure(recognizer, bursts)
+
+    print(f"\n📊 Wake spotting CPU per burst ({len(bursts)} bursts)")
+    print_stages({mode: result["cpu"] for mode, result in results.items()})
+    for mode, result in results.items():
+        print(f"{mode:<14}{result['detections']:>8} detections")
+
+    full_cpu = results["full"]["cpu"].get("total_s", 0)
+    grammar_cpu = results["grammar"]["cpu"].get("total_s", 0)
+    if full_cpu:
+        print(f"\nCPU saved by grammar mode: {(1 - grammar_cpu / full_cpu) * 100:.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Wake phrase matching cost as the number of configured phrases grows.
+
+Compares the compiled token-trie matcher with the linear scan it replaced
+(exact check, then ``variant in text`` over every variant, then per-phrase
+word set intersections) on synthetic multi-tenant phrase lists. Needs no
+model or audio.
+
+    python -m benchmarks.wake_matcher --phrases 1 10 100 500
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.common import summarize
+from voice_assistant.wake_word.matcher import WakePhraseMatcher, expand_wake_phrases
+
+_WORDS = (
+    "hey hi hello ok okay buddy balance coach helper nova echo luna atlas "
+    "remind add task plan meeting tomorrow today please set morning evening "
+    "call mom water drink walk study read the a to for my at"
+).split()
+
+
+def legacy_match(text, primary_phrases, wake_phrases, allow_close=True):
+    """The substring scan previously inlined in ``WakeWordRecognizer``."""
+    for phrase in primary_phrases:
+        if phrase == text:
+            return True
+    for phrase in wake_phrases:
+        if phrase in text:
+            return True
+    if not allow_close:
+        return False
+    text_words = set(text.split())
+    for phrase in primary_phrases:
+        phrase_words = set(phrase.split())
+        if len(text_words & phrase_words) >= max(len(phrase_words) - 1, 1):
+            return True
+    return False
+
+
+def make_phrases(count: int, rng: random.Random):
+    names = [f"{rng.choice(_WORDS[:6])} {rng.choice(_WORDS[6:12])}{i}" for i in range(count)]
+    return ["hey buddy"] + names[:max(0, count - 1)]
+
+
+def make_transcripts(count: int, rng: random.Random, length: int = 8):
+    # Mostly non-wake chatter, which is what the matcher sees all day
+    return [" ".join(rng.choice(_WORDS[12:]) for _ in range(length)) for _ in range(count)]
+
+
+def time_per_call(match, transcripts, rounds: int = 5):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in transcripts:
+            match(text)
+        samples.append((time.perf_counter() - start) / len(transcripts))
+    return summarize(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phrases", type=int, nargs="+", default=[1, 10, 100, 500],
+                        help="Phrase list sizes to measure")
+    parser.add_argument("--transcripts", type=int, default=2000, help="Transcripts per round")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    transcripts = make_transcripts(args.transcripts, rng)
+
+    print("\n📊 Wake phrase matching, µs per transcript")
+    print(f"{'phrases':>8}{'variants':>10}{'build ms':>10}{'legacy':>10}{'trie':>10}{'speedup':>9}")
+    for count in args.phrases:
+        phrases = make_phrases(count, rng)
+        start = time.perf_counter()
+        variants = expand_wake_phrases(phrases)
+        matcher = WakePhraseMatcher(phrases, variants)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy = time_per_call(lambda t: legacy_match(t, phrases, variants), transcripts)
+        trie = time_per_call(matcher.match, transcripts)
+        print(f"{count:>8}{len(variants):>10}{build_ms:>10.2f}"
+              f"{legacy['p50_ms'] * 1000:>10.2f}{trie['p50_ms'] * 1000:>10.2f}"
+              f"{legacy['p50_ms'] / trie['p50_ms']:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
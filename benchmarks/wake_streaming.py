@@ -0,0 +1,94 @@
+"""Wake detection latency of streaming decoding versus burst decoding.
+
+Replays a recording through ``WakeWordProcessor`` twice: once in burst mode
+(each voiced burst decoded from a cold recognizer) and once in streaming mode
+(frames fed into one recognizer per utterance, partial results checked as
+they arrive). For every wake detection it records the stream position at
+which it fired, then pairs detections across the modes to report how much
+earlier streaming fires.
+
+    python -m benchmarks.wake_streaming --wav recording_with_wake_words.wav
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.processor import WakeWordProcessor
+
+
+def run_mode(audio: np.ndarray, sample_rate: int, streaming: bool, args) -> dict:
+    processor = WakeWordProcessor(
+        wake_phrases=args.wake_phrases or ["hey buddy"],
+        sample_rate=sample_rate,
+        model_path=args.model,
+        source=ArraySource(audio, sample_rate),
+        use_grammar=not args.full_vocabulary,
+        streaming=streaming
+    )
+    processor.detector.debug = False
+    # Wall-clock cooldowns would hide detections when replaying faster than real time
+    processor.detection_cooldown = 0
+    frame_seconds = processor.detector.frame_duration / 1000
+    offsets = []
+    processor.callback = lambda audio_data: offsets.append(
+        processor.detector.frames_processed * frame_seconds
+    )
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    processor._run_detection()
+    return {
+        "offsets": offsets,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+    }
+
+
+def pair_leads(burst_offsets, stream_offsets, window: float = 2.0):
+    """How much earlier streaming fired for each burst-mode detection (negative if later)."""
+    leads = []
+    for burst_offset in burst_offsets:
+        nearby = [o for o in stream_offsets if burst_offset - window <= o <= burst_offset + window]
+        if nearby:
+            leads.append(burst_offset - min(nearby, key=lambda o: abs(burst_offset - o)))
+    return leads
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", default="test_recording.wav", help="16 kHz mono 16-bit WAV to replay")
+    parser.add_argument("--model", help="Vosk model path (defaults to the downloaded spotting model)")
+    parser.add_argument("--full-vocabulary", action="store_true", help="Disable grammar spotting")
+    parser.add_argument("--wake-phrase", action="append", dest="wake_phrases",
+                        help="Wake phrase to spot (repeatable)")
+    args = parser.parse_args(argv)
+
+    audio, sample_rate = load_wav(args.wav)
+    results = {
+        "burst": run_mode(audio, sample_rate, False, args),
+        "streaming": run_mode(audio, sample_rate, True, args),
+    }
+
+    print("\n📊 Wake detection, burst vs. streaming")
+    print(f"{'mode':<12}{'detections':>12}{'wall s':>10}{'CPU s':>10}  offsets (s)")
+    for mode, result in results.items():
+        offsets = ", ".join(f"{o:.2f}" for o in result["offsets"])
+        print(f"{mode:<12}{len(result['offsets']):>12}{result['wall_s']:>10.3f}{result['cpu_s']:>10.3f}  {offsets}")
+
+    leads = pair_leads(results["burst"]["offsets"], results["streaming"]["offsets"])
+    if leads:
+        stats = summarize(leads)
+        print(f"\nStreaming fires {stats['mean_ms']:.0f} ms earlier on average "
+              f"(p50 {stats['p50_ms']:.0f} ms, {stats['count']} paired detections)")
+    else:
+        print("\nNo detections to pair; use a recording that contains the wake phrase")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Real-time-factor benchmark for the wake word pipeline.
+
+Replays a recording through the same capture -> VAD -> recognizer path used
+live, as fast as possible, and reports real-time factor, frames/sec and
+per-stage latency. Runs without a microphone, so it works on headless CI.
+
+    python -m benchmarks.wake_word_rtf --wav test_recording.wav --repeat 20
+    python -m benchmarks.wake_word_rtf --model ~/.cache/vosk/vosk-model-en-us-0.22
+
+Without ``--model`` only capture and VAD are measured. ``--max-rtf`` makes the
+script exit non-zero when the pipeline gets slower than the given factor.
+``--compare-gate`` replays the audio a second time with the energy pre-gate
+off and reports how many VAD calls and recognizer bursts the gate saved.
+"""
+import argparse
+import sys
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.common import StageTimer, print_stages, write_json
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.detector import WakeWordDetector
+
+
+class _TimedVad:
+    """Wraps a ``webrtcvad.Vad`` and records per-frame timings."""
+
+    def __init__(self, vad, timer: StageTimer):
+        self.vad = vad
+        self.timer = timer
+        self.frames = 0
+        self.last_frame_done = 0.0
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        start = time.perf_counter()
+        try:
+            return self.vad.is_speech(frame, sample_rate)
+        finally:
+            self.last_frame_done = time.perf_counter()
+            self.timer.add("vad", self.last_frame_done - start)
+            self.frames += 1
+
+
+def load_wav(path: str):
+    """Return the samples and sample rate of a 16-bit mono WAV file."""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError(f"Expected 16-bit mono WAV: {path}")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16), wav.getframerate()
+
+
+def run_benchmark(audio: np.ndarray, sample_rate: int, recognizer=None, energy_gate: bool = True) -> dict:
+    timer = StageTimer()
+    detector = WakeWordDetector(sample_rate=sample_rate, energy_gate=energy_gate)
+    detector.debug = False
+    detector._preprocess = timer.wrap("capture", detector._preprocess)
+    vad = detector.vad = _TimedVad(detector.vad, timer)
+    frame_seconds = detector.frame_duration / 1000
+    detections = []
+    bursts = 0
+
+    def on_voice_detected(audio_data: np.ndarray):
+        nonlocal bursts
+        bursts += 1
+        if recognizer is None:
+            timer.add("burst", 0.0)
+            return
+        start = time.perf_counter()
+        detected = recognizer.accept_waveform(audio_data)
+        recognizer.reset()
+        done = time.perf_counter()
+        timer.add("asr", done - start)
+        if detected:
+            detections.append({
+                "stream_offset_s": detector.frames_processed * frame_seconds,
+                "latency_ms": (done - vad.last_frame_done) * 1000,
+            })
+
+    source = ArraySource(audio, sample_rate=sample_rate)
+    start = time.perf_counter()
+    detector.start_listening(callback=on_voice_detected, source=source)
+    wall = time.perf_counter() - start
+    frames = detector.frames_processed
+
+    return {
+        "audio_s": source.duration,
+        "wall_s": wall,
+        "rtf": wall / source.duration,
+        "frames": frames,
+        "frames_per_s": frames / wall,
+        "vad_frames": vad.frames,
+        "bursts": bursts,
+        "gate": detector.gate.stats() if detector.gate else None,
+        "stages": timer.summary(),
+        "detections": detections,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wav", default="test_recording.wav", help="16 kHz mono 16-bit WAV to replay")
+    parser.add_argument("--repeat", type=int, default=10, help="Times to loop the recording")
+    parser.add_argument("--model", help="Vosk model path; enables the recognizer stage")
+    parser.add_argument("--wake-phrase", action="append", dest="wake_phrases",
+                        help="Wake phrase to spot (repeatable)")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--max-rtf", type=float, help="Fail if the real-time factor exceeds this")
+    parser.add_argument("--no-gate", action="store_true", help="Disable the energy pre-gate")
+    parser.add_argument("--compare-gate", action="store_true",
+                        help="Also run without the energy pre-gate and report what it saved")
+    args = parser.parse_args(argv)
+
+    audio, sample_rate = load_wav(args.wav)
+    audio = np.tile(audio, args.repeat)
+
+    recognizer = None
+    if args.model:
+        from voice_assistant.wake_word.recognizer import WakeWordRecognizer
+        recognizer = WakeWordRecognizer(
+            wake_phrases=args.wake_phrases or ["hey buddy"],
+            model_path=args.model,
+            sample_rate=sample_rate
+        )
+
+    report = run_benchmark(audio, sample_rate, recognizer, energy_gate=not args.no_gate)
+
+    print(f"\n📊 Wake word pipeline ({'VAD + ASR' if recognizer else 'VAD only'})")
+    print(f"Audio:         {report['audio_s']:.1f} s")
+    print(f"Wall time:     {report['wall_s']:.3f} s")
+    print(f"Real-time x:   {report['rtf']:.4f} ({1 / report['rtf']:.0f}x faster than real time)")
+    print(f"Frames/sec:    {report['frames_per_s']:.0f}")
+    print(f"VAD frames:    {report['vad_frames']} of {report['frames']}")
+    print(f"ASR bursts:    {report['bursts']}")
+    if report["gate"]:
+        gate = report["gate"]
+        print(f"Gate:          {gate['frames_gated']} frames skipped, "
+              f"noise floor {gate['noise_floor_db']:.1f} dBFS")
+    print()
+    print_stages(report["stages"])
+    for detection in report["detections"]:
+        print(f"🎯 Wake word at {detection['stream_offset_s']:.2f} s, "
+              f"latency {detection['latency_ms']:.1f} ms")
+
+    if args.compare_gate and report["gate"]:
+        ungated = run_benchmark(audio, sample_rate, recognizer, energy_gate=False)
+        report["ungated"] = {key: ungated[key] for key in ("wall_s", "rtf", "vad_frames", "bursts")}
+        print(f"\nWithout gate:  {ungated['vad_frames']} VAD frames, {ungated['bursts']} ASR bursts, "
+              f"RTF {ungated['rtf']:.4f}")
+        print(f"Gate saved:    {ungated['vad_frames'] - report['vad_frames']} VAD calls, "
+              f"{ungated['bursts'] - report['bursts']} ASR bursts")
+
+    if args.json:
+        write_json(args.json, report)
+
+    if args.max_rtf is not None and report["rtf"] > args.max_rtf:
+        print(f"\n❌ Real-time factor {report['rtf']:.4f} exceeds budget {args.max_rtf}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
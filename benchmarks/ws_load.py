@@ -0,0 +1,133 @@
+"""Load test for the WebSocket streaming endpoint.
+
+Opens N concurrent connections to ``/api/stream``, each streaming the same
+recording in small chunks the way a satellite would, and reports how many
+streams completed, events per stream and latency percentiles:
+
+- connect: opening the socket until ``ready``
+- wake: audio position of the wake word until its event arrives (``--realtime`` only)
+- finish: ``end`` sent until ``done`` arrives, i.e. the backlog still being decoded
+
+Without ``--realtime`` every client sends as fast as the server reads, which
+measures throughput and exercises backpressure; with it, clients are paced
+like live microphones.
+
+    python -m benchmarks.ws_load --url ws://localhost:8000/api/stream --streams 200 --realtime
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.common import print_stages, summarize, write_json
+from benchmarks.wake_word_rtf import load_wav
+
+
+async def run_client(url: str, audio: np.ndarray, sample_rate: int, chunk_ms: int, realtime: bool) -> dict:
+    """Stream one recording and collect event timings."""
+    import websockets
+
+    result = {"events": Counter(), "wake_s": [], "error": None}
+    chunk = sample_rate * chunk_ms // 1000
+    opened = time.perf_counter()
+    try:
+        async with websockets.connect(f"{url}?sample_rate={sample_rate}", max_size=None) as ws:
+            ready = json.loads(await ws.recv())
+            result["connect_s"] = time.perf_counter() - opened
+            assert ready["type"] == "ready", ready
+            started = time.perf_counter()
+
+            async def read_events():
+                async for message in ws:
+                    event = json.loads(message)
+                    result["events"][event["type"]] += 1
+                    if event["type"] == "wake" and realtime:
+                        result["wake_s"].append(time.perf_counter() - started - event["offset"])
+                    elif event["type"] == "done":
+                        return
+
+            reader = asyncio.ensure_future(read_events())
+            for index, start in enumerate(range(0, len(audio), chunk)):
+                if realtime:
+                    delay = started + index * chunk_ms / 1000 - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                await ws.send(audio[start:start + chunk].astype("<i2").tobytes())
+                if reader.done():
+                    break
+            ended = time.perf_counter()
+            await ws.send(json.dumps({"type": "end"}))
+            await reader
+            result["finish_s"] = time.perf_counter() - ended
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+async def run(args) -> dict:
+    audio, sample_rate = load_wav(args.wav)
+    audio = np.tile(audio, args.repeat)
+
+    async def staggered(index: int):
+        # Spread connection setup so the server sees a ramp, not a stampede
+        await asyncio.sleep(args.ramp * index / args.streams)
+        return await run_client(args.url, audio, sample_rate, args.chunk_ms, args.realtime)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(staggered(i) for i in range(args.streams)))
+    wall = time.perf_counter() - start
+
+    completed = [r for r in results if r["error"] is None]
+    events = sum((r["events"] for r in results), Counter())
+    errors = Counter(r["error"] for r in results if r["error"])
+    audio_s = len(audio) / sample_rate * len(completed)
+    return {
+        "streams": args.streams,
+        "completed": len(completed),
+        "audio_s": audio_s,
+        "wall_s": wall,
+        "events": dict(events),
+        "errors": dict(errors),
+        "stages": {
+            "connect": summarize(r["connect_s"] for r in results if "connect_s" in r),
+            "wake": summarize(s for r in completed for s in r["wake_s"]),
+            "finish": summarize(r["finish_s"] for r in completed),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://localhost:8000/api/stream", help="Streaming endpoint")
+    parser.add_argument("--wav", default="test_recording.wav", help="16-bit mono WAV every client streams")
+    parser.add_argument("--streams", type=int, default=100, help="Concurrent connections")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to loop the recording per stream")
+    parser.add_argument("--chunk-ms", type=int, default=20, help="Audio per message")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which to open the connections")
+    parser.add_argument("--realtime", action="store_true", help="Pace clients like live microphones")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+
+    print(f"\n📊 {report['completed']}/{report['streams']} streams completed")
+    print(f"Audio:         {report['audio_s']:.1f} s total")
+    print(f"Wall time:     {report['wall_s']:.2f} s")
+    if report["audio_s"]:
+        print(f"Real-time x:   {report['wall_s'] / report['audio_s']:.4f} aggregate")
+    print(f"Events:        {report['events']}")
+    for error, count in report["errors"].items():
+        print(f"⚠️  {count} x {error}")
+    print()
+    print_stages(report["stages"])
+    if args.json:
+        write_json(args.json, report)
+    return 0 if report["completed"] == report["streams"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,9 +17,7 @@ from fastapi import FastAPI, Request, Form
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-import google.generativeai as genai
 from pydantic import BaseModel
-import uvicorn
 
 from config import GOOGLE_API_KEY, API_HOST, API_PORT
 
@@ -27,14 +25,20 @@ app = FastAPI(title="BalanceBuddy Web Interface")
 templates = Jinja2Templates(directory=str(Path(__file__).resolve().parent / "templates"))
 app.mount("/static", StaticFiles(directory=str(Path(__file__).resolve().parent / "static")), name="static")
 
-# Configure Gemini
-genai.configure(api_key=GOOGLE_API_KEY)
+_model = None
 
-# Print available models
-for m in genai.list_models():
-    print(f"Found model: {m.name}")
+def get_model():
+    """Gemini model, configured on the first plan request.
 
-model = genai.GenerativeModel('gemini-2.0-flash')
+    The SDK is slow to import, so the server starts without it and without
+    any network call; a bad key shows up as an error on the first plan.
+    """
+    global _model
+    if _model is None:
+        import google.generativeai as genai
+        genai.configure(api_key=GOOGLE_API_KEY)
+        _model = genai.GenerativeModel('gemini-2.0-flash')
+    return _model
 
 class UserPreferences(BaseModel):
     age: int
@@ -104,7 +108,7 @@ def get_daily_plan(day: str, preferences: UserPreferences) -> str:
         Keep descriptions concise but informative, including portion sizes for meals and duration/intensity for exercises."""
 
         print(f"Sending prompt to Gemini: {prompt[:100]}...")
-        response = model.generate_content(prompt)
+        response = get_model().generate_content(prompt)
         print(f"Received response from Gemini: {response}")
         result = response.text
         print(f"Extracted text: {result[:100]}...")
@@ -154,4 +158,5 @@ async def create_plan(
     )
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host=API_HOST, port=API_PORT, reload=True)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Add the repository root to the Python path for imports
+root_dir = str(Path(__file__).resolve().parent.parent)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
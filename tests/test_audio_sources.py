@@ -0,0 +1,62 @@
+"""Tests for offline audio sources driving the wake word detector."""
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from voice_assistant.audio.sources import AudioSource, ArraySource, PCMStreamSource, WavFileSource, _ReplaySource
+from voice_assistant.wake_word.detector import WakeWordDetector
+
+RECORDING = Path(__file__).resolve().parent.parent / "test_recording.wav"
+
+
+def collect_blocks(source):
+    blocks = []
+    with source.open(lambda indata, frames, time_info, status: blocks.append(indata.copy())):
+        source.finished.wait(timeout=5)
+    return blocks
+
+
+def test_array_source_pads_last_block():
+    data = np.arange(1000, dtype=np.int16)
+    blocks = collect_blocks(ArraySource(data, blocksize=480))
+
+    assert len(blocks) == 3
+    assert all(block.shape == (480, 1) for block in blocks)
+    assert np.allclose(np.concatenate(blocks)[:1000, 0], data / 32768)
+    assert not blocks[-1][40:].any()
+
+
+def test_pcm_stream_matches_array_source():
+    data = (np.sin(np.arange(4800) / 10) * 10000).astype(np.int16)
+    from_pcm = collect_blocks(PCMStreamSource(io.BytesIO(data.tobytes())))
+    from_array = collect_blocks(ArraySource(data))
+
+    assert np.array_equal(np.concatenate(from_pcm), np.concatenate(from_array))
+
+
+def test_detector_runs_offline_until_source_is_exhausted():
+    source = WavFileSource(RECORDING)
+    detector = WakeWordDetector(sample_rate=source.sample_rate)
+    detector.debug = False
+    bursts = []
+
+    detector.start_listening(callback=bursts.append, source=source)
+
+    assert not detector.is_listening
+    assert bursts
+    assert all(burst.dtype == np.int16 for burst in bursts)
+
+
+def test_incomplete_sources_fail_when_created():
+    class NoStop(AudioSource):
+        def start(self):
+            pass
+
+    class NoBlocks(_ReplaySource):
+        pass
+
+    for source_class in (AudioSource, NoStop, NoBlocks):
+        with pytest.raises(TypeError):
+            source_class()
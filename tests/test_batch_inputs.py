@@ -0,0 +1,21 @@
+"""Tests for batch transcription input collection."""
+import json
+
+from voice_assistant.asr.batch import collect_inputs
+
+
+def test_directory_is_scanned_recursively_in_order(tmp_path):
+    (tmp_path / "b").mkdir()
+    for name in ("b/2.wav", "1.wav", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    paths = [r["path"] for r in collect_inputs(str(tmp_path))]
+    assert paths == [str(tmp_path / "1.wav"), str(tmp_path / "b" / "2.wav")]
+
+
+def test_manifests_resolve_relative_paths_and_keep_fields(tmp_path):
+    (tmp_path / "list.txt").write_text("# archive\na.wav\n/abs/b.wav\n\n")
+    assert collect_inputs(str(tmp_path / "list.txt")) == [
+        {"path": str(tmp_path / "a.wav")}, {"path": "/abs/b.wav"}
+    ]
+    (tmp_path / "list.jsonl").write_text(json.dumps({"path": "c.wav", "user": "7"}) + "\n")
+    assert collect_inputs(str(tmp_path / "list.jsonl")) == [{"path": str(tmp_path / "c.wav"), "user": "7"}]
@@ -0,0 +1,55 @@
+"""Tests for the shared capture bus."""
+import threading
+
+import numpy as np
+
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.sources import ArraySource
+
+FRAME = 480
+
+
+def numbered_frames(count):
+    """Audio whose n-th 30 ms frame is filled with the value n."""
+    return np.repeat(np.arange(count, dtype=np.int16), FRAME)
+
+
+def captured(values):
+    # Float capture scaled by 32767 and truncated loses one LSB
+    return [max(n - 1, 0) for n in values]
+
+
+def drain(subscription):
+    values = []
+    while not subscription.finished:
+        frames = subscription.read_many(timeout=0.1)
+        if frames is not None:
+            values.extend(frames[:, 0].tolist())
+    return values
+
+
+def test_every_subscriber_gets_every_frame():
+    bus = CaptureBus(ArraySource(numbered_frames(200)))
+    first = bus.subscribe("first")
+    second = bus.subscribe("second", capacity=8)
+
+    second_values = []
+    consumer = threading.Thread(target=lambda: second_values.extend(drain(second)))
+    consumer.start()
+    with bus:
+        first_values = drain(first)
+        consumer.join(timeout=5)
+
+    assert first_values == captured(range(200))
+    assert second_values == captured(range(200))
+    assert bus.stats()["bus"]["frames_captured"] == 200
+
+
+def test_late_subscriber_receives_preroll_from_history():
+    bus = CaptureBus(ArraySource(numbered_frames(50)))
+    early = bus.subscribe("early")
+    with bus:
+        drain(early)
+    late = bus.subscribe("late", preroll=0.3)
+
+    assert drain(late) == captured(range(40, 50))
@@ -0,0 +1,78 @@
+"""Tests for the shared, tuned database engines."""
+import os
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from voice_assistant.db.database import Database
+from voice_assistant.db.engine import EngineRegistry, registry
+from voice_assistant.task_manager import TaskManager
+
+
+@pytest.fixture
+def url(tmp_path):
+    return f"sqlite:///{tmp_path / 'shared.db'}"
+
+
+def test_same_file_shares_one_engine(url, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first, second = Database(url), Database("sqlite:///shared.db")
+    assert first.engine is second.engine
+
+    task_id = first.add_task("shared")
+    assert [task["id"] for task in second.get_tasks()] == [task_id]
+
+
+def test_sqlite_connections_are_tuned(url):
+    with Database(url).engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 10000
+    assert os.path.exists(url[len("sqlite:///"):] + "-wal")
+
+
+def test_in_memory_databases_are_private():
+    first, second = Database("sqlite:///:memory:"), Database("sqlite:///:memory:")
+    assert first.engine is not second.engine
+    first.add_task("only here")
+    assert second.get_tasks() == []
+
+
+def test_sessions_are_not_kept_per_thread(url):
+    _, sessions = registry.get(url)
+    assert sessions() is not sessions()
+
+    # Short-lived threads leave nothing behind in the registry
+    db = Database(url)
+    threads = [threading.Thread(target=db.add_task, args=(f"task {i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(db.get_tasks()) == 8
+    assert db.engine.pool.checkedout() == 0
+
+
+def test_task_manager_uses_the_given_database(url):
+    db = Database(url)
+    manager = TaskManager("sqlite:///elsewhere.db", db=db)
+    assert manager.db is db
+
+
+def test_reader_is_not_blocked_by_open_write(url):
+    db = Database(url)
+    db.add_task("committed")
+    with db.engine.connect() as writer:
+        writer.execute(text("BEGIN IMMEDIATE"))
+        writer.execute(text("INSERT INTO tasks (title, user_id, is_completed, reminder_triggered) "
+                            "VALUES ('pending', 1, 0, 0)"))
+        assert [task["title"] for task in db.get_tasks()] == ["committed"]
+        writer.execute(text("ROLLBACK"))
+
+
+def test_dispose_forgets_engines(url):
+    local = EngineRegistry()
+    engine, _ = local.get(url)
+    local.dispose()
+    assert local.get(url)[0] is not engine
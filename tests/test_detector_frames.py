@@ -0,0 +1,29 @@
+"""Tests for driving the wake word detector frame by frame."""
+import numpy as np
+
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.detector import WakeWordDetector
+
+
+def test_pushed_frames_match_listening_loop():
+    audio, sample_rate = load_wav("test_recording.wav")
+
+    listening = WakeWordDetector(sample_rate=sample_rate)
+    listening.debug = False
+    expected = []
+    listening.start_listening(callback=expected.append, source=ArraySource(audio, sample_rate))
+
+    pushed = WakeWordDetector(sample_rate=sample_rate)
+    pushed.debug = False
+    bursts = []
+    padding = -len(audio) % pushed.frame_length  # sources zero-pad the last block
+    frames = np.concatenate([audio, np.zeros(padding, dtype=np.int16)]).reshape(-1, pushed.frame_length)
+    for start in range(0, len(frames), 7):  # uneven batches
+        pushed.process_frames(frames[start:start + 7], callback=bursts.append)
+    pushed.flush(callback=bursts.append)
+
+    assert pushed.frames_processed == listening.frames_processed
+    assert len(bursts) == len(expected) > 0
+    # The capture bus rescales samples slightly, so compare burst boundaries
+    assert [len(b) for b in bursts] == [len(b) for b in expected]
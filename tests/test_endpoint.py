@@ -0,0 +1,43 @@
+"""Tests for VAD endpointing of commands."""
+import numpy as np
+
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.audio.endpoint import END_OF_SPEECH, MAX_UTTERANCE, NO_SPEECH, Endpointer
+
+FRAME = 480  # 30 ms at 16 kHz
+
+
+def _frames(audio):
+    padding = -len(audio) % FRAME
+    return np.concatenate([audio, np.zeros(padding, dtype=np.int16)]).reshape(-1, FRAME)
+
+
+def _feed(endpointer, frames, batch=5):
+    for start in range(0, len(frames), batch):
+        event = endpointer.process(frames[start:start + batch])
+        if event:
+            return event
+    return None
+
+
+def test_trailing_silence_ends_the_command_quickly():
+    speech, _ = load_wav("test_recording.wav")
+    frames = _frames(np.concatenate([speech, np.zeros(16000 * 3, dtype=np.int16)]))
+    endpointer = Endpointer(trailing_silence=0.5)
+    assert _feed(endpointer, frames) == END_OF_SPEECH
+    assert endpointer.speech_start is not None
+    assert 0.5 <= endpointer.trailing_time < 0.6
+    assert endpointer.stream_time < len(speech) / 16000 + 0.6
+
+
+def test_no_speech_timeout_uses_the_stream_clock():
+    endpointer = Endpointer(no_speech_timeout=1.0)
+    assert _feed(endpointer, _frames(np.zeros(16000 * 3, dtype=np.int16))) == NO_SPEECH
+    assert abs(endpointer.stream_time - 1.0) < 0.05
+
+
+def test_max_utterance_caps_long_speech():
+    speech, _ = load_wav("test_recording.wav")
+    endpointer = Endpointer(max_utterance=1.0, trailing_silence=5.0)
+    assert _feed(endpointer, _frames(np.tile(speech, 3))) == MAX_UTTERANCE
+    assert endpointer.stream_time - endpointer.speech_start >= 1.0
@@ -0,0 +1,37 @@
+"""Tests for the energy pre-gate."""
+import numpy as np
+
+from voice_assistant.audio.gate import EnergyGate
+
+
+def _frames(level, count, frame_length=480, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((count, frame_length)) * level).astype(np.int16)
+
+
+def test_background_noise_is_gated_after_warmup():
+    gate = EnergyGate(480, warmup_frames=10)
+    is_open = gate.process(_frames(30, 60))
+    assert is_open[:10].all()
+    assert not is_open[20:].any()
+    assert gate.frames_gated >= 45
+
+
+def test_loud_frames_pass_with_hangover():
+    gate = EnergyGate(480, hangover_frames=3)
+    gate.process(_frames(30, 60))
+    batch = np.concatenate([_frames(3000, 5, seed=1), _frames(30, 10, seed=2)])
+    is_open = gate.process(batch).copy()
+    assert is_open[:5].all()
+    assert is_open[5:8].all()  # hangover
+    assert not is_open[8:].any()
+
+
+def test_noise_floor_follows_louder_room():
+    gate = EnergyGate(480)
+    gate.process(_frames(30, 60))
+    quiet_floor = gate.noise_floor_db
+    for seed in range(20):
+        gate.process(_frames(300, 60, seed=seed))
+    assert gate.noise_floor_db > quiet_floor + 15
+    assert not gate.process(_frames(300, 10, seed=99)).any()
@@ -0,0 +1,76 @@
+"""Tests for the SPSC audio frame ring."""
+import threading
+
+import numpy as np
+
+from voice_assistant.audio.ring import FrameRing
+
+
+def test_write_and_read_preserve_order():
+    ring = FrameRing(4, capacity=8)
+    for value in range(5):
+        assert ring.write(np.full(4, value))
+
+    assert ring.read()[0] == 0
+    frames = ring.read_many()
+    assert frames[:, 0].tolist() == [1, 2, 3, 4]
+    assert ring.read(timeout=0) is None
+
+
+def test_overflow_drops_newest_frames_and_counts_them():
+    ring = FrameRing(2, capacity=4)
+    results = [ring.write(np.full(2, value)) for value in range(6)]
+
+    assert results == [True] * 4 + [False] * 2
+    assert ring.stats()["dropped"] == 2
+    assert ring.read_many()[:, 0].tolist() == [0, 1, 2, 3]
+
+
+def test_frames_held_by_consumer_are_not_overwritten():
+    ring = FrameRing(2, capacity=2)
+    ring.write(np.full(2, 1))
+    ring.write(np.full(2, 2))
+    frame = ring.read()
+
+    assert not ring.write(np.full(2, 3))
+    assert frame[0] == 1
+    assert ring.read()[0] == 2
+    assert ring.write(np.full(2, 3))
+
+
+def test_read_many_stops_at_wraparound():
+    ring = FrameRing(1, capacity=4)
+    for value in range(3):
+        ring.write(np.array([value]))
+    ring.read_many()
+    ring.release()
+    for value in range(3, 6):
+        ring.write(np.array([value]))
+
+    assert ring.read_many()[:, 0].tolist() == [3]
+    assert ring.read_many(timeout=0)[:, 0].tolist() == [4, 5]
+
+
+def test_blocking_read_wakes_on_commit():
+    ring = FrameRing(1, capacity=4)
+    received = []
+
+    def consume():
+        received.append(ring.read(timeout=5))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    ring.write(np.array([7]))
+    consumer.join(timeout=5)
+
+    assert received[0][0] == 7
+
+
+def test_close_wakes_waiting_consumer():
+    ring = FrameRing(1, capacity=4)
+    consumer = threading.Thread(target=ring.read, kwargs={"timeout": 5})
+    consumer.start()
+    ring.close()
+    consumer.join(timeout=1)
+
+    assert not consumer.is_alive()
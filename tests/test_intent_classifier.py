@@ -0,0 +1,64 @@
+"""Tests for the hashed n-gram fallback classifier."""
+import sys
+
+import pytest
+
+from voice_assistant.nlu import classifier
+from voice_assistant.nlu.classifier import NO_INTENT, HashedNgramClassifier, train, training_examples
+from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+RECORDS = [{"text": text} for text in [
+    "add task buy milk", "add a task to call mom", "create a task water the plants",
+    "show my tasks", "list tasks", "what do i need to do",
+    "delete task 3", "mark task 2 as done", "remove task 7",
+]] * 5 + [{"text": text, "label": NO_INTENT} for text in [
+    "what's the weather like", "play some music", "tell me a joke", "thanks buddy",
+]] * 5
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    texts, labels = training_examples(RECORDS)
+    path = str(tmp_path_factory.mktemp("model") / "intent_model.npz")
+    train(texts, labels, dim=2 ** 12, epochs=50, learning_rate=2.0).save(path)
+    return path
+
+
+def test_training_labels_come_from_hand_labels_then_rules():
+    texts, labels = training_examples([
+        {"text": "Add task  buy milk"}, {"text": "tell me a joke", "label": NO_INTENT}, {"text": "hmm"},
+    ])
+    assert texts == ["add task buy milk", "tell me a joke"]
+    assert labels == ["add_task", NO_INTENT]
+
+
+def test_saved_model_predicts_the_same(model_path):
+    model = HashedNgramClassifier.load(model_path)
+    assert model.predict("add tusk buy milk")[0] == "add_task"
+    assert model.predict("show my desks")[0] == "list_tasks"
+    assert model.predict("play sum music")[0] == NO_INTENT
+    assert "torch" not in sys.modules and "transformers" not in sys.modules
+
+
+def test_recognizer_falls_back_only_when_no_pattern_matches(model_path):
+    recognizer = IntentRecognizer(fallback_model=model_path, fallback_threshold=0.6)
+    assert recognizer.recognize("add task buy milk").confidence == 0.9
+    assert recognizer._fallback is None  # not loaded until something misses
+
+    intent = recognizer.recognize("add tusk buy milk")
+    assert intent.name == "add_task" and intent.params == {}
+    assert 0.6 <= intent.confidence < 0.9
+    assert recognizer.recognize("play sum music") is None
+
+
+def test_missing_model_disables_the_fallback(tmp_path):
+    recognizer = IntentRecognizer(fallback_model=str(tmp_path / "missing.npz"))
+    assert recognizer.recognize("add tusk buy milk") is None
+    assert recognizer.fallback_model is None
+
+
+def test_model_is_configured_through_the_environment(monkeypatch):
+    monkeypatch.delenv(classifier.MODEL_ENV, raising=False)
+    assert classifier.configured_model() is None
+    monkeypatch.setenv(classifier.MODEL_ENV, "intent_model.npz")
+    assert classifier.configured_model() == "intent_model.npz"
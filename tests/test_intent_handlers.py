@@ -0,0 +1,138 @@
+"""Tests for table-driven intent dispatch."""
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from voice_assistant import metrics
+from voice_assistant.nlu import command_processor
+from voice_assistant.nlu.command_processor import CommandProcessor
+from voice_assistant.nlu.handlers import (
+    FAILED_REPLY, HANDLER_SECONDS, UNKNOWN_INTENT_REPLY, IntentDispatcher, IntentWorker,
+)
+from voice_assistant.nlu.intent_recognizer import Intent, IntentRecognizer
+
+
+@pytest.fixture
+def dispatcher():
+    return IntentDispatcher(IntentRecognizer())
+
+
+def test_registration_checks_params_against_patterns_and_signature(dispatcher):
+    with pytest.raises(ValueError, match="never produces task"):
+        dispatcher.register("add_task", lambda task: task, required=("task",))
+    with pytest.raises(ValueError, match="doesn't accept"):
+        dispatcher.register("add_task", lambda text: text, required=("task_description",))
+    with pytest.raises(ValueError, match="not a required parameter"):
+        dispatcher.register("delete_task", lambda task_id: task_id)
+    with pytest.raises(ValueError, match="Unknown intent"):
+        dispatcher.register("weather", lambda: "sunny")
+
+    dispatcher.register("help", lambda: "help")
+    with pytest.raises(ValueError, match="already has a handler"):
+        dispatcher.register("help", lambda: "again")
+
+
+def test_intents_added_later_can_be_handled():
+    recognizer = IntentRecognizer()
+    dispatcher = IntentDispatcher(recognizer)
+    recognizer.add_intent("lights", [r"turn (?P<state>on|off) the lights"])
+
+    @dispatcher.handler("lights", required=("state",))
+    def lights(state):
+        return f"Lights {state}"
+
+    assert dispatcher.dispatch(recognizer.recognize("turn off the lights")) == "Lights off"
+
+
+def test_missing_params_get_the_prompt(dispatcher):
+    calls = []
+    dispatcher.register("add_task", lambda task_description: calls.append(task_description), required=("task_description",),
+                        prompt="What task would you like to add?")
+    reply = dispatcher.dispatch(Intent("add_task", 1.0, {"task_description": ""}))
+    assert reply == "What task would you like to add?" and not calls
+
+
+def test_unknown_intent_falls_back(dispatcher):
+    assert dispatcher.dispatch(Intent("list_tasks", 1.0, {})) == UNKNOWN_INTENT_REPLY
+
+
+def test_async_handlers_and_latency_metrics(dispatcher):
+    @dispatcher.handler("set_reminder", required=("task_description",), optional=("reminder_time",))
+    async def remind(task_description, reminder_time=None):
+        await asyncio.sleep(0)
+        return f"{task_description} at {reminder_time}"
+
+    histogram = metrics.registry.histogram(HANDLER_SECONDS, "Intent handler latency", intent="set_reminder")
+    before = histogram.count
+    intent = Intent("set_reminder", 1.0, {"task_description": "stretch", "reminder_time": "noon"})
+    assert dispatcher.dispatch(intent) == "stretch at noon"
+    assert asyncio.run(dispatcher.dispatch_async(intent)) == "stretch at noon"
+    assert histogram.count == before + 2
+
+
+def test_worker_handles_off_the_calling_thread_and_bounds_the_backlog(dispatcher):
+    release = threading.Event()
+    threads = []
+
+    @dispatcher.handler("add_task", required=("task_description",))
+    def add_task(task_description):
+        threads.append(threading.get_ident())
+        release.wait(5)
+        return f"Added {task_description}"
+
+    worker = IntentWorker(dispatcher, workers=1, max_pending=2, name="test")
+    replies = []
+    intent = Intent("add_task", 1.0, {"task_description": "stretch"})
+    assert worker.submit(intent, lambda i, reply: replies.append(reply)) is not None
+    assert worker.submit(intent, lambda i, reply: replies.append(reply)) is not None
+    assert worker.submit(intent) is None  # backlog full; the caller isn't blocked
+
+    release.set()
+    assert worker.join(timeout=5)
+    worker.shutdown()
+    assert replies == ["Added stretch", "Added stretch"]
+    assert threading.get_ident() not in threads
+    assert worker.stats() == {"pending": 0, "high_water": 2, "completed": 2, "failed": 0, "rejected": 1}
+    assert 'balancebuddy_intent_queue_depth{worker="test"} 0' in metrics.registry.render()
+
+
+def test_worker_on_an_event_loop_reports_failures(dispatcher):
+    @dispatcher.handler("delete_task", required=("task_id",))
+    async def delete_task(task_id):
+        raise KeyError(task_id)
+
+    async def main():
+        worker = IntentWorker(dispatcher, loop=asyncio.get_running_loop())
+        replies = []
+        future = worker.submit(Intent("delete_task", 1.0, {"task_id": "3"}), lambda i, r: replies.append(r))
+        await asyncio.wait([asyncio.wrap_future(future)])
+        await asyncio.sleep(0)
+        return worker, replies
+
+    worker, replies = asyncio.run(main())
+    assert replies == [FAILED_REPLY]
+    assert worker.stats()["failed"] == 1 and worker.pending == 0
+
+
+def test_reminder_time_already_past_today_is_set_for_tomorrow(monkeypatch):
+    now = datetime(2026, 10, 17, 16, 0)
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(command_processor, "datetime", Clock)
+    added = []
+    processor = SimpleNamespace(task_manager=SimpleNamespace(
+        add_task=lambda title, when: added.append((title, when)) or len(added)))
+
+    # "remind me to call john at 3pm", said at 4pm
+    intent = IntentRecognizer().recognize("remind me to call john at 3pm", now)
+    CommandProcessor._handle_set_reminder(processor, **intent.params)
+    CommandProcessor._handle_set_reminder(processor, "stretch", "2026-10-17T17:30:00")
+    assert added == [("call john", datetime(2026, 10, 18, 15, 0)),
+                     ("stretch", datetime(2026, 10, 17, 17, 30))]
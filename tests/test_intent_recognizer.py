@@ -0,0 +1,103 @@
+"""Tests for intent recognition and its caches."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+
+@pytest.fixture(scope="module")
+def recognizer():
+    return IntentRecognizer()
+
+
+def test_reminder_with_time_beats_add_task(recognizer):
+    intent = recognizer.recognize("Remind me to call John at 3pm")
+    assert intent.name == "set_reminder"
+    assert intent.params["task_description"] == "call john"
+    assert "reminder_time" in intent.params and "time" not in intent.params
+
+    # Without a time it is still a plain task
+    intent = recognizer.recognize("remind me to take medicine")
+    assert intent.name == "add_task"
+    assert intent.params == {"task_description": "take medicine"}
+
+
+@pytest.mark.parametrize("text", [
+    "remind me to check in on mom",
+    "remind me to log in to the portal",
+])
+def test_reminder_needs_a_parseable_time(recognizer, text):
+    intent = recognizer.recognize(text)
+    assert intent.name == "add_task"
+    assert intent.params == {"task_description": text[len("remind me to "):]}
+    assert recognizer.recognize_many([text])[0] == intent
+
+
+@pytest.mark.parametrize("text, name, params", [
+    ("add task buy groceries", "add_task", {"task_description": "buy groceries"}),
+    ("show my tasks", "list_tasks", {}),
+    ("mark task 2 as done", "delete_task", {"task_id": "2"}),
+    ("delete task 1", "delete_task", {"task_id": "1"}),
+    ("what can you do", "help", {}),
+])
+def test_builtin_intents(recognizer, text, name, params):
+    intent = recognizer.recognize(text)
+    assert (intent.name, intent.params) == (name, params)
+
+
+def test_unmatched_text(recognizer):
+    assert recognizer.recognize("what's the weather like") is None
+
+
+def test_added_intents_use_priority_then_definition_order():
+    recognizer = IntentRecognizer()
+    recognizer.add_intent("lights", [r"turn (?P<state>on|off) the (?P<room>\w+) lights?"])
+    recognizer.add_intent("device", [r"turn (?P<state>on|off) the (?P<device>.+)"])
+    intent = recognizer.recognize("turn off the kitchen lights")
+    assert intent.name == "lights"
+    assert intent.params == {"state": "off", "room": "kitchen"}
+
+    recognizer.add_intent("device", [], priority=5)
+    assert recognizer.recognize("turn off the kitchen lights").name == "device"
+
+
+@pytest.mark.parametrize("expression", [
+    "3pm", "9am tomorrow", "2 hours", "5 minutes", "tonight", "noon", "friday", "next monday",
+])
+def test_cached_times_re_resolve_against_the_clock(expression):
+    recognizer = IntentRecognizer()
+    first = datetime(2026, 10, 17, 10, 0)
+    # Later the same day, across midnight and on other weekdays
+    for hours in (0, 3.5, 13.99, 14.5, 40, 75, 170):
+        now = first + timedelta(hours=hours)
+        assert recognizer._parse_time(expression, now) == recognizer._parse_at(expression, now)
+    assert recognizer.time_cache.hits > 0
+
+
+def test_repeated_commands_hit_the_cache():
+    recognizer = IntentRecognizer(cache_size=2)
+    now = datetime(2026, 10, 17, 10, 0)
+    first = recognizer.recognize("Remind me to stretch in 2 hours", now)
+    first.params["task_description"] = "changed by the caller"
+    again = recognizer.recognize("remind me to  stretch in 2 hours", now + timedelta(minutes=30))
+
+    assert again.params == {"task_description": "stretch", "reminder_time": "2026-10-17T12:30:00"}
+    stats = recognizer.cache_stats()
+    assert stats["intent"]["hits"] == 1
+    # Parsed once, when matching checked it; reused when resolving both times
+    assert stats["time"]["misses"] == 1 and stats["time"]["hits"] == 2
+
+    recognizer.recognize("show my tasks")
+    recognizer.recognize("help")
+    assert recognizer.cache_stats()["intent"]["size"] == 2  # bounded
+
+
+def test_recognize_many_matches_recognize_per_text():
+    recognizer = IntentRecognizer()
+    now = datetime(2026, 10, 17, 10, 0)
+    texts = [
+        "remind me to call mom at 3pm", "Remind me to call mom at 3PM", "add task buy milk",
+        "what's the weather", "set reminder to stretch in 2 hours", "add task buy milk",
+    ]
+    assert recognizer.recognize_many(texts, now) == [recognizer.recognize(t, now) for t in texts]
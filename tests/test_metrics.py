@@ -0,0 +1,51 @@
+"""Tests for the metrics registry and its Prometheus rendering."""
+import threading
+
+from voice_assistant.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage latency", buckets=(0.01, 0.1), stage="vad")
+    for seconds in (0.005, 0.05, 0.05, 3.0):
+        histogram.observe(seconds)
+    assert registry.histogram("stage_seconds", stage="vad") is histogram
+    assert histogram.quantile(0.5) == 0.1
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="vad",le="0.01"} 1' in text
+    assert 'stage_seconds_bucket{stage="vad",le="0.1"} 3' in text
+    assert 'stage_seconds_bucket{stage="vad",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="vad"} 4' in text
+
+
+def test_counters_and_collectors():
+    registry = MetricsRegistry()
+    registry.counter("drops_total", "Drops", consumer="wake").inc(3)
+    registry.register_collector(lambda: [("depth", "gauge", "Depth", {"consumer": "wake"}, 7)])
+    text = registry.render()
+    assert 'drops_total{consumer="wake"} 3' in text
+    assert "# TYPE depth gauge" in text
+    assert 'depth{consumer="wake"} 7' in text
+
+
+def test_render_while_series_are_added():
+    registry = MetricsRegistry()
+    done = threading.Event()
+
+    def add_series():
+        for index in range(5000):
+            registry.histogram(f"family_{index % 50}_seconds", intent=str(index)).observe(0.01)
+            registry.counter("calls_total", intent=str(index)).inc()
+        done.set()
+
+    thread = threading.Thread(target=add_series)
+    thread.start()
+    renders = 0
+    while not done.is_set():
+        registry.render()
+        renders += 1
+    thread.join()
+    assert renders > 0
+    assert registry.render().count("calls_total{") == 5000
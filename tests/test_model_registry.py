@@ -0,0 +1,43 @@
+"""Tests for the process-wide Vosk model registry."""
+import threading
+import time
+
+import pytest
+
+vosk = pytest.importorskip("vosk")
+
+from voice_assistant.asr.models import ModelRegistry
+
+
+class SlowModel:
+    loads = 0
+
+    def __init__(self, model_path):
+        SlowModel.loads += 1
+        time.sleep(0.05)
+
+
+def test_concurrent_requests_load_model_once(monkeypatch, tmp_path):
+    monkeypatch.setattr(vosk, "Model", SlowModel)
+    SlowModel.loads = 0
+    registry = ModelRegistry()
+    models = []
+
+    threads = [
+        threading.Thread(target=lambda: models.append(registry.get_model(str(tmp_path))))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowModel.loads == 1
+    assert all(model is models[0] for model in models)
+    assert registry.is_loaded(str(tmp_path))
+    assert "load_s" in registry.load_stats[str(tmp_path.resolve())]
+
+
+def test_missing_model_path_raises(tmp_path):
+    with pytest.raises(ValueError):
+        ModelRegistry().get_model(str(tmp_path / "missing"))
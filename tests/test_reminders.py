@@ -0,0 +1,120 @@
+"""Tests for the heap-based reminder dispatcher."""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from voice_assistant.db.database import Database
+from voice_assistant.scheduler.reminders import ReminderDispatcher
+
+
+class Delivered:
+    def __init__(self):
+        self.tasks = []
+        self.event = threading.Event()
+
+    def __call__(self, tasks):
+        self.tasks += [(task["title"], datetime.now() - task["reminder_time"]) for task in tasks]
+        self.event.set()
+
+    def wait(self, count, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while len(self.tasks) < count and time.monotonic() < deadline:
+            self.event.wait(0.01)
+            self.event.clear()
+        return [title for title, _ in self.tasks]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'tasks.db'}")
+    db.queries = []
+    event.listen(db.engine, "before_cursor_execute", lambda *args: db.queries.append(args[2]))
+    yield db
+    db.engine.dispose()
+
+
+def add(db, dispatcher, title, seconds):
+    when = datetime.now() + timedelta(seconds=seconds)
+    task_id = db.add_task(title, when)
+    dispatcher.schedule(task_id, title, when)
+    return task_id
+
+
+def test_fires_on_time_and_wakes_for_earlier_reminders(db):
+    delivered = Delivered()
+    dispatcher = ReminderDispatcher(db, delivered)
+    db.add_task("overdue", datetime.now() - timedelta(minutes=5))
+    dispatcher.start()
+    try:
+        add(db, dispatcher, "later", 600)
+        assert delivered.wait(1) == ["overdue"]
+        add(db, dispatcher, "soon", 0.05)
+        assert delivered.wait(2) == ["overdue", "soon"]
+        assert delivered.tasks[1][1] < timedelta(milliseconds=100)
+
+        # Idle until "later": no queries at all
+        queries = len(db.queries)
+        time.sleep(0.2)
+        assert len(db.queries) == queries
+        assert dispatcher.loads == 1
+    finally:
+        started = time.monotonic()
+        dispatcher.stop()
+    assert time.monotonic() - started < 0.5
+
+
+def test_completed_tasks_are_not_reminded(db):
+    delivered = Delivered()
+    dispatcher = ReminderDispatcher(db, delivered)
+    dispatcher.start()
+    try:
+        time.sleep(0.05)  # first load done
+        cancelled = add(db, dispatcher, "cancelled", 0.05)
+        add(db, dispatcher, "kept", 0.1)
+        db.complete_task(cancelled)
+        dispatcher.cancel(cancelled)
+        assert delivered.wait(1) == ["kept"]
+        time.sleep(0.1)
+        assert delivered.wait(1) == ["kept"]
+    finally:
+        dispatcher.stop()
+
+
+def test_loads_reminders_in_batches(db):
+    now = datetime.now()
+    same_time = now + timedelta(milliseconds=100)
+    db.add_tasks([(f"tie {i}", same_time) for i in range(3)] +
+                 [(f"at {i}", now + timedelta(milliseconds=20 * i)) for i in range(5)])
+    delivered = Delivered()
+    dispatcher = ReminderDispatcher(db, delivered, batch=2)
+    dispatcher.start()
+    try:
+        titles = delivered.wait(8)
+    finally:
+        dispatcher.stop()
+    assert sorted(titles) == sorted([f"tie {i}" for i in range(3)] + [f"at {i}" for i in range(5)])
+    assert titles[:4] == ["at 0", "at 1", "at 2", "at 3"]
+    assert dispatcher.loads > 2
+
+
+def test_cancelling_the_rest_of_a_batch_loads_the_next(db):
+    now = datetime.now()
+    first, second, _ = db.add_tasks([
+        ("a", now + timedelta(seconds=0.3)), ("b", now + timedelta(seconds=0.4)),
+        ("c", now + timedelta(seconds=0.6)),
+    ])
+    delivered = Delivered()
+    dispatcher = ReminderDispatcher(db, delivered, batch=2)
+    dispatcher.start()
+    try:
+        time.sleep(0.05)  # first batch loaded
+        for task_id in (first, second):
+            db.complete_task(task_id)
+            dispatcher.cancel(task_id)
+        assert delivered.wait(1) == ["c"]
+    finally:
+        dispatcher.stop()
+    assert dispatcher.loads == 2
@@ -0,0 +1,26 @@
+"""Tests for replaying transcript logs through intent recognition."""
+import gzip
+import io
+import json
+from datetime import datetime
+
+from voice_assistant.nlu.replay import replay
+
+
+def test_replay_reports_distribution_and_unmatched(tmp_path):
+    log = tmp_path / "log.jsonl.gz"
+    with gzip.open(log, "wt") as f:
+        for text in ["add task buy milk", "play music", "show my tasks", "Play  music", "add task walk"]:
+            f.write(json.dumps({"text": text, "user": "7"}) + "\n")
+        f.write("not json\n" + json.dumps({"path": "no text"}) + "\n")
+
+    output = io.StringIO()
+    report = replay([str(log)], batch_size=2, output=output, now=datetime(2026, 10, 17, 10, 0))
+
+    assert report["utterances"] == 5
+    assert report["intents"] == {"add_task": 2, "list_tasks": 1}
+    assert report["unmatched_rate"] == 0.4
+    assert report["top_unmatched"] == [("play music", 2)]
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert records[0]["user"] == "7" and records[0]["intent"]["name"] == "add_task"
+    assert records[1]["intent"] is None
@@ -0,0 +1,78 @@
+"""Tests for the streaming polyphase resampler."""
+import sys
+import types
+
+import numpy as np
+from scipy import signal
+
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.resample import PolyphaseResampler, ResamplingSource
+from voice_assistant.audio.sources import ArraySource, MicrophoneSource
+
+
+def _sine(rate, seconds=1.0, freq=440.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_streaming_matches_one_shot_resampling_for_any_block_sizes():
+    tone = _sine(44100)
+    resampler = PolyphaseResampler(44100, 16000, channels=2)
+    assert (resampler.in_block, resampler.frame_length) == (1323, 480)
+
+    frames = []
+    rng = np.random.default_rng(0)
+    stereo = np.stack([tone, tone], axis=1)
+    offset = 0
+    while offset < len(stereo):
+        size = int(rng.integers(1, 3000))
+        resampler.process(stereo[offset:offset + size], lambda f: frames.append(f.copy()))
+        offset += size
+
+    assert all(f.shape == (480, 1) for f in frames)
+    streamed = np.concatenate(frames)[:, 0]
+    reference = signal.resample_poly(tone, 160, 441, window=("kaiser", 5.0))
+    delay = round(resampler.delay * 16000)
+    overlap = min(len(streamed) - delay, len(reference)) - 100
+    assert np.abs(streamed[delay + 100:delay + overlap] - reference[100:overlap]).max() < 1e-5
+
+
+def test_capture_bus_converts_stereo_48k_to_16k_mono():
+    tone = _sine(48000, seconds=0.6)
+    bus = CaptureBus(ArraySource(np.stack([tone, np.zeros_like(tone)], axis=1), sample_rate=48000))
+    assert (bus.sample_rate, bus.source.channels) == (16000, 1)
+
+    received = []
+    with bus.subscribe("test", capacity=64) as subscription, bus:
+        while not subscription.finished:
+            frames = subscription.read_many(timeout=0.5)
+            if frames is not None:
+                received.append(frames.copy())
+    audio = np.concatenate(received).reshape(-1)
+    assert len(audio) == 20 * 480
+    # Downmixed to half amplitude, still a 440 Hz tone
+    assert 0.2 < np.abs(audio[480:]).max() / 32767 < 0.26
+    spectrum = np.abs(np.fft.rfft(audio[480:]))
+    assert abs(np.argmax(spectrum) * 16000 / len(audio[480:]) - 440) < 5
+
+
+def test_default_microphone_opens_at_its_native_format(monkeypatch):
+    devices = {None: {"default_samplerate": 48000.0, "max_input_channels": 2},
+               "interface": {"default_samplerate": 44100.0, "max_input_channels": 8}}
+    queried = []
+
+    def query_devices(device, kind):
+        queried.append((device, kind))
+        return devices[device]
+
+    monkeypatch.setitem(sys.modules, "sounddevice", types.SimpleNamespace(query_devices=query_devices))
+    bus = CaptureBus()
+    assert isinstance(bus.source, ResamplingSource)
+    mic = bus.source.source
+    assert isinstance(mic, MicrophoneSource)
+    assert (mic.sample_rate, mic.channels, mic.device) == (48000, 2, None)
+    assert (bus.sample_rate, bus.frame_length) == (16000, 480)
+
+    interface = MicrophoneSource.native("interface")
+    assert (interface.sample_rate, interface.channels) == (44100, 2)
+    assert queried == [(None, "input"), ("interface", "input")]
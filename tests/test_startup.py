@@ -0,0 +1,16 @@
+"""Tests for cold start profiling and lazy imports."""
+from voice_assistant import metrics, startup
+
+
+def test_api_server_import_defers_heavy_packages():
+    profile = startup.profile_import("voice_assistant.api.server")
+    loaded = set(profile["loaded"])
+    assert not loaded & {"scipy", "vosk", "sounddevice", "plyer", "torch", "transformers"}
+    assert "voice_assistant.api.streaming" in {entry["name"] for entry in profile["modules"]}
+    assert profile["wall_s"] > 0
+
+
+def test_steps_are_exported():
+    with startup.step("test_step"):
+        pass
+    assert 'balancebuddy_startup_seconds{step="test_step"}' in metrics.registry.render()
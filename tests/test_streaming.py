@@ -0,0 +1,179 @@
+"""Tests for the WebSocket PCM streaming endpoint."""
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from scipy import signal
+from starlette.websockets import WebSocketDisconnect
+
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant import metrics
+from voice_assistant.api.streaming import RecognizerPool, StreamingService, StreamSession
+
+
+class FakeSpotter:
+    """Hears the wake word a few frames into every utterance."""
+
+    def __init__(self):
+        self.frames = 0
+
+    def accept_frame(self, frame):
+        self.frames += 1
+        return self.frames == 5
+
+    def end_utterance(self):
+        self.reset()
+        return False
+
+    def reset(self):
+        self.frames = 0
+
+
+class FakeCommandRecognizer:
+    def AcceptWaveform(self, data):
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": "add task"})
+
+    def FinalResult(self):
+        return json.dumps({"text": "add task buy milk"})
+
+    def Reset(self):
+        pass
+
+
+def make_client(**options):
+    service = StreamingService(
+        wake_pool=RecognizerPool(FakeSpotter, lambda s: s.reset(), 1, "wake"),
+        command_pool=RecognizerPool(FakeCommandRecognizer, lambda r: r.Reset(), 1, "command"),
+        **options
+    )
+    app = FastAPI()
+
+    @app.websocket("/stream")
+    async def stream(websocket: WebSocket):
+        await service.handle(websocket)
+
+    return service, TestClient(app)
+
+
+def stream_recording(client, audio, sample_rate, chunk_ms=20):
+    events = []
+    with client.websocket_connect(f"/stream?sample_rate={sample_rate}") as ws:
+        events.append(ws.receive_json())
+        chunk = sample_rate * chunk_ms // 1000
+        for start in range(0, len(audio), chunk):
+            ws.send_bytes(audio[start:start + chunk].astype("<i2").tobytes())
+        ws.send_text(json.dumps({"type": "end"}))
+        while events[-1]["type"] != "done":
+            events.append(ws.receive_json())
+    return events
+
+
+@pytest.mark.parametrize("sample_rate", [16000, 48000])
+def test_stream_yields_wake_transcript_and_intent(sample_rate):
+    audio, rate = load_wav("test_recording.wav")
+    if sample_rate != rate:
+        audio = signal.resample_poly(audio.astype(np.float64), sample_rate, rate).astype(np.int16)
+    service, client = make_client()
+    with client:
+        events = stream_recording(client, audio, sample_rate)
+
+    kinds = [event["type"] for event in events]
+    assert kinds[0] == "ready"
+    assert "wake" in kinds and "partial" in kinds
+    intent = next(event["intent"] for event in events if event["type"] == "intent")
+    assert intent["name"] == "add_task"
+    assert intent["params"]["task_description"] == "buy milk"
+    # Every lease went back to its pool
+    assert service.wake_pool.in_use == service.command_pool.in_use == 0
+    assert service.active == 0
+
+
+def test_oversized_message_closes_connection():
+    _, client = make_client(max_message_bytes=1024)
+    with client, client.websocket_connect("/stream") as ws:
+        ws.receive_json()
+        ws.send_bytes(bytes(2048))
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1009
+
+
+def test_connection_limit_and_bad_rate_are_rejected():
+    _, client = make_client(max_connections=0)
+    with client, client.websocket_connect("/stream") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1013
+
+    _, client = make_client()
+    with client, client.websocket_connect("/stream?sample_rate=12345") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1008
+
+
+class BrokenSocket:
+    """Sends one chunk of audio, then the connection fails."""
+
+    query_params = {}
+
+    def __init__(self):
+        self.received = 0
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        pass
+
+    async def receive(self):
+        self.received += 1
+        if self.received == 1:
+            return {"type": "websocket.receive", "bytes": bytes(960)}
+        await asyncio.sleep(0.05)
+        raise RuntimeError("connection reset")
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+def test_failed_receive_waits_for_decoding_before_release(monkeypatch):
+    to_frames, release = StreamSession._to_frames, StreamSession.release
+    steps, released_after = [], []
+
+    def slow_to_frames(self, data):
+        time.sleep(0.3)  # still decoding on a worker thread when the receive fails
+        steps.append(data)
+        return to_frames(self, data)
+
+    def recording_release(self):
+        released_after.append(len(steps))
+        release(self)
+
+    monkeypatch.setattr(StreamSession, "_to_frames", slow_to_frames)
+    monkeypatch.setattr(StreamSession, "release", recording_release)
+    service, _ = make_client()
+    websocket = BrokenSocket()
+    asyncio.run(service.handle(websocket))
+
+    assert released_after == [1]
+    assert websocket.close_code == 1011
+    assert service.active == 0
+
+
+def test_services_report_metrics_under_their_own_label():
+    first, _ = make_client(name="first")
+    second, _ = make_client(name="second")
+    second.active = 3
+    text = metrics.registry.render()
+    assert 'balancebuddy_stream_connections{service="first"} 0' in text
+    assert 'balancebuddy_stream_connections{service="second"} 3' in text
+    assert text.count('# TYPE balancebuddy_stream_connections gauge') == 1
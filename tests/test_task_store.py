@@ -0,0 +1,60 @@
+"""Tests for task storage and the due-reminder query."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from voice_assistant.db.database import Database
+from voice_assistant.task_manager import TaskManager
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(f"sqlite:///{tmp_path / 'tasks.db'}")
+
+
+def test_due_tasks_are_open_untriggered_and_ours(db):
+    due, later, done, fired = db.add_tasks([
+        ("due", NOW - timedelta(minutes=1)), ("later", NOW + timedelta(hours=1)),
+        ("done", NOW - timedelta(hours=1)), ("fired", NOW - timedelta(hours=2)),
+    ])
+    db.add_task("no reminder")
+    db.add_task("someone else's", NOW - timedelta(hours=3), user_id=7)
+    assert db.complete_tasks([done]) == 1
+    assert db.mark_reminders_triggered([fired, done]) == 2
+
+    assert [task["id"] for task in db.get_due_tasks(NOW)] == [due]
+    assert [task["title"] for task in db.get_due_tasks(NOW, user_id=7)] == ["someone else's"]
+    assert [task["title"] for task in db.get_tasks()] == ["due", "later", "fired", "no reminder"]
+    assert len(db.get_tasks(include_completed=True)) == 5
+
+
+def test_due_query_is_an_index_range_scan(db):
+    with db.engine.connect() as connection:
+        plan = connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE user_id IS NULL AND is_completed = 0 "
+            "AND reminder_triggered = 0 AND reminder_time <= '2026-10-17' ORDER BY reminder_time"
+        )).fetchall()
+    assert "USING INDEX ix_tasks_user_due" in plan[0][-1]
+    assert "reminder_time<" in plan[0][-1]
+
+
+def test_bulk_operations_count_only_changed_rows(db):
+    ids = db.add_tasks((f"task {i}", None) for i in range(1200))
+    assert ids == list(range(1, 1201))
+    assert db.complete_tasks(ids[:700]) == 700
+    assert db.complete_tasks(ids) == 500  # spans several IN chunks
+    assert not db.complete_task(ids[0])
+    assert not db.complete_task(99999)
+    assert db.add_tasks([]) == []
+
+
+def test_task_manager_commands(tmp_path):
+    manager = TaskManager(f"sqlite:///{tmp_path / 'tasks.db'}")
+    task_id = manager.add_task("stretch", NOW)
+    assert [task["title"] for task in manager.list_tasks()] == ["stretch"]
+    assert manager.complete_task(task_id)
+    assert manager.list_tasks() == []
+    manager.db.engine.dispose()
@@ -0,0 +1,111 @@
+"""Tests for scheduling many streams with the multi-process wake word engine."""
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from voice_assistant.audio.sources import ArraySource
+from voice_assistant.wake_word.engine import WakeWordEngine
+
+FRAME = 480
+WAKE = 99  # a frame at this level is the wake word
+STEP = 100  # samples are level * STEP; the capture bus may round them by one
+
+
+class StubProcessor:
+    """Wakes on marker frames; fails if another stream's audio shows up."""
+
+    def __init__(self, config):
+        self.detector = SimpleNamespace(frame_duration=30, frames_processed=0)
+        self.callback = None
+        self.level = None
+        self.delay = config.get("delay", 0.0)
+
+    def process_frames(self, frames):
+        for frame in frames:
+            value = round(int(frame[0]) / STEP)
+            self.detector.frames_processed += 1
+            if value == WAKE:
+                self.callback(None)
+            elif self.level is None:
+                self.level = value
+            elif value != self.level:
+                raise RuntimeError(f"Stream at {self.level} got a frame at {value}")
+        time.sleep(self.delay * len(frames))
+
+    def finish_stream(self):
+        pass
+
+
+def stream_audio(level, frames, wakes=()):
+    audio = np.full((frames, FRAME), level * STEP, dtype=np.int16)
+    for index in wakes:
+        audio[index] = WAKE * STEP
+    return ArraySource(audio.reshape(-1))
+
+
+@pytest.fixture
+def engine():
+    engine = WakeWordEngine(workers=2, processor_factory=StubProcessor, quantum_frames=8)
+    engine.start()
+    yield engine
+    engine.stop()
+
+
+def test_streams_keep_their_own_state(engine):
+    detections = []
+    engine.callback = lambda stream_id, offset: detections.append((stream_id, round(offset, 2)))
+    engine.add_stream("a", stream_audio(1, 200, wakes=[49]))
+    engine.add_stream("b", stream_audio(2, 120, wakes=[9, 99]))
+    engine.add_stream("c", stream_audio(3, 80))
+    assert engine.wait(timeout=10)
+    time.sleep(0.1)  # the result thread delivers detections after the chunk
+
+    assert sorted(detections) == [("a", 1.5), ("b", 0.3), ("b", 3.0)]
+    stats = engine.stats()
+    assert {stream: stats[stream]["frames"] for stream in stats} == {"a": 200, "b": 120, "c": 80}
+    assert sorted(stats["b"]["detections"]) == [0.3, 3.0]
+    assert stats["a"]["worker"] != stats["b"]["worker"]  # spread over both workers
+    for stream in stats.values():
+        assert stream["dropped"] == 0
+        assert stream["audio_s"] == pytest.approx(stream["frames"] * 0.03)
+        assert stream["latency"]["count"] == stream["compute"]["count"] >= stream["frames"] / 8
+        assert stream["queue_wait"]["p50_ms"] >= 0
+
+
+def test_round_robin_does_not_starve_short_streams():
+    engine = WakeWordEngine(workers=1, processor_factory=StubProcessor, quantum_frames=8)
+    engine.config["delay"] = 0.0005  # per frame
+    with engine:
+        engine.add_stream("long", stream_audio(1, 2000))
+        shorts = [engine.add_stream(name, stream_audio(level, 80))
+                  for name, level in (("short1", 2), ("short2", 3))]
+        assert all(engine._streams[name].ended.wait(10) for name in ("short1", "short2"))
+        long_frames = engine.stats()["long"]["frames"]
+        assert engine.wait(timeout=20)
+        stats = engine.stats()
+    assert all(bus.finished for bus in shorts)
+    # The short streams finished while the long one was still far from done
+    assert long_frames < 2000 / 4
+    assert stats["long"]["frames"] == 2000
+
+
+def test_removed_and_ended_streams_are_cleaned_up(engine):
+    detections = []
+    engine.callback = lambda stream_id, offset: detections.append((stream_id, round(offset, 2)))
+    bus = engine.add_stream("a", stream_audio(1, 100, wakes=[19]))
+    assert engine.wait(timeout=10)
+    with pytest.raises(ValueError):
+        engine.add_stream("a", stream_audio(1, 10))
+
+    engine.remove_stream("a")
+    assert "a" not in engine.stats() and not bus.is_running
+    engine.remove_stream("a")  # already gone
+
+    # Same id, different audio: the worker starts it from a fresh processor
+    engine.add_stream("a", stream_audio(5, 50, wakes=[4]))
+    assert engine.wait(timeout=10)
+    time.sleep(0.1)
+    assert detections == [("a", 0.6), ("a", 0.15)]
+    assert engine.stats()["a"]["frames"] == 50
@@ -0,0 +1,29 @@
+"""Tests for wake phrase expansion and matching."""
+from voice_assistant.wake_word.matcher import WakePhraseMatcher, expand_wake_phrases
+
+
+def _matcher(*phrases):
+    return WakePhraseMatcher(phrases, expand_wake_phrases(phrases))
+
+
+def test_expansion_has_no_duplicates_across_phrases():
+    variants = expand_wake_phrases(["hey buddy", "hello  buddy", "Hey Buddy"])
+    assert len(variants) == len(set(variants))
+    assert variants[:3] == ["hey buddy", "heybuddy", "buddy"]
+    assert "hello buddy" in variants and "hi buddy" in variants
+
+
+def test_matches_whole_words_only():
+    matcher = _matcher("hey buddy")
+    assert matcher.match("hey buddy") == ("exact", "hey buddy")
+    assert matcher.match("well hi buddy there") == ("variant", "hi buddy")
+    assert matcher.match("somebody said anybody") is None
+
+
+def test_close_matches_within_one_word():
+    matcher = _matcher("ok balance helper")
+    assert matcher.match("ok balance helpers") == ("close", "ok balance helper")  # substitution
+    assert matcher.match("say ok balance") == ("close", "ok balance helper")  # deletion
+    assert matcher.find_close("ok my balance helper".split()) == "ok balance helper"  # insertion
+    assert matcher.match("ok balance helpers", allow_close=False) is None
+    assert matcher.match("okay my balance") is None
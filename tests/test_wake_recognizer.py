@@ -0,0 +1,167 @@
+"""Tests for streaming wake word recognition, without a Vosk model."""
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from benchmarks.wake_word_rtf import load_wav
+from voice_assistant.wake_word import recognizer as recognizer_module
+from voice_assistant.wake_word.detector import WakeWordDetector
+from voice_assistant.wake_word.processor import WakeWordProcessor
+from voice_assistant.wake_word.recognizer import WakeWordRecognizer
+
+# Frames carry a word code in their first sample; 0 is silence
+WORDS = {1: "hey", 2: "buddy", 3: "what", 4: "time", 5: "bunny"}
+ENDPOINT = 9  # Vosk finds an endpoint at this frame
+
+
+class FakeVosk:
+    """Decodes word-coded frames like a KaldiRecognizer decodes speech."""
+
+    def __init__(self):
+        self.heard = []
+        self.frames = []  # frames fed since the last reset
+        self.utterances = []  # frames fed between resets
+
+    def AcceptWaveform(self, data):
+        code = int(np.frombuffer(data, dtype=np.int16)[0])
+        self.frames.append(code)
+        if code in WORDS:
+            self.heard.append(WORDS[code])
+        return code == ENDPOINT
+
+    def Result(self):
+        text, self.heard = " ".join(self.heard), []
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.heard)})
+
+    def FinalResult(self):
+        return self.Result()
+
+    def Reset(self):
+        self.heard = []
+        self.utterances.append(len(self.frames))
+        self.frames = []
+
+
+@pytest.fixture
+def fake_model(tmp_path, monkeypatch):
+    def new_recognizer(path, rate, grammar):
+        recognizer = FakeVosk()
+        recognizer.grammar = json.loads(grammar) if grammar else None
+        return recognizer
+
+    monkeypatch.setattr(recognizer_module, "get_model", lambda path: object())
+    monkeypatch.setattr(recognizer_module, "new_recognizer", new_recognizer)
+    return str(tmp_path)
+
+
+def add_graph(model_dir, words, lookahead=True):
+    graph = Path(model_dir) / "graph"
+    graph.mkdir()
+    (graph / "words.txt").write_text("".join(f"{word} {i}\n" for i, word in enumerate(words)))
+    for name in ("HCLr.fst", "Gr.fst") if lookahead else ("HCLG.fst",):
+        (graph / name).write_bytes(b"")
+
+
+def frame(code):
+    return np.full(480, code, dtype=np.int16)
+
+
+def test_partial_result_spots_the_wake_phrase_mid_utterance(fake_model):
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    hits = [recognizer.accept_frame(frame(code)) for code in (0, 1, 0, 0, 2)]
+    assert hits == [False, False, False, False, True]
+    assert recognizer.recognizer.utterances == []  # no reset within the utterance
+
+
+def test_close_matches_wait_for_the_final_result(fake_model):
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    # "hey bunny" is one word off: too loose for a changing partial
+    assert not any(recognizer.accept_frame(frame(code)) for code in (1, 5))
+    assert recognizer.end_utterance()
+    assert recognizer.recognizer.utterances == [2]
+
+
+def test_end_utterance_resets_for_the_next_one(fake_model):
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    for code in (3, 4):
+        recognizer.accept_frame(frame(code))
+    assert not recognizer.end_utterance()
+    assert recognizer.recognizer.utterances == [2]
+    # The first utterance's words don't leak into the second
+    assert recognizer.accept_frame(frame(2))
+    assert recognizer.recognizer.heard == ["buddy"]
+
+
+def test_endpoint_inside_an_utterance_checks_the_result(fake_model):
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    assert [recognizer.accept_frame(frame(code)) for code in (3, 4, ENDPOINT)] == [False, False, False]
+    assert [recognizer.accept_frame(frame(code)) for code in (1, 5, ENDPOINT)] == [False, False, True]
+
+
+def test_utterances_on_a_recording_span_every_burst(fake_model):
+    audio, sample_rate = load_wav("test_recording.wav")
+    silence = np.zeros(sample_rate, dtype=np.int16)
+    audio = np.concatenate([audio, silence, audio, silence])
+    detector = WakeWordDetector(sample_rate=sample_rate)
+    detector.debug = False
+    frames = audio[:len(audio) - len(audio) % detector.frame_length].reshape(-1, detector.frame_length)
+
+    utterances, bursts = [[]], []
+    detector.process_frames(
+        frames,
+        callback=lambda burst: bursts.append((len(utterances) - 1, len(burst) // detector.frame_length)),
+        frame_callback=lambda f: utterances[-1].append(detector.frames_processed),
+        end_callback=lambda: utterances.append([]),
+    )
+    utterances = utterances[:-1]
+
+    # One utterance per recording, each ending after the silence threshold
+    recording = (len(audio) // 2 - len(silence)) // detector.frame_length
+    hangover = int(detector.silence_threshold * 1000 / detector.frame_duration) + 1
+    assert len(utterances) == 2
+    assert recording <= utterances[0][-1] <= recording + hangover < utterances[1][0]
+    for positions in utterances:
+        assert positions == sorted(positions)
+    # Many bursts per utterance, all of their frames delivered in it
+    for index, positions in enumerate(utterances):
+        burst_frames = [length for utterance, length in bursts if utterance == index]
+        assert len(burst_frames) > 10
+        assert sum(burst_frames) <= len(positions)
+
+    # Streaming decodes each utterance with one recognizer, resetting in between
+    processor = WakeWordProcessor(model_path=fake_model, sample_rate=sample_rate, streaming=True)
+    processor.detector.debug = False
+    processor.process_frames(frames)
+    assert processor.recognizer.recognizer.utterances == [len(positions) for positions in utterances]
+
+
+def test_grammar_keeps_variants_the_model_can_spell(fake_model):
+    add_graph(fake_model, ["<eps>", "hey", "hi", "hello", "buddy", "body", "heybuddy"])
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    grammar = recognizer.recognizer.grammar
+    assert recognizer.use_grammar
+    assert grammar == recognizer.grammar
+    assert grammar[-1] == "[unk]"
+    # "budi", "buddie" and "hay" aren't words of the model
+    assert grammar[:-1] == ["hey buddy", "heybuddy", "buddy", "hi buddy", "hello buddy"]
+    # An everyday word widens the grammar too much, but still matches in text
+    assert "hey body" not in grammar and "hey body" in recognizer.wake_phrases
+
+
+def test_garbage_token_is_not_part_of_the_transcript(fake_model):
+    add_graph(fake_model, ["hey", "buddy"])
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    assert recognizer._clean_text("[unk] Hey [unk] buddy") == "hey buddy"
+
+
+def test_static_graph_models_decode_the_full_vocabulary(fake_model):
+    add_graph(fake_model, ["hey", "buddy"], lookahead=False)
+    recognizer = WakeWordRecognizer(model_path=fake_model)
+    assert not recognizer.use_grammar
+    assert recognizer.grammar is None and recognizer.recognizer.grammar is None
+    assert recognizer._clean_text("[unk] hey") == "[unk] hey"
@@ -1,11 +1,16 @@
 """FastAPI server for BalanceBuddy."""
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket
 from pydantic import BaseModel
 from datetime import datetime
 from typing import List, Optional
 
+from voice_assistant.api.streaming import StreamingService
+
 app = FastAPI(title="BalanceBuddy API")
 
+# Recognizer pools shared by all streaming clients; models load on first use
+streaming = StreamingService()
+
 class DailyPlan(BaseModel):
     date: datetime
     meals: dict
@@ -53,3 +58,8 @@ async def get_reminders(completed: Optional[bool] = None):
     if completed is None:
         return reminders
     return [r for r in reminders if r.completed == completed]
+
+@app.websocket("/stream")
+async def stream(websocket: WebSocket):
+    """Stream 16-bit PCM in, get wake, transcript and intent events back."""
+    await streaming.handle(websocket)
@@ -0,0 +1,604 @@
+"""Streaming voice recognition for thin clients over WebSocket.
+
+Phones and ESP32 satellites stream their microphone to ``/api/stream``
+instead of running Vosk themselves. Binary messages carry 16-bit
+little-endian mono PCM at the rate given by the ``sample_rate`` query
+parameter (16 kHz by default, other common rates are resampled). A text
+message ``{"type": "end"}`` finishes whatever is pending. The server answers
+with JSON events:
+
+    {"type": "ready", "sample_rate": 16000}
+    {"type": "wake", "offset": 2.31}               seconds into the stream
+    {"type": "partial", "text": "add task buy"}
+    {"type": "final", "text": "add task buy milk"}
+    {"type": "intent", "intent": {"name": "add_task", ...}}   null if none matched
+    {"type": "timeout"}                            no command followed the wake word
+    {"type": "busy"}                               no recognizer was free; utterance skipped
+    {"type": "done"}                               reply to "end"
+
+A connection only holds cheap state of its own: a ``WakeWordDetector`` for
+the energy gate and VAD, an ``Endpointer`` and a few buffers. Recognizers
+are the expensive part, so they live in two bounded pools shared by every
+connection, wake spotters and full-vocabulary command recognizers, and a
+connection leases one only while it decodes an utterance. VAD and decoding
+run on a thread pool, never on the event loop.
+
+Each connection buffers at most ``max_buffered_seconds`` of audio. Past
+that the server stops reading its socket until decoding catches up, so TCP
+flow control slows the client down instead of memory growing.
+"""
+import asyncio
+import itertools
+import json
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+from starlette.websockets import WebSocket
+
+from voice_assistant import metrics
+from voice_assistant.asr.models import DEFAULT_MODEL, default_model_path, new_recognizer
+from voice_assistant.audio.endpoint import END_OF_SPEECH, MAX_UTTERANCE, NO_SPEECH, Endpointer
+from voice_assistant.audio.resample import PolyphaseResampler
+from voice_assistant.wake_word.detector import WakeWordDetector
+
+# Client rates we resample from; others would need very long filter periods
+SUPPORTED_RATES = (8000, 11025, 16000, 22050, 24000, 32000, 44100, 48000)
+
+# WebSocket close codes (RFC 6455)
+CLOSE_POLICY = 1008
+CLOSE_TOO_BIG = 1009
+CLOSE_ERROR = 1011
+CLOSE_TRY_AGAIN = 1013
+
+# Every service in the process, for the scrape-time metrics collector
+_services = weakref.WeakSet()
+_service_ids = itertools.count()
+
+# Utterance events from the detector: (frame index in the batch, frame or None at the end)
+Events = List[Tuple[int, Optional[np.ndarray]]]
+
+
+class RecognizerPool:
+    """A bounded set of recognizers, each leased to one connection at a time.
+
+    Recognizers are created on demand up to ``size`` and reset when they are
+    returned, so every lease starts from a clean decoder state.
+
+    Args:
+        factory: Creates a recognizer; called on a worker thread
+        reset: Clears a returned recognizer
+        size: Most recognizers in existence at once
+        name: Label for the pool's metrics
+    """
+
+    def __init__(self, factory: Callable[[], Any], reset: Callable[[Any], None], size: int, name: str):
+        self.factory = factory
+        self.reset = reset
+        self.size = size
+        self.name = name
+        self._idle: List[Any] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None  # created on the serving loop
+
+        # Counters
+        self.created = 0
+        self.in_use = 0
+        self.timeouts = 0
+        self._wait_time = metrics.stage_histogram(f"{name}_pool_wait")
+
+    async def acquire(self, timeout: Optional[float] = None, executor=None) -> Optional[Any]:
+        """Lease a recognizer; None if none frees up within ``timeout`` seconds."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        self._wait_time.observe(loop.time() - started)
+
+        self.in_use += 1
+        if self._idle:
+            return self._idle.pop()
+        try:
+            recognizer = await loop.run_in_executor(executor, self.factory)
+        except BaseException:
+            self.in_use -= 1
+            self._semaphore.release()
+            raise
+        self.created += 1
+        return recognizer
+
+    def release(self, recognizer: Any):
+        """Return a leased recognizer to the pool."""
+        try:
+            self.reset(recognizer)
+            self._idle.append(recognizer)
+        except Exception as e:
+            print(f"⚠️  Dropping {self.name} recognizer that failed to reset: {e}")
+            self.created -= 1
+        finally:
+            self.in_use -= 1
+            self._semaphore.release()
+
+
+class StreamingService:
+    """Serves streaming connections from recognizer pools shared between them.
+
+    Args:
+        wake_phrases: Phrases that wake the assistant
+        sample_rate: Rate audio is decoded at; other client rates are resampled
+        wake_model_path: Vosk model for wake spotting; downloaded if not provided
+        command_model_path: Vosk model for commands; downloaded if not provided
+        wake_pool_size: Wake spotters shared by all connections
+        command_pool_size: Command recognizers shared by all connections
+        max_connections: Further connections are closed with 1013 (try again later)
+        max_message_bytes: Larger audio messages close the connection with 1009
+        max_buffered_seconds: Audio a connection may have waiting before the
+            server stops reading from it
+        max_session_seconds: Audio one connection may send in total
+        acquire_timeout: Seconds to wait for a free recognizer before
+            reporting ``busy`` and skipping the utterance
+        command_timeout: Seconds to wait for a command after the wake word
+        preroll: Seconds before the wake word detection handed to the command
+            recognizer, as the capture bus does locally
+        wake_pool: Pool to use instead of one built on Vosk
+        command_pool: Pool to use instead of one built on Vosk
+        name: Label of the service's metrics
+    """
+
+    def __init__(
+        self,
+        wake_phrases: Optional[List[str]] = None,
+        sample_rate: int = 16000,
+        wake_model_path: Optional[str] = None,
+        command_model_path: Optional[str] = None,
+        wake_pool_size: int = 4,
+        command_pool_size: int = 4,
+        max_connections: int = 256,
+        max_message_bytes: int = 64 * 1024,
+        max_buffered_seconds: float = 2.0,
+        max_session_seconds: float = 3600.0,
+        acquire_timeout: float = 2.0,
+        command_timeout: float = 5.0,
+        preroll: float = 0.2,
+        wake_pool: Optional[RecognizerPool] = None,
+        command_pool: Optional[RecognizerPool] = None,
+        name: Optional[str] = None,
+    ):
+        self.name = name or f"stream{next(_service_ids)}"
+        self.wake_phrases = wake_phrases or ["hey buddy"]
+        self.sample_rate = sample_rate
+        self.wake_model_path = wake_model_path
+        self.command_model_path = command_model_path
+        self.max_connections = max_connections
+        self.max_message_bytes = max_message_bytes
+        self.max_buffered_seconds = max_buffered_seconds
+        self.max_session_seconds = max_session_seconds
+        self.acquire_timeout = acquire_timeout
+        self.command_timeout = command_timeout
+        self.preroll = preroll
+
+        self.wake_pool = wake_pool or RecognizerPool(
+            self._new_wake_spotter, lambda spotter: spotter.reset(), wake_pool_size, "wake")
+        self.command_pool = command_pool or RecognizerPool(
+            self._new_command_recognizer, lambda recognizer: recognizer.Reset(), command_pool_size, "command")
+        # Decoding is bounded by the pools; the extra threads keep VAD moving
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.wake_pool.size + self.command_pool.size + 2,
+            thread_name_prefix="stream"
+        )
+
+        self.active = 0
+        self._connections = metrics.registry.counter(
+            "balancebuddy_stream_connections_total", "Streaming connections", result="accepted")
+        self._rejected = metrics.registry.counter(
+            "balancebuddy_stream_connections_total", "Streaming connections", result="rejected")
+        self.backpressure = metrics.registry.counter(
+            "balancebuddy_stream_backpressure_total", "Times a connection stopped being read")
+        _services.add(self)
+
+    def _new_wake_spotter(self):
+        from voice_assistant.wake_word.recognizer import WakeWordRecognizer
+        return WakeWordRecognizer(
+            wake_phrases=self.wake_phrases,
+            model_path=self.wake_model_path,
+            sample_rate=self.sample_rate
+        )
+
+    def _new_command_recognizer(self):
+        if self.command_model_path is None:
+            self.command_model_path = default_model_path(DEFAULT_MODEL)
+        return new_recognizer(self.command_model_path, self.sample_rate)
+
+    async def handle(self, websocket: WebSocket):
+        """Serve one connection until the client leaves or breaks a limit."""
+        await websocket.accept()
+        if self.active >= self.max_connections:
+            self._rejected.inc()
+            await websocket.close(CLOSE_TRY_AGAIN, "Server is at its connection limit")
+            return
+        try:
+            sample_rate = int(websocket.query_params.get("sample_rate", self.sample_rate))
+        except ValueError:
+            sample_rate = 0
+        if sample_rate not in SUPPORTED_RATES:
+            self._rejected.inc()
+            await websocket.close(CLOSE_POLICY, f"sample_rate must be one of {SUPPORTED_RATES}")
+            return
+
+        self._connections.inc()
+        self.active += 1
+        session = StreamSession(self, websocket, sample_rate)
+        try:
+            await session.run()
+        finally:
+            self.active -= 1
+            session.release()
+
+
+class StreamSession:
+    """One connection: turns its audio into wake, transcript and intent events."""
+
+    def __init__(self, service: StreamingService, websocket: WebSocket, sample_rate: int):
+        self.service = service
+        self.websocket = websocket
+        self.sample_rate = sample_rate
+
+        self.detector = WakeWordDetector(sample_rate=service.sample_rate)
+        self.detector.debug = False
+        self.frame_length = self.detector.frame_length
+        self.frame_seconds = self.detector.frame_duration / 1000
+        self.endpointer = Endpointer(
+            sample_rate=service.sample_rate,
+            frame_duration=self.detector.frame_duration,
+            no_speech_timeout=service.command_timeout,
+            holdoff=service.preroll
+        )
+        self.resampler = None
+        if sample_rate != service.sample_rate:
+            self.resampler = PolyphaseResampler(sample_rate, service.sample_rate, 1, self.detector.frame_duration)
+        self.intent_recognizer = None
+
+        # Audio handed from the receiving task to the decoding task
+        self._inbox = deque()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._buffered_bytes = 0
+        self._received_bytes = 0
+        self._pending = bytearray()  # bytes short of a whole frame
+        self._preroll_frames = round(service.preroll / self.frame_seconds)
+        self._recent = np.zeros((0, self.frame_length), dtype=np.int16)
+
+        # Stream state
+        self.position = 0  # frames decoded since connecting
+        self.mode = "wake"
+        self.wake_lease = None
+        self.command_lease = None
+        self._busy = False  # the current utterance got no spotter
+        self._heard: List[str] = []
+        self._last_partial = ""
+        self.closed = False
+        self._in_flight = None  # executor step of the decoder, if any
+
+        self._wake_asr_time = metrics.stage_histogram("stream_wake_asr")
+        self._command_asr_time = metrics.stage_histogram("stream_command_asr")
+
+    async def run(self):
+        await self.send({"type": "ready", "sample_rate": self.sample_rate})
+        receiver = asyncio.ensure_future(self._receive())
+        decoder = asyncio.ensure_future(self._decode())
+        try:
+            done, _ = await asyncio.wait({receiver, decoder}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # However the session ends (even cancelled or with the receiver
+            # failing), stop both tasks before the leases are released
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+            await self._stop_decoder(decoder)
+
+        close = None
+        if decoder in done:
+            if not decoder.cancelled() and decoder.exception() is not None:
+                print(f"❌ Streaming session failed: {decoder.exception()}")
+                close = (CLOSE_ERROR, "Recognition failed")
+        elif receiver.exception() is not None:
+            print(f"❌ Streaming session failed: {receiver.exception()}")
+            close = (CLOSE_ERROR, "Receiving failed")
+        else:
+            close = receiver.result()
+        if close is not None:
+            try:
+                await self.websocket.close(*close)
+            except Exception:
+                pass
+
+    async def _stop_decoder(self, decoder: asyncio.Future):
+        """Cancel the decoder and wait until no worker thread is decoding for us.
+
+        Cancelling the task doesn't stop a step already running on the
+        executor, which may be using our recognizers, so that is awaited too.
+        """
+        self.closed = True
+        decoder.cancel()
+        await asyncio.gather(decoder, return_exceptions=True)
+        if self._in_flight is not None:
+            await asyncio.gather(asyncio.wrap_future(self._in_flight), return_exceptions=True)
+
+    def release(self):
+        """Give leased recognizers back; the session must be idle."""
+        if self.wake_lease is not None:
+            self.service.wake_pool.release(self.wake_lease)
+            self.wake_lease = None
+        if self.command_lease is not None:
+            self.service.command_pool.release(self.command_lease)
+            self.command_lease = None
+
+    async def send(self, event: dict):
+        if self.closed:
+            return
+        try:
+            await self.websocket.send_text(json.dumps(event))
+        except Exception:
+            self.closed = True  # the client is gone
+
+    async def _receive(self) -> Optional[Tuple[int, str]]:
+        """Read client messages into the inbox; returns a close code if a limit is broken."""
+        service = self.service
+        buffer_limit = service.max_buffered_seconds * self.sample_rate * 2
+        session_limit = service.max_session_seconds * self.sample_rate * 2
+        while True:
+            # Backpressure: don't read more until decoding has caught up
+            if self._buffered_bytes >= buffer_limit:
+                service.backpressure.inc()
+                while self._buffered_bytes >= buffer_limit:
+                    self._space.clear()
+                    await self._space.wait()
+
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return None
+            data = message.get("bytes")
+            if data is not None:
+                if len(data) > service.max_message_bytes:
+                    return CLOSE_TOO_BIG, f"Audio messages are limited to {service.max_message_bytes} bytes"
+                self._received_bytes += len(data)
+                if self._received_bytes > session_limit:
+                    return CLOSE_POLICY, f"Sessions are limited to {service.max_session_seconds:.0f} s of audio"
+                self._buffered_bytes += len(data)
+                self._inbox.append(data)
+            else:
+                try:
+                    control = json.loads(message.get("text") or "{}")
+                except ValueError:
+                    control = {}
+                if control.get("type") != "end":
+                    return CLOSE_POLICY, 'Text messages must be {"type": "end"}'
+                self._inbox.append(None)
+            self._ready.set()
+
+    async def _next(self):
+        """Everything received so far as one batch of bytes, or None for "end"."""
+        while not self._inbox:
+            if self.closed:
+                raise asyncio.CancelledError
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            raise asyncio.CancelledError
+        item = self._inbox.popleft()
+        if item is None:
+            return None
+        parts = [item]
+        while self._inbox and self._inbox[0] is not None:
+            parts.append(self._inbox.popleft())
+        return b"".join(parts)
+
+    async def _decode(self):
+        try:
+            while True:
+                data = await self._next()
+                if data is None:
+                    await self._end_of_stream()
+                    continue
+                frames = await self._run(self._to_frames, data)
+                await self._process(frames)
+                self._buffered_bytes -= len(data)
+                self._space.set()
+        except asyncio.CancelledError:
+            pass  # connection closed
+
+    async def _run(self, func, *args):
+        self._in_flight = self.service.executor.submit(func, *args)
+        return await asyncio.wrap_future(self._in_flight)
+
+    def _to_frames(self, data: bytes) -> np.ndarray:
+        """Whole int16 frames at the service rate from the received bytes."""
+        self._pending += data
+        if self.resampler is None:
+            usable = len(self._pending) - len(self._pending) % (2 * self.frame_length)
+            frames = np.frombuffer(bytes(self._pending[:usable]), dtype="<i2").astype(np.int16)
+            del self._pending[:usable]
+            return frames.reshape(-1, self.frame_length)
+
+        usable = len(self._pending) - len(self._pending) % 2
+        block = np.frombuffer(bytes(self._pending[:usable]), dtype="<i2").astype(np.float32)
+        del self._pending[:usable]
+        block /= 32768
+        emitted = []
+        self.resampler.process(block[:, None], lambda frame: emitted.append(frame[:, 0].copy()))
+        if not emitted:
+            return np.zeros((0, self.frame_length), dtype=np.int16)
+        frames = np.clip(np.array(emitted) * 32767, -32768, 32767)
+        return frames.astype(np.int16)
+
+    async def _process(self, frames: np.ndarray):
+        if not len(frames):
+            return
+        self.position += len(frames)
+        if self.mode == "command":
+            await self._command(frames)
+        else:
+            events = await self._run(self._detect, frames)
+            detected = await self._spot(events)
+            if detected is not None:
+                await self._start_command(frames, detected)
+        if self._preroll_frames:
+            self._recent = np.concatenate([self._recent, frames])[-self._preroll_frames:]
+
+    async def _end_of_stream(self):
+        """Finish the pending utterance or command, then reply ``done``."""
+        if self.mode == "command":
+            await self._finish_command()
+        else:
+            events = await self._run(self._flush_detector)
+            if await self._spot(events) is not None:
+                await self.send({"type": "wake", "offset": round(self.position * self.frame_seconds, 3)})
+        self.detector.reset_stream()
+        await self.send({"type": "done"})
+
+    def _detect(self, frames: np.ndarray) -> Events:
+        """Gate and VAD; returns the frames and ends of utterances."""
+        events = []
+        base = self.detector.frames_processed
+        self.detector.process_frames(
+            frames,
+            frame_callback=lambda frame: events.append((self.detector.frames_processed - base - 1, frame.copy())),
+            end_callback=lambda: events.append((self.detector.frames_processed - base - 1, None))
+        )
+        return events
+
+    def _flush_detector(self) -> Events:
+        events = []
+        self.detector.flush(end_callback=lambda: events.append((-1, None)))
+        return events
+
+    async def _spot(self, events: Events) -> Optional[int]:
+        """Decode utterance frames with a leased spotter; index of a detection, if any."""
+        if self._busy:
+            # Skip the rest of an utterance we had no spotter for
+            ends = [i for i, (_, frame) in enumerate(events) if frame is None]
+            if not ends:
+                return None
+            events = events[ends[0] + 1:]
+            self._busy = False
+        if not events:
+            return None
+
+        if self.wake_lease is None:
+            if all(frame is None for _, frame in events):
+                return None
+            self.wake_lease = await self.service.wake_pool.acquire(
+                self.service.acquire_timeout, self.service.executor)
+            if self.wake_lease is None:
+                self._busy = events[-1][1] is not None
+                await self.send({"type": "busy"})
+                return None
+
+        detected, ended = await self._run(self._decode_wake, events)
+        if detected is not None or ended:
+            self.service.wake_pool.release(self.wake_lease)
+            self.wake_lease = None
+        return detected
+
+    def _decode_wake(self, events: Events) -> Tuple[Optional[int], bool]:
+        spotter = self.wake_lease
+        with self._wake_asr_time.time():
+            for index, frame in events:
+                # end_utterance resets the spotter for the next utterance
+                if spotter.end_utterance() if frame is None else spotter.accept_frame(frame):
+                    return index, True
+        return None, events[-1][1] is None
+
+    async def _start_command(self, frames: np.ndarray, index: int):
+        offset = (self.position - len(frames) + index + 1) * self.frame_seconds
+        await self.send({"type": "wake", "offset": round(offset, 3)})
+        self.detector.reset_stream()
+
+        self.command_lease = await self.service.command_pool.acquire(
+            self.service.acquire_timeout, self.service.executor)
+        if self.command_lease is None:
+            await self.send({"type": "busy"})
+            return
+        self.mode = "command"
+        self.endpointer.reset()
+        self._heard = []
+        self._last_partial = ""
+
+        # Start with a little audio from before the detection, as the capture bus pre-roll does
+        history = np.concatenate([self._recent, frames])
+        start = max(0, len(self._recent) + index + 1 - self._preroll_frames)
+        await self._command(history[start:])
+
+    async def _command(self, frames: np.ndarray):
+        if not len(frames):
+            return
+        partial, event = await self._run(self._decode_command, frames)
+        if partial:
+            await self.send({"type": "partial", "text": partial})
+        if event == NO_SPEECH:
+            await self.send({"type": "timeout"})
+            self._end_command()
+        elif event in (END_OF_SPEECH, MAX_UTTERANCE):
+            await self._finish_command()
+
+    def _decode_command(self, frames: np.ndarray) -> Tuple[str, Optional[str]]:
+        recognizer = self.command_lease
+        partial = ""
+        with self._command_asr_time.time():
+            if recognizer.AcceptWaveform(frames.tobytes()):
+                text = json.loads(recognizer.Result()).get("text", "").strip()
+                if text:
+                    self._heard.append(text)
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "").strip()
+        if partial == self._last_partial:
+            partial = ""
+        else:
+            self._last_partial = partial
+        return partial, self.endpointer.process(frames)
+
+    def _final_command(self) -> Tuple[str, Optional[dict]]:
+        with self._command_asr_time.time():
+            result = json.loads(self.command_lease.FinalResult())
+        text = " ".join(self._heard + [result.get("text", "")]).strip()
+        if not text:
+            return text, None
+        if self.intent_recognizer is None:
+            from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+            self.intent_recognizer = IntentRecognizer()
+        intent = self.intent_recognizer.recognize(text)
+        return text, asdict(intent) if intent else None
+
+    async def _finish_command(self):
+        text, intent = await self._run(self._final_command)
+        await self.send({"type": "final", "text": text})
+        await self.send({"type": "intent", "intent": intent})
+        self._end_command()
+
+    def _end_command(self):
+        self.service.command_pool.release(self.command_lease)
+        self.command_lease = None
+        self.mode = "wake"
+
+
+def _collect_metrics():
+    """Connections and recognizer pools of all live streaming services."""
+    for service in list(_services):
+        service_label = {"service": service.name}
+        yield ("balancebuddy_stream_connections", "gauge",
+               "Open streaming connections", service_label, service.active)
+        for pool in (service.wake_pool, service.command_pool):
+            labels = dict(service_label, pool=pool.name)
+            yield ("balancebuddy_stream_pool_in_use", "gauge", "Recognizers leased out", labels, pool.in_use)
+            yield ("balancebuddy_stream_pool_size", "gauge", "Recognizers allowed per pool", labels, pool.size)
+            yield ("balancebuddy_stream_pool_timeouts", "counter",
+                   "Utterances skipped for want of a recognizer", labels, pool.timeouts)
+
+
+metrics.registry.register_collector(_collect_metrics)
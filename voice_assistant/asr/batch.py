@@ -0,0 +1,156 @@
+"""Batch transcription of recorded commands.
+
+Decodes a directory or manifest of WAV files across a process pool, runs
+``IntentRecognizer.recognize`` on every transcript and writes one JSON line
+per file, in input order so runs can be diffed after changing intent
+patterns. Workers share the preloaded model (see ``process_pool``) and keep
+one intent recognizer each.
+
+    python -m voice_assistant.asr.batch recordings/ --output results.jsonl
+    python -m voice_assistant.asr.batch manifest.jsonl --workers 8 --model ~/.cache/vosk/vosk-model-en-us-0.22
+
+A manifest is a text file with one path per line, or JSONL with a ``path``
+field; other fields are copied into the output. Relative paths are resolved
+against the manifest's directory.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import wave
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from voice_assistant.asr.models import DEFAULT_MODEL, default_model_path, new_recognizer, process_pool
+from voice_assistant.metrics import summarize
+
+# Audio handed to the recognizer per call
+CHUNK_SECONDS = 0.5
+
+_intent_recognizer = None  # one per worker process
+
+
+def collect_inputs(path: str) -> List[Dict[str, str]]:
+    """Input records (at least a ``path``) from a directory or manifest."""
+    root = Path(path)
+    if root.is_dir():
+        return [{"path": str(p)} for p in sorted(root.rglob("*.wav"))]
+
+    records = []
+    with open(root, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            record = json.loads(line) if line.startswith("{") else {"path": line}
+            if not os.path.isabs(record["path"]):
+                record["path"] = str(root.parent / record["path"])
+            records.append(record)
+    return records
+
+
+def _read_wav(path: str):
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+            raise ValueError("expected 16-bit mono WAV")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def _recognize_intent(text: str) -> Optional[dict]:
+    global _intent_recognizer
+    if _intent_recognizer is None:
+        from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+        _intent_recognizer = IntentRecognizer()
+    intent = _intent_recognizer.recognize(text)
+    return asdict(intent) if intent else None
+
+
+def transcribe_file(record: Dict[str, str], model_path: str, with_intents: bool = True) -> dict:
+    """Decode one WAV file and extract its intent; errors are reported, not raised."""
+    result = dict(record)
+    start = time.perf_counter()
+    try:
+        audio, sample_rate = _read_wav(record["path"])
+        recognizer = new_recognizer(model_path, sample_rate)  # model is shared in this worker
+
+        texts = []
+        chunk_bytes = int(sample_rate * CHUNK_SECONDS) * 2
+        for offset in range(0, len(audio), chunk_bytes):
+            if recognizer.AcceptWaveform(audio[offset:offset + chunk_bytes]):
+                texts.append(json.loads(recognizer.Result()).get("text", ""))
+        texts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        decoded = time.perf_counter()
+
+        result["text"] = " ".join(t for t in texts if t).strip()
+        result["audio_s"] = len(audio) / 2 / sample_rate
+        result["decode_ms"] = (decoded - start) * 1000
+        if with_intents:
+            result["intent"] = _recognize_intent(result["text"]) if result["text"] else None
+            result["intent_ms"] = (time.perf_counter() - decoded) * 1000
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["latency_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def transcribe_all(
+    records: List[Dict[str, str]],
+    model_path: str,
+    workers: Optional[int] = None,
+    with_intents: bool = True
+) -> Iterator[dict]:
+    """Transcribe records across a process pool, yielding results in input order."""
+    with process_pool([model_path], max_workers=workers) as pool:
+        chunksize = max(1, len(records) // ((workers or os.cpu_count() or 1) * 8))
+        yield from pool.map(
+            transcribe_file,
+            records,
+            [model_path] * len(records),
+            [with_intents] * len(records),
+            chunksize=chunksize
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="Directory of WAV files or a manifest (.txt / .jsonl)")
+    parser.add_argument("--output", default="transcripts.jsonl", help="JSONL file to write")
+    parser.add_argument("--model", help="Vosk model path (defaults to the downloaded command model)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--no-intents", action="store_true", help="Only transcribe")
+    args = parser.parse_args(argv)
+
+    records = collect_inputs(args.input)
+    if not records:
+        print(f"❌ No WAV files found in {args.input}")
+        return 1
+    model_path = args.model or default_model_path(DEFAULT_MODEL)
+
+    print(f"🎧 Transcribing {len(records)} files...")
+    start = time.perf_counter()
+    latencies, audio_s, errors = [], 0.0, 0
+    with open(args.output, "w", encoding="utf-8") as out:
+        for result in transcribe_all(records, model_path, args.workers, not args.no_intents):
+            out.write(json.dumps(result) + "\n")
+            latencies.append(result["latency_ms"] / 1000)
+            audio_s += result.get("audio_s", 0.0)
+            if "error" in result:
+                errors += 1
+                print(f"⚠️  {result['path']}: {result['error']}")
+    wall = time.perf_counter() - start
+
+    stats = summarize(latencies)
+    print(f"\n📊 {len(records)} files ({audio_s:.1f} s of audio) in {wall:.2f} s")
+    print(f"Files/sec:     {len(records) / wall:.1f}")
+    print(f"Real-time x:   {wall / audio_s:.4f}" if audio_s else "Real-time x:   n/a")
+    print(f"Per file:      p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms, "
+          f"p99 {stats['p99_ms']:.0f} ms, max {stats['max_ms']:.0f} ms")
+    print(f"Errors:        {errors}")
+    print(f"✅ Results written to {args.output}")
+    return 0 if errors < len(records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
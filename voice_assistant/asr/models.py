@@ -0,0 +1,200 @@
+"""Process-wide registry of Vosk models.
+
+Loading ``vosk-model-en-us-0.22`` takes seconds and well over a gigabyte of
+RAM, while a ``KaldiRecognizer`` on top of a loaded model is cheap. Every
+component therefore asks this registry for models and recognizers instead of
+constructing ``Model`` itself: each model directory is loaded at most once per
+process, lazily, and concurrent first requests wait for the same load.
+
+Worker processes share models through ``fork``: preload in the parent, then
+start the pool with ``process_pool`` so children inherit the loaded model pages
+copy-on-write instead of reading their own copy.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+# Full-vocabulary model, used for command decoding
+DEFAULT_MODEL = "vosk-model-en-us-0.22"
+# Small model with a runtime-composable graph, used for grammar wake spotting
+DEFAULT_SPOTTING_MODEL = "vosk-model-small-en-us-0.15"
+
+MODEL_DIR = Path.home() / ".cache" / "vosk"
+
+
+def default_model_path(model_name: str = DEFAULT_MODEL) -> str:
+    """Return the path to a default Vosk model, downloading it if needed."""
+    import urllib.request
+    import zipfile
+
+    model_path = MODEL_DIR / model_name
+
+    if not model_path.exists():
+        print("\n📥 Downloading Vosk speech recognition model...")
+        print("This may take a few minutes depending on your internet speed.")
+        MODEL_DIR.mkdir(parents=True, exist_ok=True)
+
+        # Download and extract model
+        model_url = f"https://alphacephei.com/vosk/models/{model_name}.zip"
+        zip_path = MODEL_DIR / "model.zip"
+
+        try:
+            # Show download progress
+            def progress(count, block_size, total_size):
+                percent = int(count * block_size * 100 / total_size)
+                sys.stdout.write(f"\rDownloading: {percent}% [{percent * '=' + (100-percent) * ' '}]")
+                sys.stdout.flush()
+
+            urllib.request.urlretrieve(model_url, zip_path, reporthook=progress)
+            print("\n\n📦 Extracting model...")
+
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(MODEL_DIR)
+
+            zip_path.unlink()  # Remove zip file
+            print("✅ Model ready!\n")
+
+        except Exception as e:
+            print(f"\n❌ Error downloading model: {e}")
+            print("Please check your internet connection and try again.")
+            raise
+
+    return str(model_path)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB elsewhere
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class ModelRegistry:
+    """Loads each Vosk model once and hands out recognizers built on it."""
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self.load_stats: Dict[str, Dict[str, float]] = {}
+
+    def get_model(self, model_path: str):
+        """Return the shared ``vosk.Model`` for ``model_path``, loading it on first use."""
+        key = os.path.realpath(model_path)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        # One lock per path, so loading one model doesn't block another
+        with self._lock:
+            path_lock = self._path_locks.setdefault(key, threading.Lock())
+        with path_lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key)
+                self._models[key] = model
+        return model
+
+    def new_recognizer(
+        self,
+        model_path: str,
+        sample_rate: int = 16000,
+        grammar: Optional[str] = None
+    ):
+        """Create a ``KaldiRecognizer`` on the shared model.
+
+        Args:
+            model_path: Vosk model directory
+            sample_rate: Audio sample rate in Hz
+            grammar: Optional JSON list of phrases to restrict decoding to
+        """
+        from vosk import KaldiRecognizer
+
+        model = self.get_model(model_path)
+        if grammar is None:
+            return KaldiRecognizer(model, sample_rate)
+        return KaldiRecognizer(model, sample_rate, grammar)
+
+    def preload(self, model_paths: Iterable[str]):
+        """Load models eagerly, e.g. before forking worker processes."""
+        for model_path in model_paths:
+            self.get_model(model_path)
+
+    def is_loaded(self, model_path: str) -> bool:
+        return os.path.realpath(model_path) in self._models
+
+    def clear(self):
+        """Drop all models; recognizers already created keep theirs alive."""
+        with self._lock:
+            self._models.clear()
+            self._path_locks.clear()
+            self.load_stats.clear()
+
+    def _load(self, model_path: str):
+        from vosk import Model
+
+        if not os.path.exists(model_path):
+            raise ValueError(f"Model path does not exist: {model_path}")
+
+        print(f"🎯 Loading speech recognition model {Path(model_path).name}...")
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        model = Model(model_path)
+        stats = {
+            "load_s": time.perf_counter() - start,
+            "rss_mb": current_rss_mb() - rss_before,
+        }
+        self.load_stats[model_path] = stats
+        print(f"✅ Model loaded in {stats['load_s']:.1f} s (+{stats['rss_mb']:.0f} MB RSS)\n")
+        return model
+
+
+registry = ModelRegistry()
+
+
+def get_model(model_path: str):
+    """Shared ``vosk.Model`` for ``model_path`` from the process-wide registry."""
+    return registry.get_model(model_path)
+
+
+def new_recognizer(model_path: str, sample_rate: int = 16000, grammar: Optional[str] = None):
+    """New ``KaldiRecognizer`` on the process-wide shared model."""
+    return registry.new_recognizer(model_path, sample_rate, grammar)
+
+
+def _init_worker(model_paths: List[str]):
+    # With fork the models are already here; with spawn each worker loads
+    # its own copy once, up front, instead of on the first task
+    registry.preload(model_paths)
+
+
+def process_pool(model_paths: Iterable[str], max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool whose workers share preloaded models.
+
+    Where ``fork`` is available the models are loaded in this process first and
+    the children inherit them copy-on-write, so N workers cost roughly one
+    model's worth of RAM. Elsewhere every worker loads its own copy on start.
+    """
+    model_paths = list(model_paths)
+    if "fork" in multiprocessing.get_all_start_methods():
+        registry.preload(model_paths)
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_paths,)
+    )
@@ -0,0 +1,250 @@
+"""One always-open capture stream fanned out to many consumers."""
+import itertools
+import threading
+import time
+import wave
+import weakref
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from voice_assistant import metrics
+from voice_assistant.audio.resample import ResamplingSource
+from voice_assistant.audio.ring import FrameRing
+from voice_assistant.audio.sources import AudioSource, MicrophoneSource
+
+# Every bus in the process, for the scrape-time metrics collector
+_buses = weakref.WeakSet()
+_bus_ids = itertools.count()
+
+
+class Subscription:
+    """A consumer's view of the bus: its own frame ring and read cursor.
+
+    Reads follow ``FrameRing`` semantics: frames are int16 views that stay
+    valid until the next read.
+    """
+
+    def __init__(self, bus: "CaptureBus", name: str, ring: FrameRing, preroll_frames: int):
+        self.bus = bus
+        self.name = name
+        self.ring = ring
+        self.preroll_frames = preroll_frames
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        return self.ring.read(timeout)
+
+    def read_many(
+        self,
+        max_frames: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        return self.ring.read_many(max_frames, timeout)
+
+    def __len__(self) -> int:
+        return len(self.ring)
+
+    @property
+    def finished(self) -> bool:
+        """True once no more audio can arrive and every buffered frame was read."""
+        return (self.ring.closed or self.bus.finished) and not len(self.ring)
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CaptureBus:
+    """Keeps one input stream open and copies every frame to each subscriber.
+
+    The audio callback converts each block to int16 once, keeps it in a short
+    history and writes it into every subscriber's ``FrameRing``. A subscriber
+    that joins later can ask for pre-roll from that history, so handing off
+    from wake word spotting to command recognition neither reopens the device
+    nor loses the first syllables.
+
+    Subscriptions are activated by the audio thread itself, which makes the
+    pre-roll copy and the first live frame strictly ordered without taking a
+    lock on every callback.
+
+    Sources that aren't mono at ``sample_rate`` (a 48 kHz stereo USB mic, a
+    44.1 kHz network feed) are wrapped in a ``ResamplingSource``. Without a
+    source, the default microphone is opened at its native format.
+    """
+
+    def __init__(
+        self,
+        source: Optional[AudioSource] = None,
+        sample_rate: int = 16000,
+        frame_duration: int = 30,  # ms
+        history_duration: float = 2.0,  # seconds kept for pre-roll
+        name: Optional[str] = None,  # label in metrics
+    ):
+        self.name = name or f"bus{next(_bus_ids)}"
+        self.source = source or MicrophoneSource.native()
+        if self.source.channels != 1 or self.source.sample_rate != sample_rate:
+            # Devices and feeds run at their native format; convert once here
+            self.source = ResamplingSource(self.source, sample_rate, frame_duration)
+        self.sample_rate = sample_rate
+        self.frame_duration = frame_duration
+        self.frame_length = int(self.sample_rate * frame_duration / 1000)
+
+        # Overwrite-oldest history for pre-roll, only touched by the audio thread
+        history_frames = max(1, int(history_duration * 1000 / frame_duration))
+        self.history = np.zeros((history_frames, self.frame_length), dtype=np.int16)
+        self._history_slots = list(self.history)  # prebuilt row views
+
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._pending = []
+        self._lock = threading.Lock()  # guards subscribe/unsubscribe only
+        self.is_running = False
+
+        # Counters
+        self.frames_captured = 0
+        self.stream_errors = 0
+        _buses.add(self)
+        self._capture_time = metrics.stage_histogram("capture")
+
+    @property
+    def finished(self) -> bool:
+        """True once an offline source has delivered all of its audio."""
+        return self.source.finished.is_set()
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self.source.open(self._on_audio, blocksize=self.frame_length).__enter__()
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        for subscriber in self._subscribers:
+            subscriber.ring.close()  # release producers waiting for space
+        self.source.__exit__(None, None, None)
+        with self._lock:
+            self._activate_pending()
+        for subscriber in self._subscribers:
+            subscriber.ring.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def subscribe(self, name: str, preroll: float = 0.0, capacity: int = 64) -> Subscription:
+        """Register a consumer.
+
+        Args:
+            name: Label used in stats
+            preroll: Seconds of already captured audio to deliver first
+            capacity: Frames the consumer may fall behind before frames drop
+        """
+        preroll_frames = int(preroll * 1000 / self.frame_duration)
+        ring = FrameRing(self.frame_length, capacity=max(capacity, preroll_frames + 2))
+        subscription = Subscription(self, name, ring, preroll_frames)
+        with self._lock:
+            self._pending.append(subscription)
+            if not self.is_running or self.finished:
+                self._activate_pending()
+            # Otherwise the audio thread activates it before its next frame
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._pending:
+                self._pending.remove(subscription)
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+        subscription.ring.close()
+
+    def _activate_pending(self):
+        """Seed new subscribers with pre-roll and start feeding them. Needs the lock."""
+        history_frames = len(self._history_slots)
+        for subscription in self._pending:
+            available = min(self.frames_captured, history_frames, subscription.preroll_frames)
+            for index in range(self.frames_captured - available, self.frames_captured):
+                subscription.ring.write(self._history_slots[index % history_frames])
+            if self.finished:
+                subscription.ring.close()  # nothing more will arrive
+        self._subscribers = self._subscribers + tuple(self._pending)
+        self._pending = []
+
+    def _on_audio(self, indata, frames, time_info, status):
+        if status:
+            self.stream_errors += 1
+            print(f"Error in audio stream: {status}")
+            return
+
+        started = time.perf_counter()
+        if self._pending:
+            with self._lock:
+                self._activate_pending()
+
+        frame = self._history_slots[self.frames_captured % len(self._history_slots)]
+        # Convert float32 to int16 once for every consumer
+        np.multiply(indata[:, 0], 32767, out=frame, casting="unsafe")
+        self.frames_captured += 1
+
+        live = self.source.live
+        for subscriber in self._subscribers:
+            ring = subscriber.ring
+            if not live:
+                ring.wait_for_space()  # offline sources wait for the slowest consumer
+            if not ring.closed:
+                ring.write(frame)
+        self._capture_time.observe(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-subscriber ring counters plus bus totals."""
+        stats = {subscriber.name: subscriber.ring.stats() for subscriber in self._subscribers}
+        stats["bus"] = {
+            "frames_captured": self.frames_captured,
+            "stream_errors": self.stream_errors,
+            "subscribers": len(self._subscribers),
+        }
+        return stats
+
+
+def _collect_metrics():
+    """Queue depths, drops and capture counters of all live buses."""
+    for bus in list(_buses):
+        bus_label = {"bus": bus.name}
+        yield ("balancebuddy_frames_captured_total", "counter",
+               "Frames captured by the bus", bus_label, bus.frames_captured)
+        yield ("balancebuddy_stream_errors_total", "counter",
+               "Audio callbacks reporting a stream error", bus_label, bus.stream_errors)
+        for subscriber in bus._subscribers:
+            labels = dict(bus_label, consumer=subscriber.name)
+            ring = subscriber.ring
+            yield ("balancebuddy_queue_depth_frames", "gauge",
+                   "Frames waiting in a consumer's ring", labels, len(ring))
+            yield ("balancebuddy_queue_high_water_frames", "gauge",
+                   "Deepest a consumer's ring has been", labels, ring.high_water)
+            yield ("balancebuddy_dropped_frames_total", "counter",
+                   "Frames dropped because a consumer fell behind", labels, ring.dropped)
+
+
+metrics.registry.register_collector(_collect_metrics)
+
+
+def record_wav(bus: CaptureBus, path: str, duration: float, preroll: float = 0.0):
+    """Record ``duration`` seconds from the bus into a 16-bit WAV file."""
+    frames_needed = int((duration + preroll) * 1000 / bus.frame_duration)
+    with bus.subscribe("recording", preroll=preroll) as subscription, wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(bus.sample_rate)
+        while frames_needed > 0 and not subscription.finished:
+            frames = subscription.read_many(max_frames=frames_needed, timeout=0.5)
+            if frames is None:
+                continue
+            wav.writeframes(frames.tobytes())
+            frames_needed -= len(frames)
@@ -0,0 +1,98 @@
+"""VAD endpointing for command capture.
+
+Decides when a spoken command is over, instead of waiting for the
+recognizer's own endpoint. All times are on the stream clock (frames seen
+times frame length), so a backlog of buffered frames is judged by the audio
+it contains, not by when it happened to be read.
+"""
+from typing import Optional
+
+import numpy as np
+import webrtcvad
+
+# Endpoint events
+END_OF_SPEECH = "end_of_speech"
+MAX_UTTERANCE = "max_utterance"
+NO_SPEECH = "no_speech"
+
+
+class Endpointer:
+    """Trailing-silence endpointer with a length cap and a no-speech timeout.
+
+    Args:
+        trailing_silence: Seconds of silence after speech that end the command
+        max_utterance: Longest command, counted from the first speech frame
+        no_speech_timeout: Give up if no speech starts within this many seconds
+        min_speech: Speech needed before an utterance counts as started, so a
+            click or a breath doesn't arm the endpointer
+        holdoff: Initial seconds that can't start an utterance, e.g. pre-roll
+            that still holds the end of the wake phrase
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_duration: int = 30,  # ms
+        vad_mode: int = 2,
+        trailing_silence: float = 0.5,
+        max_utterance: float = 10.0,
+        no_speech_timeout: float = 5.0,
+        min_speech: float = 0.09,
+        holdoff: float = 0.0,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_duration = frame_duration
+        self.vad = webrtcvad.Vad(vad_mode)
+        self.trailing_silence = trailing_silence
+        self.max_utterance = max_utterance
+        self.no_speech_timeout = no_speech_timeout
+        self.min_speech = min_speech
+        self.holdoff = holdoff
+        self.reset()
+
+    def reset(self):
+        self.stream_time = 0.0
+        self.speech_start: Optional[float] = None
+        self.last_speech: Optional[float] = None
+        self.event: Optional[str] = None
+        self._speech_run = 0
+
+    @property
+    def trailing_time(self) -> float:
+        """Seconds of audio since the last speech frame."""
+        return 0.0 if self.last_speech is None else self.stream_time - self.last_speech
+
+    def process(self, frames: np.ndarray) -> Optional[str]:
+        """Feed consecutive int16 frames; returns an endpoint event once one occurs."""
+        if self.event:
+            return self.event
+
+        frame_seconds = self.frame_duration / 1000
+        min_run = max(1, round(self.min_speech / frame_seconds))
+        for frame in frames:
+            self.stream_time += frame_seconds
+            try:
+                is_speech = self.vad.is_speech(frame.tobytes(), self.sample_rate)
+            except Exception as e:
+                print(f"VAD error: {e}")
+                is_speech = False
+
+            if is_speech and self.stream_time > self.holdoff:
+                self._speech_run += 1
+                self.last_speech = self.stream_time
+                if self.speech_start is None and self._speech_run >= min_run:
+                    self.speech_start = self.stream_time - self._speech_run * frame_seconds
+            else:
+                self._speech_run = 0
+
+            if self.speech_start is None:
+                if self.stream_time >= self.no_speech_timeout:
+                    self.event = NO_SPEECH
+            elif self.stream_time - self.last_speech >= self.trailing_silence:
+                self.event = END_OF_SPEECH
+            elif self.stream_time - self.speech_start >= self.max_utterance:
+                self.event = MAX_UTTERANCE
+
+            if self.event:
+                return self.event
+        return None
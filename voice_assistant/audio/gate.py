@@ -0,0 +1,119 @@
+"""Energy pre-gate with an adaptive noise floor.
+
+Runs ahead of webrtcvad. Frames whose energy is not clearly above the running
+noise-floor estimate skip VAD and ASR entirely. That matters on idle devices,
+where per-frame peak normalization would otherwise blow background noise up
+until VAD fires and the recognizer decodes nothing.
+"""
+from typing import Dict
+
+import numpy as np
+
+
+class EnergyGate:
+    """Tracks the noise floor in dBFS and opens only for louder frames.
+
+    The floor falls quickly to quieter frames and rises slowly, so short
+    bursts of speech barely move it while a change in room noise is picked up
+    within seconds. A hangover keeps the gate open briefly after the last loud
+    frame so word endings aren't cut off.
+    """
+
+    def __init__(
+        self,
+        frame_length: int,
+        margin_db: float = 6.0,  # frames must beat the floor by this much
+        min_level_db: float = -70.0,  # frames below this are always gated
+        fall_rate: float = 0.2,  # floor tracking speed towards quieter frames
+        rise_rate: float = 0.005,  # ~6 s time constant at 30 ms frames
+        hangover_frames: int = 8,
+        warmup_frames: int = 10,
+        max_batch: int = 64,
+    ):
+        self.frame_length = frame_length
+        self.margin_db = margin_db
+        self.min_level_db = min_level_db
+        self.fall_rate = fall_rate
+        self.rise_rate = rise_rate
+        self.hangover_frames = hangover_frames
+        self.warmup_frames = warmup_frames
+        self.noise_floor_db = None
+        self._hangover = 0
+        self._warmup = warmup_frames
+
+        self._allocate(max_batch)
+
+        # Counters
+        self.frames_seen = 0
+        self.frames_gated = 0
+        self.asr_frames_saved = 0
+
+    def _allocate(self, max_batch: int):
+        self._samples = np.zeros((max_batch, self.frame_length), dtype=np.float32)
+        self._levels = np.zeros(max_batch, dtype=np.float32)
+        self._open = np.zeros(max_batch, dtype=bool)
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """Classify a batch of int16 frames; returns True for frames to pass on.
+
+        Energies are computed for the whole batch at once. The returned mask
+        is a reused buffer, valid until the next call.
+        """
+        count = len(frames)
+        if count > len(self._samples):
+            self._allocate(count)
+        samples = self._samples[:count]
+        levels = self._levels[:count]
+        is_open = self._open[:count]
+
+        # Mean power per frame, in dB relative to full scale
+        np.copyto(samples, frames)
+        np.einsum("ij,ij->i", samples, samples, out=levels)
+        np.multiply(levels, 1.0 / (self.frame_length * 32768.0 ** 2), out=levels)
+        np.add(levels, 1e-10, out=levels)
+        np.log10(levels, out=levels)
+        np.multiply(levels, 10, out=levels)
+
+        for i, level in enumerate(levels.tolist()):
+            is_open[i] = self._update(level)
+
+        self.frames_seen += count
+        self.frames_gated += count - int(np.count_nonzero(is_open))
+        return is_open
+
+    def _update(self, level: float) -> bool:
+        floor = self.noise_floor_db
+        if floor is None:
+            floor = level
+        elif level < floor:
+            floor += self.fall_rate * (level - floor)
+        else:
+            floor += self.rise_rate * (level - floor)
+        self.noise_floor_db = floor
+
+        if self._warmup > 0:
+            self._warmup -= 1
+            return True  # no usable floor estimate yet
+
+        if level >= self.min_level_db and level > floor + self.margin_db:
+            self._hangover = self.hangover_frames
+            return True
+        if self._hangover > 0:
+            self._hangover -= 1
+            return True
+        return False
+
+    def reset(self):
+        """Forget the noise floor, e.g. when switching to another source."""
+        self.noise_floor_db = None
+        self._hangover = 0
+        self._warmup = self.warmup_frames
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_gated": self.frames_gated,
+            "vad_calls_saved": self.frames_gated,
+            "asr_frames_saved": self.asr_frames_saved,
+            "noise_floor_db": self.noise_floor_db,
+        }
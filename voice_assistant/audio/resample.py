@@ -0,0 +1,185 @@
+"""Streaming sample rate conversion and downmixing for capture devices.
+
+USB microphones and network feeds often deliver 44.1 or 48 kHz, sometimes in
+stereo, while VAD and recognition want 16 kHz mono in 30 ms frames. Asking
+PortAudio for 16 kHz either fails or resamples on the audio thread with no
+control over quality, so we open devices at their native format and convert
+here instead.
+
+``PolyphaseResampler`` is a stateful polyphase FIR (the same Kaiser-windowed
+design as ``scipy.signal.resample_poly``). Audio is processed one *period*
+at a time: the shortest span that holds a whole number of output frames and
+input samples, e.g. 1323 samples in and 480 out for 44.1 kHz to 16 kHz. Every
+period uses the same filter phases and input offsets, so they are computed
+once up front and each period is one gather plus one row-wise dot product
+into preallocated buffers.
+"""
+from fractions import Fraction
+from math import gcd
+from typing import Callable, Optional
+
+import numpy as np
+
+from voice_assistant.audio.sources import AudioSource
+
+
+class PolyphaseResampler:
+    """Converts ``(n, channels)`` blocks of any size into exact mono frames.
+
+    Args:
+        in_rate: Input sample rate in Hz
+        out_rate: Output sample rate in Hz
+        channels: Input channels, averaged into one
+        frame_duration: Output frame length in ms
+        half_width: Filter half-length in input samples at the lower rate;
+            longer is sharper and costs more
+        beta: Kaiser window shape parameter
+    """
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int = 16000,
+        channels: int = 1,
+        frame_duration: int = 30,
+        half_width: int = 10,
+        beta: float = 5.0,
+    ):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        self.frame_length = out_rate * frame_duration // 1000
+        if self.frame_length * 1000 != out_rate * frame_duration:
+            raise ValueError(f"{frame_duration} ms is not a whole number of samples at {out_rate} Hz")
+
+        divisor = gcd(in_rate, out_rate)
+        self.up, self.down = out_rate // divisor, in_rate // divisor
+
+        # Smallest number of frames whose input length is a whole number of samples
+        input_per_frame = Fraction(self.frame_length * in_rate, out_rate)
+        self.frames_per_period = input_per_frame.denominator
+        self.in_block = int(input_per_frame * self.frames_per_period)
+        self.out_block = self.frame_length * self.frames_per_period
+
+        # Anti-aliasing low-pass at the lower of the two Nyquist rates
+        max_rate = max(self.up, self.down)
+        if max_rate == 1:
+            taps = np.ones(1)  # same rate: only downmixing and framing
+        else:
+            # Deferred: scipy.signal takes about a second to import
+            from scipy import signal
+            taps = signal.firwin(2 * half_width * max_rate + 1, 1.0 / max_rate, window=("kaiser", beta))
+            taps *= self.up
+        phase_length = -(-len(taps) // self.up)
+        phases = np.zeros((self.up, phase_length))
+        for phase in range(self.up):
+            phase_taps = taps[phase::self.up]
+            phases[phase, :len(phase_taps)] = phase_taps
+        self.history = phase_length - 1
+
+        # Output n of a period reads inputs (n * down) // up - p, p = 0..phase_length-1,
+        # weighted by phase (n * down) % up; indices are offsets into _buffer
+        positions = np.arange(self.out_block) * self.down
+        self._index = (positions // self.up)[:, None] - np.arange(phase_length) + self.history
+        self._taps = phases[positions % self.up].astype(np.float32)
+        self._filter_length = len(taps)
+
+        # Working buffers, reused for every period
+        self._buffer = np.zeros(self.history + self.in_block, dtype=np.float32)
+        self._filled = 0
+        self._gather = np.zeros(self._taps.shape, dtype=np.float32)
+        self._weights = np.full(channels, 1.0 / channels, dtype=np.float32)
+        self._out = np.zeros((self.out_block, 1), dtype=np.float32)
+        self._frames = [self._out[i * self.frame_length:(i + 1) * self.frame_length]
+                        for i in range(self.frames_per_period)]
+
+        # Counters
+        self.frames_out = 0
+
+    @property
+    def delay(self) -> float:
+        """Group delay the filter adds, in seconds."""
+        return (self._filter_length - 1) / 2 / (self.in_rate * self.up)
+
+    def reset(self):
+        self._buffer.fill(0)
+        self._filled = 0
+
+    def process(self, block: np.ndarray, emit: Callable[[np.ndarray], None]):
+        """Consume a ``(n, channels)`` float32 block, emitting finished frames.
+
+        ``emit`` receives ``(frame_length, 1)`` float32 views into a reused
+        buffer, the same contract as an audio source callback.
+        """
+        offset, total = 0, len(block)
+        while offset < total:
+            count = min(total - offset, self.in_block - self._filled)
+            start = self.history + self._filled
+            mono = self._buffer[start:start + count]
+            if self.channels == 1:
+                mono[:] = block[offset:offset + count, 0]
+            else:
+                np.dot(block[offset:offset + count], self._weights, out=mono)
+            self._filled += count
+            offset += count
+
+            if self._filled == self.in_block:
+                self._run_period(emit)
+
+    def _run_period(self, emit: Callable[[np.ndarray], None]):
+        np.take(self._buffer, self._index, out=self._gather)
+        np.einsum("ij,ij->i", self._gather, self._taps, out=self._out[:, 0])
+        # The tail of this period is the history of the next one
+        self._buffer[:self.history] = self._buffer[self.in_block:]
+        self._filled = 0
+        for frame in self._frames:
+            self.frames_out += 1
+            emit(frame)
+
+
+class ResamplingSource(AudioSource):
+    """Presents any source as mono audio at ``sample_rate`` in exact frames.
+
+    The wrapped source is opened at its own rate and channel count; blocks
+    are converted with ``PolyphaseResampler`` before reaching the callback.
+    ``CaptureBus`` wraps sources in this automatically when needed.
+    """
+
+    def __init__(self, source: AudioSource, sample_rate: int = 16000, frame_duration: int = 30):
+        super().__init__(sample_rate, 1, int(sample_rate * frame_duration / 1000))
+        self.source = source
+        self.live = source.live
+        self.finished = source.finished  # ends when the wrapped source ends
+        self.resampler = PolyphaseResampler(
+            source.sample_rate, sample_rate, source.channels, frame_duration
+        )
+        self._time_info = None
+
+    def open(self, callback: Callable, blocksize: Optional[int] = None) -> "ResamplingSource":
+        if blocksize is not None and blocksize != self.resampler.frame_length:
+            raise ValueError(f"ResamplingSource delivers {self.resampler.frame_length}-sample blocks")
+        self.callback = callback
+        # One resampler period per device block keeps the audio thread's work even
+        self.source.open(self._on_block, blocksize=self.resampler.in_block)
+        return self
+
+    @property
+    def duration(self) -> Optional[float]:
+        return self.source.duration
+
+    def start(self):
+        self.resampler.reset()
+        self.source.__enter__()
+
+    def stop(self):
+        self.source.__exit__(None, None, None)
+
+    def _on_block(self, indata, frames, time_info, status):
+        if status:
+            self.callback(self.resampler._frames[0], self.blocksize, time_info, status)
+            return
+        self._time_info = time_info
+        self.resampler.process(indata[:frames], self._emit)
+
+    def _emit(self, frame: np.ndarray):
+        self.callback(frame, self.blocksize, self._time_info, None)
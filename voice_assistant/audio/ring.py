@@ -0,0 +1,160 @@
+"""Single-producer/single-consumer ring buffer for fixed-size audio frames."""
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class FrameRing:
+    """Lock-free SPSC ring of audio frames backed by one preallocated array.
+
+    The producer (usually an audio callback) fills slots in place with
+    ``acquire``/``commit`` or copies a frame in with ``write``. The consumer
+    gets views into the ring from ``read``/``read_many``; those frames stay
+    valid until its next read call, so nothing is copied or allocated per
+    frame on either side.
+
+    Each side only ever advances its own index, and Python int assignment is
+    atomic under the GIL, so no lock is taken on the hot path. A blocked
+    consumer is woken through an Event that the producer only touches when
+    the consumer is actually waiting.
+    """
+
+    def __init__(self, frame_length: int, capacity: int = 64, dtype=np.int16):
+        if capacity < 2:
+            raise ValueError("FrameRing needs a capacity of at least 2 frames")
+        self.frame_length = frame_length
+        self.capacity = capacity
+        self.frames = np.zeros((capacity, frame_length), dtype=dtype)
+        self._slots = list(self.frames)  # prebuilt row views
+
+        self._write_index = 0  # frames committed, owned by the producer
+        self._read_index = 0  # frames released, owned by the consumer
+        self._held = 0  # frames handed out by the last read
+
+        self._data_ready = threading.Event()
+        self._consumer_waiting = False
+        self.closed = False
+
+        # Counters
+        self.dropped = 0
+        self.frames_read = 0
+        self.high_water = 0
+
+    # Producer side
+
+    def acquire(self) -> Optional[np.ndarray]:
+        """Return the next free slot to fill in place, or None if the ring is full.
+
+        A full ring counts an overflow; the producer is expected to drop the
+        frame. Call ``commit`` once the slot is filled.
+        """
+        if self._write_index - self._read_index >= self.capacity:
+            self.dropped += 1
+            return None
+        return self._slots[self._write_index % self.capacity]
+
+    def commit(self):
+        """Publish the slot returned by the last ``acquire``."""
+        self._write_index += 1
+        depth = self._write_index - self._read_index
+        if depth > self.high_water:
+            self.high_water = depth
+        if self._consumer_waiting:
+            self._data_ready.set()
+
+    def write(self, frame: np.ndarray) -> bool:
+        """Copy one frame into the ring. Returns False if it had to be dropped."""
+        slot = self.acquire()
+        if slot is None:
+            return False
+        np.copyto(slot, frame, casting="unsafe")
+        self.commit()
+        return True
+
+    def full(self) -> bool:
+        return self._write_index - self._read_index >= self.capacity
+
+    def wait_for_space(self, timeout: Optional[float] = None, poll: float = 0.001) -> bool:
+        """Block a non-real-time producer until a slot frees up or the ring closes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.full() and not self.closed:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return not self.closed
+
+    def close(self):
+        """Stop the ring; a waiting consumer returns once the ring is drained."""
+        self.closed = True
+        self._data_ready.set()
+
+    # Consumer side
+
+    def read(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Return the next frame, blocking up to ``timeout`` seconds.
+
+        Returns None on timeout or when the ring is closed and empty.
+        """
+        frames = self.read_many(1, timeout)
+        return None if frames is None else frames[0]
+
+    def read_many(
+        self,
+        max_frames: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[np.ndarray]:
+        """Return all available frames (up to ``max_frames``) as one 2D view.
+
+        Blocks up to ``timeout`` seconds for at least one frame. The view never
+        wraps around the end of the ring, so a backlog may take two calls.
+        """
+        self.release()
+        if self._write_index == self._read_index and not self._wait(timeout):
+            return None
+
+        start = self._read_index % self.capacity
+        count = min(self._write_index - self._read_index, self.capacity - start)
+        if max_frames is not None:
+            count = min(count, max_frames)
+        self._held = count
+        self.frames_read += count
+        return self.frames[start:start + count]
+
+    def release(self):
+        """Hand the frames from the last read back to the producer."""
+        if self._held:
+            self._read_index += self._held
+            self._held = 0
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        self._data_ready.clear()
+        self._consumer_waiting = True
+        try:
+            # Re-check after advertising that we wait, so a commit can't slip by
+            if self._write_index == self._read_index and not self.closed:
+                self._data_ready.wait(timeout)
+        finally:
+            self._consumer_waiting = False
+        return self._write_index != self._read_index
+
+    def __len__(self) -> int:
+        """Frames committed but not yet read."""
+        return self._write_index - self._read_index - self._held
+
+    def reset(self):
+        """Discard buffered frames and reopen the ring. Only call while idle."""
+        self._read_index = self._write_index
+        self._held = 0
+        self.closed = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "capacity": self.capacity,
+            "depth": len(self),
+            "high_water": self.high_water,
+            "frames_written": self._write_index,
+            "frames_read": self.frames_read,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,281 @@
+"""Pluggable audio sources for the voice pipeline.
+
+Every source follows the ``sounddevice.InputStream`` callback contract: while
+open it calls ``callback(indata, frames, time_info, status)`` with float32
+blocks shaped ``(frames, channels)``. That lets the detector run unchanged on
+a live microphone, a WAV file, a raw PCM stream or an in-memory array.
+"""
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Callable, Iterator, Optional
+
+import numpy as np
+
+
+class AudioSource(ABC):
+    """Base class for block-based audio sources.
+
+    ``live`` sources deliver audio on their own clock, so a consumer that
+    falls behind has to drop frames. Non-live sources can simply be paused.
+    """
+
+    live = True
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        blocksize: Optional[int] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize or int(sample_rate * 30 / 1000)
+        self.callback: Optional[Callable] = None
+        self.finished = threading.Event()
+
+    def open(self, callback: Callable, blocksize: Optional[int] = None) -> "AudioSource":
+        """Attach the block callback; use the result as a context manager."""
+        self.callback = callback
+        if blocksize is not None:
+            self.blocksize = blocksize
+        return self
+
+    @abstractmethod
+    def start(self):
+        """Begin delivering blocks to the callback."""
+
+    @abstractmethod
+    def stop(self):
+        """Stop delivering blocks and release the device or input."""
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Length of the audio in seconds, or None for unbounded sources."""
+        return None
+
+    def __enter__(self):
+        self.finished.clear()
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class MicrophoneSource(AudioSource):
+    """Live capture from a PortAudio input device."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        blocksize: Optional[int] = None,
+        device=None,
+    ):
+        super().__init__(sample_rate, channels, blocksize)
+        self.device = device
+        self._stream = None
+
+    @classmethod
+    def native(cls, device=None, blocksize: Optional[int] = None, max_channels: int = 2) -> "MicrophoneSource":
+        """Source opened at the device's own sample rate and channel count.
+
+        USB mics commonly run at 44.1 or 48 kHz in stereo; asking PortAudio
+        for 16 kHz mono either fails or resamples on the audio thread.
+        ``CaptureBus`` converts native audio with a ``ResamplingSource``.
+
+        Args:
+            device: PortAudio device index or name; None for the default input
+            blocksize: Samples per block at the native rate
+            max_channels: Channels opened at most, for multi-input interfaces
+        """
+        import sounddevice as sd
+
+        info = sd.query_devices(device, "input")
+        channels = max(1, min(int(info["max_input_channels"]), max_channels))
+        return cls(int(info["default_samplerate"]), channels, blocksize, device)
+
+    def start(self):
+        # Imported here so offline sources work on boxes without PortAudio
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype=np.float32,
+            blocksize=self.blocksize,
+            device=self.device,  # None uses the default input device
+            callback=self.callback
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self.finished.set()
+
+
+class _ReplaySource(AudioSource):
+    """Replays pre-recorded audio from a background thread.
+
+    With ``realtime=False`` (the default) blocks are delivered as fast as the
+    consumer can take them, which is what benchmarks and tests want. With
+    ``realtime=True`` delivery is paced to the sample rate like a microphone.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        blocksize: Optional[int] = None,
+        realtime: bool = False,
+    ):
+        super().__init__(sample_rate, channels, blocksize)
+        self.realtime = realtime
+        self.live = realtime
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        block_duration = self.blocksize / self.sample_rate
+        start_time = time.perf_counter()
+        try:
+            for index, block in enumerate(self._blocks()):
+                if self._stop_event.is_set():
+                    break
+                if self.realtime:
+                    delay = start_time + index * block_duration - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self.callback(block, self.blocksize, None, None)
+        finally:
+            self.finished.set()
+
+    @abstractmethod
+    def _blocks(self) -> Iterator[np.ndarray]:
+        """Yield float32 ``(blocksize, channels)`` blocks.
+
+        Like PortAudio, the same buffer is reused for every block, so the
+        callback must copy anything it wants to keep.
+        """
+
+
+class PCMStreamSource(_ReplaySource):
+    """Raw little-endian int16 PCM read from a binary file-like object."""
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        blocksize: Optional[int] = None,
+        realtime: bool = False,
+    ):
+        super().__init__(sample_rate, channels, blocksize, realtime)
+        self.stream = stream
+
+    def _read(self, nbytes: int) -> bytes:
+        return self.stream.read(nbytes)
+
+    def _blocks(self) -> Iterator[np.ndarray]:
+        block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        samples = block.reshape(-1)
+        raw = bytearray(samples.size * 2)
+        pcm = np.frombuffer(raw, dtype="<i2")
+
+        while True:
+            # Network streams may return short reads, so fill the block fully
+            filled = 0
+            while filled < len(raw):
+                data = self._read(len(raw) - filled)
+                if not data:
+                    break
+                raw[filled:filled + len(data)] = data
+                filled += len(data)
+            if filled < 2 * self.channels:
+                return
+
+            # Zero-pad a trailing partial block
+            raw[filled:] = bytes(len(raw) - filled)
+            np.multiply(pcm, 1.0 / 32768, out=samples)
+            yield block
+            if filled < len(raw):
+                return
+
+
+class WavFileSource(PCMStreamSource):
+    """16-bit PCM WAV file, e.g. ``test_recording.wav``."""
+
+    def __init__(
+        self,
+        path: str,
+        blocksize: Optional[int] = None,
+        realtime: bool = False,
+    ):
+        self.path = str(path)
+        with wave.open(self.path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"Only 16-bit PCM WAV files are supported: {self.path}")
+            sample_rate = wav.getframerate()
+            channels = wav.getnchannels()
+            self._num_frames = wav.getnframes()
+        super().__init__(None, sample_rate, channels, blocksize, realtime)
+        self._wav = None
+
+    @property
+    def duration(self) -> float:
+        return self._num_frames / self.sample_rate
+
+    def _read(self, nbytes: int) -> bytes:
+        return self._wav.readframes(nbytes // (2 * self.channels))
+
+    def _blocks(self) -> Iterator[np.ndarray]:
+        with wave.open(self.path, "rb") as self._wav:
+            yield from super()._blocks()
+        self._wav = None
+
+
+class ArraySource(_ReplaySource):
+    """In-memory audio, either int16 PCM or float samples in [-1, 1]."""
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        sample_rate: int = 16000,
+        blocksize: Optional[int] = None,
+        realtime: bool = False,
+    ):
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        super().__init__(sample_rate, data.shape[1], blocksize, realtime)
+        self.data = data
+
+    @property
+    def duration(self) -> float:
+        return len(self.data) / self.sample_rate
+
+    def _blocks(self) -> Iterator[np.ndarray]:
+        block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        scale = 1.0 / 32768 if self.data.dtype == np.int16 else 1.0
+
+        for start in range(0, len(self.data), self.blocksize):
+            chunk = self.data[start:start + self.blocksize]
+            np.multiply(chunk, scale, out=block[:len(chunk)], casting="unsafe")
+            block[len(chunk):] = 0
+            yield block
@@ -1,17 +1,46 @@
 """Database module for BalanceBuddy using SQLAlchemy."""
-from sqlalchemy import create_engine
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from .models import Base, User, DailyPlan, Reminder
+from voice_assistant import metrics
+from .engine import registry
+from .models import Base, User, DailyPlan, Reminder, Task
+
+DB_SECONDS = "balancebuddy_db_seconds"
+
+# Ids per UPDATE ... WHERE id IN (...), under SQLite's bound parameter limit
+ID_CHUNK = 500
+
+_TASK_COLUMNS = (Task.id, Task.title, Task.is_completed, Task.reminder_time, Task.created_at, Task.completed_at)
+
+
+def _owned_by(user_id: Optional[int]):
+    """Filter on a task's user; ``IS NULL`` for the local assistant's tasks."""
+    return Task.user_id.is_(None) if user_id is None else Task.user_id == user_id
+
+
+def _chunks(ids: Sequence[int], size: int = ID_CHUNK):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
 
 class Database:
-    def __init__(self, db_url: str = "sqlite:///balancebuddy.db"):
-        """Initialize database connection."""
-        self.engine = create_engine(db_url)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+    def __init__(self, db_url: str = "sqlite:///balancebuddy.db", engine: Optional[Engine] = None):
+        """Initialize database connection.
+
+        Args:
+            db_url: Database URL; every Database for it shares one tuned
+                engine, see ``voice_assistant.db.engine``
+            engine: Use this engine instead of the shared one
+        """
+        if engine is None:
+            self.engine, self.SessionLocal = registry.get(db_url)
+        else:
+            self.engine = engine
+            self.SessionLocal = sessionmaker(bind=engine)
         self._init_db()
 
     def _init_db(self):
@@ -19,9 +48,10 @@ class Database:
         Base.metadata.create_all(self.engine)
 
     def get_session(self) -> Session:
-        """Get a database session."""
+        """Get a new database session; close it, e.g. with ``with``."""
         return self.SessionLocal()
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="create_user")
     def create_user(self, username: str, preferences: Dict = None) -> Optional[User]:
         """Create a new user."""
         with self.get_session() as session:
@@ -34,11 +64,13 @@ class Database:
                 session.rollback()
                 return None
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="get_user")
     def get_user(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
         with self.get_session() as session:
             return session.query(User).filter(User.id == user_id).first()
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="create_daily_plan")
     def create_daily_plan(self, user_id: int, date: datetime, meals: Dict, workout: List[str]) -> Optional[DailyPlan]:
         """Create a new daily plan."""
         with self.get_session() as session:
@@ -56,6 +88,7 @@ class Database:
                 session.rollback()
                 return None
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="get_daily_plan")
     def get_daily_plan(self, user_id: int, date: datetime) -> Optional[DailyPlan]:
         """Get daily plan for a specific date."""
         with self.get_session() as session:
@@ -64,6 +97,7 @@ class Database:
                 DailyPlan.date == date
             ).first()
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="create_reminder")
     def create_reminder(self, user_id: int, time: datetime, message: str, type: str) -> Optional[Reminder]:
         """Create a new reminder."""
         with self.get_session() as session:
@@ -81,6 +115,7 @@ class Database:
                 session.rollback()
                 return None
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="get_due_reminders")
     def get_due_reminders(self, user_id: int) -> List[Reminder]:
         """Get all uncompleted reminders that are due."""
         with self.get_session() as session:
@@ -90,6 +125,7 @@ class Database:
                 Reminder.completed == False
             ).all()
 
+    @metrics.timed(DB_SECONDS, "Database call latency", op="mark_reminder_completed")
     def mark_reminder_completed(self, reminder_id: int) -> bool:
         """Mark a reminder as completed."""
         with self.get_session() as session:
@@ -103,3 +139,141 @@ class Database:
             except SQLAlchemyError:
                 session.rollback()
                 return False
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="add_task")
+    def add_task(self, title: str, reminder_time: Optional[datetime] = None,
+                 user_id: Optional[int] = None) -> Optional[int]:
+        """Add a task, optionally with a reminder; returns its id."""
+        ids = self._insert_tasks([(title, reminder_time)], user_id)
+        return ids[0] if ids else None
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="add_tasks")
+    def add_tasks(self, tasks: Iterable[Tuple[str, Optional[datetime]]],
+                  user_id: Optional[int] = None) -> List[int]:
+        """Add ``(title, reminder_time)`` tasks in one transaction; returns their ids."""
+        return self._insert_tasks(list(tasks), user_id)
+
+    def _insert_tasks(self, tasks: List[Tuple[str, Optional[datetime]]], user_id: Optional[int]) -> List[int]:
+        if not tasks:
+            return []
+        created_at = datetime.utcnow()
+        rows = [
+            {"user_id": user_id, "title": title, "reminder_time": reminder_time,
+             "is_completed": False, "reminder_triggered": False, "created_at": created_at}
+            for title, reminder_time in tasks
+        ]
+        with self.get_session() as session:
+            try:
+                # Core executemany: multi-row INSERTs in one transaction. The ORM
+                # form splits the batch wherever a column flips to NULL.
+                table = Task.__table__
+                result = session.connection().execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True), rows)
+                ids = list(result.scalars())
+                session.commit()
+                return ids
+            except SQLAlchemyError:
+                session.rollback()
+                return []
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="get_tasks")
+    def get_tasks(self, include_completed: bool = False, user_id: Optional[int] = None,
+                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tasks of a user in creation order, as dicts."""
+        query = select(*_TASK_COLUMNS).where(_owned_by(user_id))
+        if not include_completed:
+            query = query.where(Task.is_completed == False)  # noqa: E712
+        query = query.order_by(Task.id).limit(limit)
+        with self.get_session() as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="get_due_tasks")
+    def get_due_tasks(self, now: Optional[datetime] = None, user_id: Optional[int] = None,
+                      limit: Optional[int] = None, after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Open tasks whose reminder is due and hasn't fired, earliest first.
+
+        A range scan on ``ix_tasks_user_due``: equality on user and
+        completion, then ``after <= reminder_time <= now``.
+        """
+        now = now or datetime.now()
+        query = select(*_TASK_COLUMNS).where(
+            _owned_by(user_id),
+            Task.is_completed == False,  # noqa: E712
+            Task.reminder_triggered == False,  # noqa: E712
+            Task.reminder_time <= now,
+        )
+        if after is not None:
+            query = query.where(Task.reminder_time >= after)
+        query = query.order_by(Task.reminder_time).limit(limit)
+        with self.get_session() as session:
+            return [dict(row._mapping) for row in session.execute(query)]
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="complete_task")
+    def complete_task(self, task_id: int) -> bool:
+        """Mark an open task as completed; False if there is none with that id."""
+        return self._update_tasks([task_id], Task.is_completed == False,  # noqa: E712
+                                  is_completed=True, completed_at=datetime.utcnow()) == 1
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="complete_tasks")
+    def complete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Mark tasks completed in one transaction; returns how many were open."""
+        return self._update_tasks(list(task_ids), Task.is_completed == False,  # noqa: E712
+                                  is_completed=True, completed_at=datetime.utcnow())
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="mark_reminder_triggered")
+    def mark_reminder_triggered(self, task_id: int) -> bool:
+        """Record that a task's reminder fired."""
+        return self._update_tasks([task_id], Task.reminder_triggered == False,  # noqa: E712
+                                  reminder_triggered=True) == 1
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="mark_reminders_triggered")
+    def mark_reminders_triggered(self, task_ids: Iterable[int]) -> int:
+        """Record that reminders fired, in one transaction; returns how many were pending."""
+        return self._update_tasks(list(task_ids), Task.reminder_triggered == False,  # noqa: E712
+                                  reminder_triggered=True)
+
+    @metrics.timed(DB_SECONDS, "Database call latency", op="claim_reminders")
+    def claim_reminders(self, task_ids: Iterable[int]) -> List[int]:
+        """Mark reminders of open tasks triggered; returns the ids this call claimed.
+
+        A reminder is claimed once, even with several dispatchers, and not
+        at all once its task is completed.
+        """
+        task_ids = list(task_ids)
+        claimed = []
+        with self.get_session() as session:
+            try:
+                for chunk in _chunks(task_ids):
+                    result = session.execute(
+                        update(Task).where(
+                            Task.id.in_(chunk),
+                            Task.reminder_triggered == False,  # noqa: E712
+                            Task.is_completed == False,  # noqa: E712
+                        ).values(reminder_triggered=True).returning(Task.id),
+                        execution_options={"synchronize_session": False},
+                    )
+                    claimed += result.scalars()
+                session.commit()
+                return claimed
+            except SQLAlchemyError:
+                session.rollback()
+                return []
+
+    def _update_tasks(self, task_ids: List[int], condition, **values) -> int:
+        """Set ``values`` on the listed tasks matching ``condition``; returns the rows changed."""
+        if not task_ids:
+            return 0
+        with self.get_session() as session:
+            try:
+                changed = 0
+                for chunk in _chunks(task_ids):
+                    result = session.execute(
+                        update(Task).where(Task.id.in_(chunk), condition).values(**values),
+                        execution_options={"synchronize_session": False},
+                    )
+                    changed += result.rowcount
+                session.commit()
+                return changed
+            except SQLAlchemyError:
+                session.rollback()
+                return 0
@@ -0,0 +1,109 @@
+"""Process-wide registry of tuned SQLAlchemy engines.
+
+Every ``Database`` for the same URL shares one engine, one connection pool
+and one session factory, so the API, the command processor and the
+reminder thread don't each open the file with their own locks.
+SQLite files are tuned on every new connection:
+
+- ``journal_mode=WAL``: readers don't block the writer and the writer
+  doesn't block readers; only writers serialize
+- ``synchronous=NORMAL``: no fsync per commit in WAL mode, still safe
+  against corruption (a power cut may lose the last commits)
+- ``mmap_size``: reads are served from mapped pages instead of ``read()``
+- ``busy_timeout``: a writer waits for the lock instead of failing
+"""
+import os
+import threading
+from typing import Dict, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker
+
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("busy_timeout", 10000),  # ms
+    ("temp_store", "MEMORY"),
+)
+
+# Connections kept per engine, and extra ones allowed under bursts
+POOL_SIZE = 8
+MAX_OVERFLOW = 16
+
+
+def _tune_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _key(db_url: str) -> str:
+    """Registry key: the URL, with SQLite paths made absolute."""
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        url = url.set(database=os.path.abspath(url.database))
+    return url.render_as_string(hide_password=False)
+
+
+def _in_memory(db_url: str) -> bool:
+    url = make_url(db_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+class EngineRegistry:
+    """Engines and session factories shared per database URL."""
+
+    def __init__(self):
+        self._engines: Dict[str, Tuple[Engine, sessionmaker]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_url: str) -> Tuple[Engine, sessionmaker]:
+        """Shared engine and session factory for ``db_url``.
+
+        In-memory SQLite URLs are private databases by nature and get a new
+        engine on every call.
+        """
+        if _in_memory(db_url):
+            return self._create(db_url)
+        key = _key(db_url)
+        with self._lock:
+            if key not in self._engines:
+                self._engines[key] = self._create(key)
+            return self._engines[key]
+
+    @staticmethod
+    def _create(db_url: str) -> Tuple[Engine, sessionmaker]:
+        if make_url(db_url).get_backend_name() != "sqlite":
+            engine = create_engine(db_url, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_pre_ping=True)
+        elif _in_memory(db_url):
+            engine = create_engine(db_url)
+        else:
+            engine = create_engine(
+                db_url,
+                pool_size=POOL_SIZE,
+                max_overflow=MAX_OVERFLOW,
+                # Connections move between threads through the pool
+                connect_args={"check_same_thread": False},
+            )
+            event.listen(engine, "connect", _tune_sqlite)
+        # Every Database call opens and closes its own short-lived session, so
+        # no session is shared between threads and none needs a per-thread registry
+        return engine, sessionmaker(bind=engine)
+
+    def dispose(self):
+        """Close every pooled connection and forget the engines."""
+        with self._lock:
+            for engine, _ in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+
+registry = EngineRegistry()
+
+
+def get_engine(db_url: str) -> Engine:
+    """Shared engine for ``db_url`` from the process-wide registry."""
+    return registry.get(db_url)[0]
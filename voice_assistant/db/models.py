@@ -1,5 +1,5 @@
 """Database models for BalanceBuddy."""
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,6 +16,7 @@ class User(Base):
     
     plans = relationship("DailyPlan", back_populates="user")
     reminders = relationship("Reminder", back_populates="user")
+    tasks = relationship("Task", back_populates="user")
 
 class DailyPlan(Base):
     __tablename__ = 'daily_plans'
@@ -42,3 +43,30 @@ class Reminder(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="reminders")
+
+class Task(Base):
+    __tablename__ = 'tasks'
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'))  # None for the local voice assistant
+    title = Column(String, nullable=False)
+    is_completed = Column(Boolean, nullable=False, default=False)
+    reminder_time = Column(DateTime)  # local time
+    reminder_triggered = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
+    
+    user = relationship("User", back_populates="tasks")
+
+    __table_args__ = (
+        # Open tasks of a user, and the due-reminder query as a range scan on
+        # reminder_time; fired reminders drop out of the index so they don't
+        # pile up in front of the pending ones
+        Index(
+            'ix_tasks_user_due', 'user_id', 'is_completed', 'reminder_time',
+            sqlite_where=reminder_triggered == False,  # noqa: E712
+            postgresql_where=reminder_triggered == False,  # noqa: E712
+        ),
+        # Listing tasks regardless of reminder state
+        Index('ix_tasks_user_completed', 'user_id', 'is_completed', 'id'),
+    )
@@ -1,7 +1,9 @@
 """Main application entry point for BalanceBuddy."""
 import uvicorn
 from fastapi import FastAPI
-from voice_assistant.api.server import app as api_app
+from fastapi.responses import PlainTextResponse
+from voice_assistant import metrics, startup
+from voice_assistant.api.server import app as api_app, streaming
 from voice_assistant.wake_word.processor import WakeWordProcessor
 from voice_assistant.scheduler.scheduler import NotificationScheduler
 from voice_assistant.db.database import Database
@@ -17,7 +19,8 @@ def setup_wake_word():
     
     processor = WakeWordProcessor(
         wake_phrases=WAKE_PHRASES,
-        callback=on_wake_word
+        callback=on_wake_word,
+        streaming=True
     )
     processor.start()
     return processor
@@ -39,19 +42,36 @@ def setup_scheduler():
     scheduler.start()
     return scheduler
 
+async def metrics_endpoint():
+    """Prometheus scrape endpoint: stage latency histograms, queue depths, drops."""
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 def main():
-    # Initialize database
-    db = Database(db_url=DATABASE_URL)
+    # Create the schema and the shared engine before the first request needs them
+    with startup.step("database"):
+        Database(db_url=DATABASE_URL)
     
+    # Streaming clients wake on the same phrases as the local microphone
+    streaming.wake_phrases = WAKE_PHRASES
+
     # Set up wake word detection
-    wake_processor = setup_wake_word()
+    with startup.step("wake_word"):
+        wake_processor = setup_wake_word()
     
     # Set up scheduler
-    scheduler = setup_scheduler()
+    with startup.step("scheduler"):
+        scheduler = setup_scheduler()
     
     # Mount the API app
     root_app = FastAPI(title="BalanceBuddy")
     root_app.mount("/api", api_app)
+    root_app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+
+    if startup.enabled():
+        startup.print_steps()
     
     try:
         # Start the web server
@@ -0,0 +1,216 @@
+"""Latency histograms and counters, exposed as Prometheus text.
+
+Recording is cheap enough for the audio path: an observation is a bisect
+over fixed bucket bounds and a few integer increments under a lock, with no
+allocation. Queue depths and drops are not pushed at all; collectors read
+them from the capture buses when ``/metrics`` is scraped.
+
+    with metrics.stage("vad"):
+        ...
+    @metrics.timed("balancebuddy_db_seconds", "Database call latency", op="add_task")
+    def add_task(...): ...
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Seconds; spans a single VAD frame (~10 µs) up to a slow command (~10 s)
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+STAGE_SECONDS = "balancebuddy_stage_seconds"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of one labelled series."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile ``q`` (0 if empty)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+
+class MetricsRegistry:
+    """Metric families by name, each holding one series per label set."""
+
+    def __init__(self):
+        self._families: Dict[str, dict] = {}
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+        self._lock = threading.Lock()
+
+    def _series(self, kind: str, name: str, help: str, labels: Dict[str, str], factory):
+        key = _labels(labels)
+        family = self._families.get(name)
+        if family is not None:
+            series = family["series"].get(key)
+            if series is not None:
+                return series
+        with self._lock:
+            family = self._families.setdefault(name, {"kind": kind, "help": help, "series": {}})
+            if family["kind"] != kind:
+                raise ValueError(f"Metric {name} is a {family['kind']}, not a {kind}")
+            family["help"] = family["help"] or help
+            return family["series"].setdefault(key, factory())
+
+    def histogram(self, name: str, help: str = "", buckets: Iterable[float] = DEFAULT_BUCKETS,
+                  **labels) -> Histogram:
+        return self._series("histogram", name, help, labels, lambda: Histogram(buckets))
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        """Monotonic counter; by convention ``name`` ends in ``_total``."""
+        return self._series("counter", name, help, labels, Counter)
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """Add a callback yielding ``(name, kind, help, labels, value)`` at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        # Series are added at runtime (per intent, per pool), so copy the
+        # families before formatting instead of iterating them live
+        with self._lock:
+            families = [(name, family["kind"], family["help"], list(family["series"].items()))
+                        for name, family in self._families.items()]
+            collectors = list(self._collectors)
+
+        lines = []
+        for name, kind, help, series_list in sorted(families, key=lambda family: family[0]):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, series in sorted(series_list, key=lambda item: item[0]):
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {series.value}")
+                    continue
+                with series._lock:  # buckets, sum and count from the same moment
+                    counts, total, count = list(series.counts), series.sum, series.count
+                cumulative = 0
+                for bound, bucket in zip(series.bounds + (float("inf"),), counts):
+                    cumulative += bucket
+                    le = ("le", _format_value(bound))
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        collected: Dict[str, list] = {}
+        for collector in collectors:
+            for name, kind, help, labels, value in collector():
+                collected.setdefault(name, [kind, help, []])[2].append((_labels(labels), value))
+        for name, (kind, help, samples) in sorted(collected.items()):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def stage_histogram(stage: str) -> Histogram:
+    """Latency histogram of one stage of the voice path."""
+    return registry.histogram(STAGE_SECONDS, "Latency of each voice pipeline stage", stage=stage)
+
+
+def stage(name: str):
+    """Context manager timing a block as a voice path stage."""
+    return stage_histogram(name).time()
+
+
+def timed(name: str, help: str = "", **labels):
+    """Decorator recording each call's duration in a histogram."""
+    def decorator(func):
+        histogram = registry.histogram(name, help, **labels)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def summarize(samples: Iterable[float]) -> Dict[str, float]:
+    """Count, total and latency percentiles (in ms) for samples in seconds."""
+    values = np.asarray(list(samples), dtype=np.float64)
+    if values.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+    return {
+        "count": int(values.size),
+        "total_s": float(values.sum()),
+        "mean_ms": float(values.mean() * 1000),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max() * 1000),
+    }
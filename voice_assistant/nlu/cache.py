@@ -0,0 +1,84 @@
+"""Bounded LRU cache with hit-rate counters.
+
+Used to memoize intent matching and time expression parsing: voice users
+repeat the same phrasings all day, so most lookups after warm-up are hits.
+Memory is bounded by the entry count and by refusing long keys, which are
+dictations that won't repeat anyway.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from voice_assistant import metrics
+
+MISSING = object()
+
+
+class LRUCache:
+    """Least-recently-used mapping with at most ``maxsize`` entries.
+
+    Args:
+        maxsize: Entries kept; the least recently used is evicted first
+        name: Label for the hit and miss counters on ``/metrics``
+        max_key_length: Longer string keys are never stored
+    """
+
+    def __init__(self, maxsize: int = 1024, name: str = "cache", max_key_length: int = 256):
+        self.maxsize = maxsize
+        self.name = name
+        self.max_key_length = max_key_length
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._hit_counter = metrics.registry.counter(
+            "balancebuddy_cache_lookups_total", "Memoized lookups", cache=name, result="hit")
+        self._miss_counter = metrics.registry.counter(
+            "balancebuddy_cache_lookups_total", "Memoized lookups", cache=name, result="miss")
+
+    def get(self, key: Hashable, default: Any = MISSING,
+            is_valid: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Look up ``key``; entries failing ``is_valid`` are dropped and count as misses."""
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is not MISSING and (is_valid is None or is_valid(value)):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._hit_counter.inc()
+                return value
+            if value is not MISSING:
+                del self._entries[key]
+            self.misses += 1
+            self._miss_counter.inc()
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        if isinstance(key, str) and len(key) > self.max_key_length:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
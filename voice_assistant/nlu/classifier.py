@@ -0,0 +1,218 @@
+"""Hashed n-gram intent classifier, the fallback when no pattern matches.
+
+Misrecognized phrasings ("at task by milk", "remind me too stretch") miss
+every regex in ``IntentRecognizer``, and asking the user to repeat costs
+far more than classifying the utterance. Word uni/bigrams and character
+3/4-grams are hashed into a fixed number of buckets and scored by a linear
+softmax model: prediction is a row gather and a sum in NumPy, tens of
+microseconds per utterance, with no ML framework involved.
+
+The model is trained offline from logged utterances. Records labelled by
+hand (a ``label`` field, ``none`` for out-of-domain speech) are used as
+is; the rest are labelled by the regex rules, and unmatched ones are
+skipped. It is saved as a compressed ``.npz`` array file:
+
+    python -m voice_assistant.nlu.classifier logs/*.jsonl.gz --output intent_model.npz
+
+The assistant uses it when ``BALANCEBUDDY_INTENT_MODEL`` points at the file,
+or when it is passed as ``CommandProcessor(intent_model=...)``.
+"""
+import argparse
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Label of utterances that are no command at all
+NO_INTENT = "none"
+
+MODEL_ENV = "BALANCEBUDDY_INTENT_MODEL"
+
+FORMAT_VERSION = 1
+
+
+def configured_model() -> Optional[str]:
+    """Model file set in ``BALANCEBUDDY_INTENT_MODEL``; None leaves the fallback off."""
+    return os.environ.get(MODEL_ENV) or None
+
+
+def _buckets(text: str, dim: int) -> np.ndarray:
+    """Distinct hashed feature buckets of normalized text."""
+    words = text.split()
+    features = [f"w:{word}" for word in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {text} "
+    for n in (3, 4):
+        features += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    # crc32 rather than hash(): string hashes change with every process
+    return np.fromiter({zlib.crc32(f.encode()) % dim for f in features}, dtype=np.int64)
+
+
+class HashedNgramClassifier:
+    """Linear model over hashed n-gram features.
+
+    Args:
+        labels: Class names, one per weight column
+        weights: ``(dim, len(labels))`` weight per feature bucket and class
+        bias: Per-class bias
+    """
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = list(labels)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.dim = self.weights.shape[0]
+
+    def features(self, text: str) -> np.ndarray:
+        return _buckets(" ".join(text.lower().split()), self.dim)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Class probabilities for one utterance."""
+        buckets = self.features(text)
+        logits = self.bias.copy()
+        if len(buckets):
+            # Binary features scaled to unit length, so long dictations don't dominate
+            logits += self.weights[buckets].sum(axis=0) / np.sqrt(len(buckets))
+        logits -= logits.max()
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely label and its probability."""
+        probabilities = self.scores(text)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str):
+        """Write the model as a compressed ``.npz``; weights are stored as float16."""
+        np.savez_compressed(
+            path,
+            version=np.array(FORMAT_VERSION),
+            labels=np.array(self.labels),
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != FORMAT_VERSION:
+                raise ValueError(f"Unsupported intent model version {int(data['version'])}: {path}")
+            return cls([str(label) for label in data["labels"]], data["weights"], data["bias"])
+
+
+def train(
+    texts: Sequence[str],
+    labels: Sequence[str],
+    dim: int = 2 ** 16,
+    epochs: int = 10,
+    learning_rate: float = 0.5,
+    batch_size: int = 64,
+    seed: int = 0
+) -> HashedNgramClassifier:
+    """Fit a classifier with minibatch SGD on softmax cross-entropy.
+
+    Args:
+        texts: Training utterances
+        labels: Label of each utterance
+        dim: Hash buckets; collisions are rare well below the bucket count
+        epochs: Passes over the data
+        learning_rate: SGD step size
+        batch_size: Utterances per update
+        seed: Shuffling seed
+
+    Returns:
+        The trained classifier
+    """
+    classes = sorted(set(labels))
+    column = {label: i for i, label in enumerate(classes)}
+    examples = [(_buckets(" ".join(t.lower().split()), dim), column[l]) for t, l in zip(texts, labels)]
+    examples = [(buckets, y) for buckets, y in examples if len(buckets)]
+    if not examples:
+        raise ValueError("No training utterances")
+
+    weights = np.zeros((dim, len(classes)), dtype=np.float32)
+    bias = np.zeros(len(classes), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(examples))
+        for start in range(0, len(order), batch_size):
+            batch = [examples[i] for i in order[start:start + batch_size]]
+            lengths = np.array([len(buckets) for buckets, _ in batch])
+            buckets = np.concatenate([b for b, _ in batch])
+            targets = np.array([y for _, y in batch])
+            rows = np.repeat(np.arange(len(batch)), lengths)
+            scale = (1 / np.sqrt(lengths))[rows, None]
+
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            logits = np.add.reduceat(weights[buckets] * scale, offsets, axis=0) + bias
+            logits -= logits.max(axis=1, keepdims=True)
+            gradient = np.exp(logits)
+            gradient /= gradient.sum(axis=1, keepdims=True)
+            gradient[np.arange(len(batch)), targets] -= 1
+            gradient /= len(batch)
+
+            np.add.at(weights, buckets, -learning_rate * gradient[rows] * scale)
+            bias -= learning_rate * gradient.sum(axis=0)
+    return HashedNgramClassifier(classes, weights, bias)
+
+
+def training_examples(records: Iterable[dict], field: str = "text") -> Tuple[List[str], List[str]]:
+    """Texts and labels from log records: hand labels first, else the regex rules."""
+    from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+    rules = IntentRecognizer()
+    texts, labels = [], []
+    for record in records:
+        text = " ".join(record[field].lower().split())
+        label = record.get("label")
+        if not isinstance(label, str):
+            match = rules._match_rules(text)
+            if match is None:
+                continue
+            label = match[0]
+        texts.append(text)
+        labels.append(label)
+    return texts, labels
+
+
+def main(argv=None):
+    from voice_assistant.nlu.replay import read_batches
+
+    parser = argparse.ArgumentParser(description="Train the fallback intent classifier from logged utterances")
+    parser.add_argument("logs", nargs="+", help="JSONL transcript logs (.jsonl or .jsonl.gz)")
+    parser.add_argument("--output", required=True, help="Where to write the model (.npz)")
+    parser.add_argument("--field", default="text", help="Record field holding the transcript")
+    parser.add_argument("--dim", type=int, default=2 ** 16, help="Hash buckets")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of utterances held out for accuracy")
+    args = parser.parse_args(argv)
+
+    records = [record for batch in read_batches(args.logs, args.field) for record in batch]
+    texts, labels = training_examples(records, args.field)
+    if not texts:
+        print("❌ No labelled utterances found")
+        return 1
+    print(f"📚 {len(texts)} labelled utterances: {dict(Counter(labels).most_common())}")
+
+    order = np.random.default_rng(0).permutation(len(texts))
+    held_out = order[:int(len(texts) * args.holdout)]
+    train_on = order[len(held_out):]
+    start = time.perf_counter()
+    model = train([texts[i] for i in train_on], [labels[i] for i in train_on], args.dim, args.epochs)
+    print(f"🏋️ Trained in {time.perf_counter() - start:.1f} s")
+    if len(held_out):
+        correct = sum(model.predict(texts[i])[0] == labels[i] for i in held_out)
+        print(f"🎯 Held-out accuracy: {correct / len(held_out):.1%} on {len(held_out)} utterances")
+
+    model.save(args.output)
+    print(f"✅ Model written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
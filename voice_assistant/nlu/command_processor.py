@@ -1,16 +1,20 @@
 """Process voice commands and execute corresponding actions."""
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List
 import threading
-import queue
-import sounddevice as sd
-import numpy as np
-from vosk import Model, KaldiRecognizer
+from contextlib import nullcontext
+import asyncio
 import json
 import time
-from datetime import datetime
-from typing import Optional
-from dateutil import parser
+from datetime import datetime, timedelta
+from functools import partial
 
+from voice_assistant import metrics
+from voice_assistant.asr.models import DEFAULT_MODEL, default_model_path, get_model, new_recognizer
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.endpoint import END_OF_SPEECH, MAX_UTTERANCE, NO_SPEECH, Endpointer
+from voice_assistant.db.database import Database
+from voice_assistant.nlu.classifier import configured_model
+from voice_assistant.nlu.handlers import IntentDispatcher, IntentWorker
 from voice_assistant.nlu.intent_recognizer import IntentRecognizer, Intent
 from voice_assistant.task_manager import TaskManager
 
@@ -22,25 +26,45 @@ class CommandProcessor:
         model_path: Optional[str] = None,
         on_command: Optional[Callable[[Intent], None]] = None,
         on_listening: Optional[Callable[[], None]] = None,
-        on_processing: Optional[Callable[[], None]] = None
+        on_processing: Optional[Callable[[], None]] = None,
+        bus: Optional[CaptureBus] = None,
+        preroll: float = 0.2,
+        endpointer: Optional[Endpointer] = None,
+        handler_workers: int = 2,
+        max_pending_intents: int = 16,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        intent_model: Optional[str] = None,
+        db: Optional[Database] = None
     ):
         # Initialize Vosk model for speech recognition
         if model_path is None:
-            from ..wake_word.recognizer import WakeWordRecognizer
-            dummy = WakeWordRecognizer()  # This will download model if needed
-            model_path = dummy._get_default_model()
+            model_path = default_model_path(DEFAULT_MODEL)  # This will download model if needed
             
-        self.model = Model(model_path)
-        self.recognizer = KaldiRecognizer(self.model, sample_rate)
-        self.intent_recognizer = IntentRecognizer()
-        self.task_manager = TaskManager()
+        # The model is shared process-wide; only the recognizer is our own
+        self.model = get_model(model_path)
+        self.recognizer = new_recognizer(model_path, sample_rate)
+        # The classifier catches phrasings the patterns miss, e.g. misheard words
+        self.intent_recognizer = IntentRecognizer(fallback_model=intent_model or configured_model())
+        # Tasks go to the application's database when one is given
+        self.task_manager = TaskManager(db=db)
+        # Intent name -> handler, checked against what the patterns produce
+        self.handlers = IntentDispatcher(self.intent_recognizer)
+        self._register_builtin_handlers()
+        # Handlers run here, never on the thread draining audio; with a
+        # loop they run on it instead of a thread pool
+        self.intent_worker = IntentWorker(
+            self.handlers, workers=handler_workers, max_pending=max_pending_intents,
+            name="commands", loop=loop
+        )
         
         # Start checking for reminders
         self.task_manager.start_reminder_checker()
         
         # Audio settings
         self.sample_rate = sample_rate
-        self.audio_queue = queue.Queue()
+        self.bus = bus  # shared always-open capture; None opens the mic per command
+        self.preroll = preroll  # seconds of audio from before start_listening
+        self.subscription = None
         self.is_listening = False
         self._stop_event = threading.Event()
         
@@ -52,6 +76,21 @@ class CommandProcessor:
         # Command timeout
         self.command_timeout = 5  # seconds
         self.last_audio_time = 0
+
+        # Ends the command on trailing silence instead of waiting for Vosk;
+        # its no-speech timeout replaces the command timeout when given
+        self.endpointer = endpointer or Endpointer(
+            sample_rate=sample_rate,
+            no_speech_timeout=self.command_timeout,
+            holdoff=preroll if bus is not None else 0.0
+        )
+
+        # Per-stage timing, exported on /metrics
+        self._asr_time = metrics.stage_histogram("command_asr")
+        self._intent_time = metrics.stage_histogram("intent")
+        self._command_time = metrics.stage_histogram("command")
+        # End of speech (stream clock) to the command being handled
+        self._endpoint_time = metrics.stage_histogram("end_of_speech_to_action")
         
     def start_listening(self):
         """Start listening for commands."""
@@ -61,88 +100,148 @@ class CommandProcessor:
         self.is_listening = True
         self._stop_event.clear()
         self.last_audio_time = time.time()
+        command_started = time.perf_counter()
         
         if self.on_listening:
             self.on_listening()
         
-        def audio_callback(indata, frames, time_info, status):
-            if status:
-                print(f"Error in audio stream: {status}")
-                return
-                
-            # Convert float32 to int16
-            audio_data = (indata.flatten() * 32767).astype(np.int16)
-            self.audio_queue.put(audio_data)
-            self.last_audio_time = time.time()
-            
-        # Start audio stream
-        with sd.InputStream(
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype=np.float32,
-            callback=audio_callback
-        ):
-            while not self._stop_event.is_set():
-                try:
-                    audio_data = self.audio_queue.get(timeout=0.5)
-                    
-                    # Check for command timeout
-                    if time.time() - self.last_audio_time > self.command_timeout:
-                        print("\nCommand timeout. Please try again.")
+        # Without a shared bus, open the microphone just for this command
+        owns_bus = self.bus is None
+        bus = CaptureBus(sample_rate=self.sample_rate) if owns_bus else self.bus
+        with (bus if owns_bus else nullcontext()):
+            self.subscription = subscription = bus.subscribe(
+                "command", preroll=0 if owns_bus else self.preroll, capacity=128
+            )
+            if self._stop_event.is_set():  # stopped while subscribing
+                subscription.close()
+
+            with subscription:
+                self.recognizer.Reset()
+                self.endpointer.reset()
+                heard = []  # finalized pieces that didn't make a command on their own
+                while not self._stop_event.is_set():
+                    try:
+                        # Feed Vosk everything buffered so far in a single call
+                        audio_data = subscription.read_many(timeout=0.5)
+                        if audio_data is None:
+                            if subscription.finished:
+                                # Offline audio ran out mid-command
+                                self._finish_command(heard, command_started, 0.0)
+                                break
+                            continue
+                        self.last_audio_time = time.time()
+
+                        # Process audio with Vosk
+                        with self._asr_time.time():
+                            final = self.recognizer.AcceptWaveform(audio_data.tobytes())
+                        if final:
+                            result = json.loads(self.recognizer.Result())
+                            text = result.get("text", "").strip()
+                            if text:
+                                if self._process_text(text, command_started):
+                                    self.stop_listening()
+                                    break
+                                heard.append(text)
+
+                        # Our own endpoint: stop as soon as the user stops talking
+                        event = self.endpointer.process(audio_data)
+                        if event == NO_SPEECH:
+                            print("\nCommand timeout. Please try again.")
+                            self.stop_listening()
+                            break
+                        if event in (END_OF_SPEECH, MAX_UTTERANCE):
+                            self._finish_command(heard, command_started, self.endpointer.trailing_time)
+                            self.stop_listening()
+                            break
+
+                    except Exception as e:
+                        print(f"Error processing command: {e}")
                         self.stop_listening()
                         break
-                        
-                    # Process audio with Vosk
-                    if self.recognizer.AcceptWaveform(audio_data.tobytes()):
-                        result = json.loads(self.recognizer.Result())
-                        text = result.get("text", "").strip()
-                        
-                        if text:
-                            if self.on_processing:
-                                self.on_processing()
-                                
-                            # Recognize and handle intent
-                            intent = self.intent_recognizer.recognize(text)
-                            if intent:
-                                if self.on_processing:
-                                    self.on_processing()
-                                response = self._handle_intent(intent)
-                                print(f"\n🤖 {response}")
-                                if self.on_command:
-                                    self.on_command(intent)
-                                self.stop_listening()
-                                break
-                            
-                except queue.Empty:
-                    continue
-                except Exception as e:
-                    print(f"Error processing command: {e}")
-                    self.stop_listening()
-                    break
-                    
+
+    def _finish_command(self, heard: List[str], command_started: float, trailing_time: float):
+        """Force the final transcript out of Vosk and act on it.
+
+        Args:
+            heard: Earlier finalized text of this command
+            command_started: ``perf_counter`` time listening started
+            trailing_time: Seconds of silence already heard after the speech
+        """
+        end_of_speech = time.perf_counter() - trailing_time if trailing_time else None
+        with self._asr_time.time():
+            result = json.loads(self.recognizer.FinalResult())
+        text = " ".join(heard + [result.get("text", "")]).strip()
+        if not text or not self._process_text(text, command_started, end_of_speech):
+            print("\n🤷 Sorry, I didn't catch that.")
+
+    def _process_text(self, text: str, command_started: float,
+                      end_of_speech: Optional[float] = None) -> bool:
+        """Recognize the intent in a transcript and queue it for handling.
+
+        Args:
+            text: Transcript
+            command_started: ``perf_counter`` time listening started
+            end_of_speech: ``perf_counter`` time the speech ended, if known
+
+        Returns:
+            True if an intent was recognized
+        """
+        if self.on_processing:
+            self.on_processing()
+
+        # Recognize here; handling may do I/O, so it goes to the worker
+        with self._intent_time.time():
+            intent = self.intent_recognizer.recognize(text)
+        if not intent:
+            return False
+        if self.on_processing:
+            self.on_processing()
+        on_done = partial(self._on_handled, command_started, end_of_speech)
+        if self.intent_worker.submit(intent, on_done) is None:
+            print("\n⏳ Still busy with earlier commands, please try again in a moment.")
+        return True
+
+    def _on_handled(self, command_started: float, end_of_speech: Optional[float],
+                    intent: Intent, response: str):
+        """Report a handled intent; runs on the intent worker."""
+        handled = time.perf_counter()
+        self._command_time.observe(handled - command_started)
+        if end_of_speech is not None:
+            self._endpoint_time.observe(handled - end_of_speech)
+        print(f"\n🤖 {response}")
+        if self.on_command:
+            self.on_command(intent)
+
     def stop_listening(self):
         """Stop listening for commands."""
         self._stop_event.set()
+        if self.subscription is not None:
+            self.subscription.close()
         self.is_listening = False
         
     def get_example_commands(self) -> Dict[str, Any]:
         """Get example commands that can be spoken."""
         return self.intent_recognizer.get_example_commands()
         
+    def register_handler(self, intent: str, func: Callable[..., str], required=(), optional=(),
+                         prompt: Optional[str] = None):
+        """Handle an intent with ``func``; see ``IntentDispatcher.register``."""
+        self.handlers.register(intent, func, required, optional, prompt)
+
+    def _register_builtin_handlers(self):
+        self.handlers.register("help", self._handle_help)
+        self.handlers.register("add_task", self._handle_add_task, required=("task_description",),
+                               prompt="What task would you like to add?")
+        self.handlers.register("list_tasks", self._handle_list_tasks)
+        self.handlers.register("set_reminder", self._handle_set_reminder,
+                               required=("task_description", "reminder_time"),
+                               prompt="Please specify both task and time for the reminder.")
+        self.handlers.register("delete_task", self._handle_delete_task, required=("task_id",),
+                               prompt="Which task would you like to mark as done?")
+
     def _handle_intent(self, intent: Intent) -> str:
         """Handle recognized intent and return response."""
-        if intent.name == "help":
-            return self._handle_help()
-        elif intent.name == "add_task":
-            return self._handle_add_task(intent)
-        elif intent.name == "list_tasks":
-            return self._handle_list_tasks()
-        elif intent.name == "set_reminder":
-            return self._handle_set_reminder(intent)
-        elif intent.name == "delete_task":
-            return self._handle_delete_task(intent)
-        else:
-            return "Sorry, I don't know how to handle that command yet."
+        return self.handlers.dispatch(intent)
     
     def _handle_help(self) -> str:
         """Handle help command."""
@@ -153,15 +252,11 @@ class CommandProcessor:
         - Delete task: 'delete task 1' or 'mark task 2 as done'
         - Help: 'what can you do' or 'help'"""
 
-    def _handle_add_task(self, intent: Intent) -> str:
+    def _handle_add_task(self, task_description: str) -> str:
         """Handle add task command."""
-        task = intent.parameters.get("task")
-        if not task:
-            return "What task would you like to add?"
-        
         # Add task without reminder
-        task_id = self.task_manager.add_task(task)
-        return f"Added task {task_id}: {task}"
+        task_id = self.task_manager.add_task(task_description)
+        return f"Added task {task_id}: {task_description}"
 
     def _handle_list_tasks(self) -> str:
         """Handle list tasks command."""
@@ -170,50 +265,34 @@ class CommandProcessor:
             return "You have no tasks."
         return "Listed your tasks above."
 
-    def _handle_set_reminder(self, intent: Intent) -> str:
+    def _handle_set_reminder(self, task_description: str, reminder_time: str) -> str:
         """Handle set reminder command."""
-        task = intent.parameters.get("task")
-        time_str = intent.parameters.get("time")
-        
-        if not task or not time_str:
-            return "Please specify both task and time for the reminder."
-        
         try:
-            # Parse the time string into a datetime
-            reminder_time = parser.parse(time_str)
-            
-            # If only time was given, assume today's date
-            if reminder_time.date() == datetime.now().date():
-                # If the time has already passed today, assume tomorrow
-                if reminder_time < datetime.now():
-                    reminder_time = reminder_time.replace(
-                        year=datetime.now().year,
-                        month=datetime.now().month,
-                        day=datetime.now().day + 1
-                    )
-            
-            # Add task with reminder
-            task_id = self.task_manager.add_task(task, reminder_time)
-            return f"Set reminder for task {task_id} at {reminder_time.strftime('%I:%M %p on %B %d')}"
-            
-        except ValueError as e:
-            return f"Sorry, I couldn't understand the time format: {time_str}"
+            when = datetime.fromisoformat(reminder_time)
+        except ValueError:
+            return f"Sorry, I couldn't understand the time format: {reminder_time}"
 
-    def _handle_delete_task(self, intent: Intent) -> str:
+        # "at 3pm" resolves to today; said at 4pm it means tomorrow
+        if when <= datetime.now():
+            when += timedelta(days=1)
+
+        # Add task with reminder
+        task_id = self.task_manager.add_task(task_description, when)
+        return f"Set reminder for task {task_id} at {when.strftime('%I:%M %p on %B %d')}"
+
+    def _handle_delete_task(self, task_id: str) -> str:
         """Handle delete task command."""
-        task_id_str = intent.parameters.get("task_id")
-        if not task_id_str:
-            return "Which task would you like to mark as done?"
-        
         try:
-            task_id = int(task_id_str)
-            if self.task_manager.complete_task(task_id):
-                return f"Marked task {task_id} as done"
-            return f"Couldn't find task {task_id}"
+            number = int(task_id)
         except ValueError:
-            return f"Invalid task number: {task_id_str}"
+            return f"Invalid task number: {task_id}"
+        if self.task_manager.complete_task(number):
+            return f"Marked task {number} as done"
+        return f"Couldn't find task {number}"
             
     def __del__(self):
         """Clean up resources."""
+        if hasattr(self, 'intent_worker'):
+            self.intent_worker.shutdown(wait=False)
         if hasattr(self, 'task_manager'):
             self.task_manager.stop_reminder_checker()
@@ -0,0 +1,344 @@
+"""Table-driven dispatch of recognized intents to their handlers.
+
+Handlers are plain functions or coroutines that take the intent's
+parameters as keyword arguments and return the reply text:
+
+    dispatcher = IntentDispatcher(recognizer)
+
+    @dispatcher.handler("add_task", required=("task_description",),
+                        prompt="What task would you like to add?")
+    def add_task(task_description: str) -> str:
+        ...
+
+Parameters are checked once, at registration. Every declared name must be
+one the intent's patterns can produce and one the handler accepts, and every
+handler argument without a default must be declared. A misspelled key then
+fails at startup instead of leaving the handler silently without its
+arguments. Dispatch is a dict lookup, and each handler's latency is
+recorded on ``/metrics``.
+
+``IntentWorker`` runs dispatch off the caller's thread, on a small bounded
+thread pool or an asyncio loop, so the audio loop that recognized the
+intent never waits on the database, notifications or the console.
+"""
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from voice_assistant import metrics
+from voice_assistant.nlu.intent_recognizer import Intent, IntentRecognizer
+
+HANDLER_SECONDS = "balancebuddy_intent_handler_seconds"
+
+UNKNOWN_INTENT_REPLY = "Sorry, I don't know how to handle that command yet."
+FAILED_REPLY = "Sorry, something went wrong handling that command."
+
+_workers = weakref.WeakSet()
+
+Handler = Callable[..., Union[str, Awaitable[str]]]
+
+
+@dataclass
+class RegisteredHandler:
+    intent: str
+    func: Handler
+    required: Tuple[str, ...]
+    optional: Tuple[str, ...]
+    prompt: Optional[str]
+    is_async: bool
+    latency: metrics.Histogram
+
+    def arguments(self, params: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Keyword arguments for the handler; None if a required one is missing."""
+        if any(not params.get(name) for name in self.required):
+            return None
+        return {name: params[name] for name in self.required + self.optional if params.get(name)}
+
+
+class IntentDispatcher:
+    """Maps intent names to handlers.
+
+    Args:
+        recognizer: Recognizer whose intents are handled; when given,
+            handlers are checked against the parameters its patterns produce
+        loop: Event loop to run async handlers on when dispatching from
+            another thread; without one each gets a fresh ``asyncio.run``
+    """
+
+    def __init__(
+        self,
+        recognizer: Optional[IntentRecognizer] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        self.recognizer = recognizer
+        self.loop = loop
+        self._handlers: Dict[str, RegisteredHandler] = {}
+
+    def register(
+        self,
+        intent: str,
+        func: Handler,
+        required: Iterable[str] = (),
+        optional: Iterable[str] = (),
+        prompt: Optional[str] = None
+    ):
+        """Register the handler for an intent.
+
+        Args:
+            intent: Intent name
+            func: Function or coroutine function called with the parameters
+                as keyword arguments, returning the reply
+            required: Parameters the handler needs; if one is missing the
+                handler isn't called and ``prompt`` is the reply
+            optional: Parameters passed along when present
+            prompt: Reply asking the user for missing parameters
+
+        Raises:
+            ValueError: If the intent already has a handler, or the
+                parameters don't fit the intent or the handler's signature
+        """
+        required, optional = tuple(required), tuple(optional)
+        if intent in self._handlers:
+            raise ValueError(f"Intent {intent} already has a handler")
+        declared = required + optional
+
+        if self.recognizer is not None:
+            known = self.recognizer.parameter_names()
+            if intent not in known:
+                raise ValueError(f"Unknown intent: {intent}")
+            unknown = [name for name in declared if name not in known[intent]]
+            if unknown:
+                raise ValueError(
+                    f"Intent {intent} never produces {', '.join(unknown)}; "
+                    f"it has {sorted(known[intent]) or 'no parameters'}"
+                )
+
+        signature = inspect.signature(func)
+        accepts_any = any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values())
+        for name in declared:
+            if name not in signature.parameters and not accepts_any:
+                raise ValueError(f"Handler for {intent} doesn't accept parameter {name}")
+        for name, parameter in signature.parameters.items():
+            needs_value = parameter.default is parameter.empty and parameter.kind not in (
+                parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD
+            )
+            if needs_value and name not in required:
+                raise ValueError(f"Handler for {intent} needs {name}, which is not a required parameter")
+
+        self._handlers[intent] = RegisteredHandler(
+            intent=intent,
+            func=func,
+            required=required,
+            optional=optional,
+            prompt=prompt,
+            is_async=inspect.iscoroutinefunction(func),
+            latency=metrics.registry.histogram(HANDLER_SECONDS, "Intent handler latency", intent=intent),
+        )
+
+    def handler(self, intent: str, required: Iterable[str] = (), optional: Iterable[str] = (),
+                prompt: Optional[str] = None):
+        """Decorator form of ``register``."""
+        def decorator(func: Handler) -> Handler:
+            self.register(intent, func, required, optional, prompt)
+            return func
+        return decorator
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self._handlers
+
+    def _prepare(self, intent: Intent):
+        """The handler and its arguments, or None and the reply to give instead."""
+        registered = self._handlers.get(intent.name)
+        if registered is None:
+            return None, UNKNOWN_INTENT_REPLY
+        kwargs = registered.arguments(intent.params)
+        if kwargs is None:
+            return None, registered.prompt or f"I need more details to {intent.name.replace('_', ' ')}."
+        return registered, kwargs
+
+    def dispatch(self, intent: Intent) -> str:
+        """Run the intent's handler and return its reply."""
+        registered, kwargs = self._prepare(intent)
+        if registered is None:
+            return kwargs
+
+        started = time.perf_counter()
+        try:
+            if not registered.is_async:
+                return registered.func(**kwargs)
+            if self.loop is not None and self.loop.is_running():
+                return asyncio.run_coroutine_threadsafe(registered.func(**kwargs), self.loop).result()
+            return asyncio.run(registered.func(**kwargs))
+        finally:
+            registered.latency.observe(time.perf_counter() - started)
+
+    async def dispatch_async(self, intent: Intent) -> str:
+        """Like ``dispatch``, from a coroutine; sync handlers run in the default executor."""
+        registered, kwargs = self._prepare(intent)
+        if registered is None:
+            return kwargs
+
+        started = time.perf_counter()
+        try:
+            if registered.is_async:
+                return await registered.func(**kwargs)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: registered.func(**kwargs))
+        finally:
+            registered.latency.observe(time.perf_counter() - started)
+
+
+class IntentWorker:
+    """Handles intents in the background and reports replies to a callback.
+
+    At most ``max_pending`` intents are queued or running at once; further
+    submissions are refused rather than queued, so a stuck handler can't
+    build an unbounded backlog.
+
+    Args:
+        dispatcher: Dispatcher that runs the handlers
+        workers: Handler threads; unused when ``loop`` is given
+        max_pending: Intents allowed to be queued or running
+        name: Label for the queue metrics on ``/metrics``
+        loop: Running event loop to handle intents on with
+            ``dispatch_async`` instead of a thread pool
+    """
+
+    def __init__(
+        self,
+        dispatcher: IntentDispatcher,
+        workers: int = 2,
+        max_pending: int = 16,
+        name: str = "intents",
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        self.dispatcher = dispatcher
+        self.max_pending = max_pending
+        self.name = name
+        self.loop = loop
+        self.executor = None if loop is not None else ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"{name}-handler")
+        self._idle = threading.Condition()
+
+        # Counters
+        self.pending = 0
+        self.high_water = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+        self._wait_time = metrics.stage_histogram("intent_queue")
+        self._handle_time = metrics.stage_histogram("handle_intent")
+        _workers.add(self)
+
+    def submit(self, intent: Intent,
+               on_done: Optional[Callable[[Intent, str], None]] = None) -> Optional[Future]:
+        """Queue an intent for handling without waiting for it.
+
+        Args:
+            intent: Recognized intent
+            on_done: Called with the intent and its reply once handled, on
+                the worker thread or loop; failed handlers reply
+                ``FAILED_REPLY``
+
+        Returns:
+            Future of the reply, or None if too many intents are pending
+        """
+        with self._idle:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                return None
+            self.pending += 1
+            self.high_water = max(self.high_water, self.pending)
+
+        submitted = time.perf_counter()
+        try:
+            if self.executor is not None:
+                future = self.executor.submit(self._run, intent, submitted)
+            else:
+                future = asyncio.run_coroutine_threadsafe(self._run_async(intent, submitted), self.loop)
+        except RuntimeError:  # shut down, or the loop is closed
+            self._finished()
+            raise
+        future.add_done_callback(lambda done: self._complete(intent, done, on_done))
+        return future
+
+    def _run(self, intent: Intent, submitted: float) -> str:
+        started = time.perf_counter()
+        self._wait_time.observe(started - submitted)
+        try:
+            return self.dispatcher.dispatch(intent)
+        finally:
+            self._handle_time.observe(time.perf_counter() - started)
+
+    async def _run_async(self, intent: Intent, submitted: float) -> str:
+        started = time.perf_counter()
+        self._wait_time.observe(started - submitted)
+        try:
+            return await self.dispatcher.dispatch_async(intent)
+        finally:
+            self._handle_time.observe(time.perf_counter() - started)
+
+    def _complete(self, intent: Intent, future: Future, on_done: Optional[Callable[[Intent, str], None]]):
+        outcome = "completed"
+        try:
+            reply = future.result()
+        except Exception as e:
+            print(f"Error handling {intent.name}: {e}")
+            reply, outcome = FAILED_REPLY, "failed"
+        try:
+            if on_done is not None:
+                on_done(intent, reply)
+        finally:
+            self._finished(outcome)
+
+    def _finished(self, outcome: Optional[str] = None):
+        with self._idle:
+            self.pending -= 1
+            if outcome == "completed":
+                self.completed += 1
+            elif outcome == "failed":
+                self.failed += 1
+            self._idle.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is pending; False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stop taking intents; with ``wait``, finish the pending ones first."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+        elif wait:
+            self.join()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self.pending,
+            "high_water": self.high_water,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+def _collect_metrics():
+    """Backlog and outcome counters of all live intent workers."""
+    for worker in list(_workers):
+        labels = {"worker": worker.name}
+        yield ("balancebuddy_intent_queue_depth", "gauge",
+               "Intents queued or being handled", labels, worker.pending)
+        yield ("balancebuddy_intent_queue_high_water", "gauge",
+               "Most intents pending at once", labels, worker.high_water)
+        for outcome in ("completed", "failed", "rejected"):
+            yield ("balancebuddy_intents_total", "counter", "Intents submitted for handling",
+                   dict(labels, outcome=outcome), getattr(worker, outcome))
+
+
+metrics.registry.register_collector(_collect_metrics)
@@ -1,10 +1,13 @@
-"""Intent recognition for voice commands using a simple rule-based approach."""
+"""Intent recognition for voice commands: regex rules, with an optional classifier fallback."""
 import re
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Iterable, List, Set, Tuple
+from datetime import date, datetime, timedelta
 import parsedatetime
 
+from voice_assistant.nlu.cache import MISSING, LRUCache
+from voice_assistant.nlu.classifier import NO_INTENT, HashedNgramClassifier
+
 @dataclass
 class Intent:
     """Represents a recognized intent with extracted parameters."""
@@ -12,16 +15,66 @@ class Intent:
     confidence: float
     params: Dict[str, str]
 
+RULE_CONFIDENCE = 0.9
+
+# Higher priority wins when several intents match the same text
+DEFAULT_PRIORITIES = {
+    "set_reminder": 10,  # "remind me to X at 3pm" is a reminder, not just a task
+}
+
+# How a cached time expression is re-applied to the current clock
+OFFSET = "offset"      # "in 2 hours", "friday": now + delta
+ANCHORED = "anchored"  # "at 3pm", "9am tomorrow": today's midnight + delta
+
+
+@dataclass(frozen=True)
+class TimeResolution:
+    """A parsed time expression, re-resolvable against a later clock."""
+    kind: str
+    delta: timedelta
+    valid_on: Optional[date] = None  # set when delta depends on the date, e.g. weekdays
+
+    def resolve(self, now: datetime) -> datetime:
+        if self.kind == ANCHORED:
+            return datetime.combine(now.date(), datetime.min.time()) + self.delta
+        return now + self.delta
+
+    def is_valid(self, now: datetime) -> bool:
+        return self.valid_on is None or self.valid_on == now.date()
+
+
+# Named groups become parameters; prefixed to stay unique in the combined pattern
+_GROUP_NAME = re.compile(r"\(\?P(<|=)(\w+)")
+
+
 class IntentRecognizer:
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = 4096,
+        time_cache_size: int = 1024,
+        fallback_model: Optional[str] = None,
+        fallback_threshold: float = 0.7
+    ):
+        """Set up the patterns and the memoization caches.
+
+        Args:
+            cache_size: Normalized texts whose match is remembered
+            time_cache_size: Time expressions whose resolution is remembered
+            fallback_model: ``.npz`` classifier for texts no pattern matches,
+                loaded on first use; see ``voice_assistant.nlu.classifier``
+            fallback_threshold: Lowest classifier probability accepted
+        """
         self.cal = parsedatetime.Calendar()
+        # Voice users repeat themselves; matches and parsed times are memoized
+        self.intent_cache = LRUCache(cache_size, name="intent")
+        self.time_cache = LRUCache(time_cache_size, name="time_expression")
         
-        # Define intent patterns
+        # Define intent patterns; named groups are the intent's parameters
         self.intent_patterns = {
             "add_task": [
-                r"add (?:a )?task(?: to)?(?: do)? (.+)",
-                r"create (?:a )?task(?: to)? (.+)",
-                r"remind me to (.+)",
+                r"add (?:a )?task(?: to)?(?: do)? (?P<task_description>.+)",
+                r"create (?:a )?task(?: to)? (?P<task_description>.+)",
+                r"remind me to (?P<task_description>.+)",
             ],
             "list_tasks": [
                 r"(?:show|list|what are)(?: my)? tasks",
@@ -29,76 +82,290 @@ class IntentRecognizer:
                 r"show my to[- ]do list",
             ],
             "set_reminder": [
-                r"remind me (?:to )?(.+?) (?:at|on|in) (.+)",
-                r"set (?:a )?reminder (?:to )?(.+?) (?:at|on|in) (.+)",
+                r"remind me (?:to )?(?P<task_description>.+?) (?:at|on|in) (?P<time>.+)",
+                r"set (?:a )?reminder (?:to )?(?P<task_description>.+?) (?:at|on|in) (?P<time>.+)",
             ],
             "delete_task": [
-                r"(?:delete|remove|complete) task (.+)",
-                r"mark task (.+)(?: as)? (?:done|complete|finished)",
+                r"(?:delete|remove|complete) task (?P<task_id>.+)",
+                r"mark task (?P<task_id>.+?)(?: as)? (?:done|complete|finished)",
             ],
             "help": [
                 r"(?:what can you|help|how do you) do",
                 r"what (?:commands|things) can i say",
             ]
         }
-        
-        # Compile patterns
-        self.compiled_patterns = {
-            intent: [re.compile(p, re.IGNORECASE) for p in patterns]
-            for intent, patterns in self.intent_patterns.items()
-        }
+        self.priorities = dict(DEFAULT_PRIORITIES)
+        self.fallback_model = fallback_model
+        self.fallback_threshold = fallback_threshold
+        self._fallback: Optional[HashedNgramClassifier] = None
+        self._matcher = None  # compiled on first use
 
-    def recognize(self, text: str) -> Optional[Intent]:
+    def add_intent(self, name: str, patterns: List[str], priority: int = 0):
+        """Register patterns for an intent, appending if it exists.
+
+        Args:
+            name: Intent name
+            patterns: Regexes matched against the start of the lowercased
+                text; named groups become the intent's parameters
+            priority: Intents with a higher priority are preferred when
+                several match; ties go to the one defined first
+        """
+        self.intent_patterns.setdefault(name, []).extend(patterns)
+        self.priorities[name] = priority
+        self._matcher = None
+        self.intent_cache.clear()
+
+    @property
+    def matcher(self) -> re.Pattern:
+        if self._matcher is None:
+            self._compile()
+        return self._matcher
+
+    def _compile(self):
+        """Combine every pattern into one regex, highest priority first.
+
+        ``re`` tries alternatives in order and stops at the first that
+        matches, so one ``match`` call finds the best intent. Each
+        alternative ends in an empty marker group, the last group to close,
+        so ``lastgroup`` says which pattern matched. The marker goes after
+        the pattern rather than around it: wrapping alternatives in capture
+        groups stops ``re`` from merging their common prefixes, which made
+        the combined regex slower than trying patterns one by one.
+        """
+        order = sorted(
+            self.intent_patterns,
+            key=lambda intent: -self.priorities.get(intent, 0)
+        )  # stable: ties keep definition order
+        alternatives = []
+        self._alternatives: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        self._ordered: List[Tuple[str, str, str]] = []  # (key, intent, pattern) in match order
+        for intent_name in order:
+            for pattern in self.intent_patterns[intent_name]:
+                key = f"_{len(alternatives)}"
+                params = {}
+
+                def prefix(match, key=key, params=params):
+                    params[f"{key}_{match.group(2)}"] = match.group(2)
+                    return f"(?P{match.group(1)}{key}_{match.group(2)}"
+
+                alternatives.append(f"(?:{_GROUP_NAME.sub(prefix, pattern)})(?P<{key}>)")
+                self._alternatives[key] = (intent_name, params)
+                self._ordered.append((key, intent_name, pattern))
+        self._matcher = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def recognize(self, text: str, now: Optional[datetime] = None) -> Optional[Intent]:
         """Recognize intent from text input.
         
         Args:
             text: Input text to recognize intent from
+            now: Clock that relative times resolve against; defaults to now
             
         Returns:
             Intent object if recognized, None otherwise
         """
-        text = text.lower().strip()
-        
-        # Try each intent pattern
-        for intent_name, patterns in self.compiled_patterns.items():
-            for pattern in patterns:
-                match = pattern.match(text)
-                if match:
-                    params = {}
-                    
-                    # Extract parameters based on intent
-                    if intent_name == "add_task":
-                        params["task_description"] = match.group(1)
-                        
-                    elif intent_name == "set_reminder":
-                        params["task_description"] = match.group(1)
-                        time_str = match.group(2)
-                        parsed_time = self._parse_time(time_str)
-                        if parsed_time:
-                            params["reminder_time"] = parsed_time.isoformat()
-                        
-                    elif intent_name == "delete_task":
-                        params["task_id"] = match.group(1)
-                    
-                    return Intent(
-                        name=intent_name,
-                        confidence=0.9,  # Fixed for rule-based
-                        params=params
-                    )
+        text = " ".join(text.lower().split())
         
+        match = self.intent_cache.get(text)
+        if match is MISSING:
+            match = self._match(text)
+            self.intent_cache.put(text, match)
+        if match is None:
+            return None
+
+        time_str = match[1].get("time")
+        parsed_time = self._parse_time(time_str, now) if time_str is not None else None
+        return self._make_intent(match, parsed_time.isoformat() if parsed_time else None)
+
+    def recognize_many(self, texts: Iterable[str], now: Optional[datetime] = None) -> List[Optional[Intent]]:
+        """Recognize a batch of texts; same results as ``recognize`` on each.
+
+        Each distinct normalized text is matched once and each distinct time
+        expression is parsed once, all against one clock. Matching bypasses
+        the LRU cache, so replaying a large log doesn't evict what live
+        traffic relies on.
+
+        Args:
+            texts: Input texts
+            now: Clock that relative times resolve against; defaults to now
+
+        Returns:
+            One Intent or None per input text, in order
+        """
+        now = now or datetime.now()
+        normalized = [" ".join(text.lower().split()) for text in texts]
+
+        matches: Dict[str, Optional[Tuple[str, Dict[str, str], float]]] = {}
+        for text in normalized:
+            if text not in matches:
+                matches[text] = self._match(text)
+
+        times: Dict[str, Optional[str]] = {}
+        for match in matches.values():
+            if match is not None and "time" in match[1] and match[1]["time"] not in times:
+                parsed_time = self._parse_time(match[1]["time"], now)
+                times[match[1]["time"]] = parsed_time.isoformat() if parsed_time else None
+
+        intents = []
+        for text in normalized:
+            match = matches[text]
+            if match is None:
+                intents.append(None)
+            else:
+                intents.append(self._make_intent(match, times.get(match[1].get("time"))))
+        return intents
+
+    @staticmethod
+    def _make_intent(match: Tuple[str, Dict[str, str], float], reminder_time: Optional[str]) -> Intent:
+        intent_name, params, confidence = match
+        params = dict(params)  # the cached copy must stay untouched
+
+        # The raw time expression is replaced by its resolved time
+        if params.pop("time", None) is not None and reminder_time:
+            params["reminder_time"] = reminder_time
+
+        return Intent(
+            name=intent_name,
+            confidence=confidence,
+            params=params
+        )
+
+    def _match(self, text: str) -> Optional[Tuple[str, Dict[str, str], float]]:
+        """Intent name, raw parameters and confidence for normalized text."""
+        return self._match_rules(text) or self._classify(text)
+
+    def _match_rules(self, text: str) -> Optional[Tuple[str, Dict[str, str], float]]:
+        match = self.matcher.match(text)
+        if not match:
+            return None
+        intent_name, groups = self._alternatives[match.lastgroup]
+        params = {}
+        for group, name in groups.items():
+            value = match.group(group)
+            if value is not None:
+                params[name] = value
+        if self._has_time(params):
+            return intent_name, params, RULE_CONFIDENCE
+        return self._match_after(text, match.lastgroup)
+
+    def _match_after(self, text: str, key: str) -> Optional[Tuple[str, Dict[str, str], float]]:
+        """Try the alternatives after ``key`` one by one.
+
+        Used when the combined regex matched a pattern whose time expression
+        doesn't parse, e.g. "remind me to log in to the portal": that is a
+        task, not a reminder "log" at "to the portal".
+        """
+        keys = [entry[0] for entry in self._ordered]
+        for _, intent_name, pattern in self._ordered[keys.index(key) + 1:]:
+            match = re.match(pattern, text, re.IGNORECASE)
+            if match:
+                params = {name: value for name, value in match.groupdict().items() if value is not None}
+                if self._has_time(params):
+                    return intent_name, params, RULE_CONFIDENCE
         return None
+
+    def _has_time(self, params: Dict[str, str]) -> bool:
+        """False if ``params`` carry a time expression that doesn't parse."""
+        return "time" not in params or self._parse_time(params["time"]) is not None
+
+    @property
+    def fallback(self) -> Optional[HashedNgramClassifier]:
+        """The fallback classifier, loaded on first use; None without one."""
+        if self._fallback is None and self.fallback_model is not None:
+            try:
+                self._fallback = HashedNgramClassifier.load(self.fallback_model)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Couldn't load intent model {self.fallback_model}: {e}")
+                self.fallback_model = None
+        return self._fallback
+
+    def _classify(self, text: str) -> Optional[Tuple[str, Dict[str, str], float]]:
+        """Best guess for text no pattern matched; parameters are left to the handler's prompt."""
+        if self.fallback is None or not text:
+            return None
+        label, probability = self._fallback.predict(text)
+        if label == NO_INTENT or label not in self.intent_patterns or probability < self.fallback_threshold:
+            return None
+        return label, {}, probability
+
+    def parameter_names(self) -> Dict[str, Set[str]]:
+        """Parameters each intent can produce, as handlers receive them."""
+        names = {}
+        for intent_name, patterns in self.intent_patterns.items():
+            params = names.setdefault(intent_name, set())
+            for pattern in patterns:
+                params.update(m.group(2) for m in _GROUP_NAME.finditer(pattern) if m.group(1) == "<")
+            if "time" in params:  # resolved by recognize()
+                params.discard("time")
+                params.add("reminder_time")
+        return names
+
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        """Size, hits, misses and hit rate of the intent and time caches."""
+        return {"intent": self.intent_cache.stats(), "time": self.time_cache.stats()}
     
-    def _parse_time(self, time_str: str) -> Optional[datetime]:
+    def _parse_time(self, time_str: str, now: Optional[datetime] = None) -> Optional[datetime]:
         """Parse time string into datetime object."""
+        now = (now or datetime.now()).replace(microsecond=0)  # parsedatetime has whole seconds
+        key = " ".join(time_str.lower().split())
+        resolution = self.time_cache.get(key, is_valid=lambda r: r is None or r.is_valid(now))
+        if resolution is not MISSING:
+            return resolution.resolve(now) if resolution else None
+
+        resolution, result = self._resolve_time(key, now)
+        if resolution is not None or result is None:  # unparseable text is remembered too
+            self.time_cache.put(key, resolution)
+        return result
+
+    def _parse_at(self, time_str: str, now: datetime) -> Optional[datetime]:
         try:
             # Use parsedatetime to handle natural language time expressions
-            struct_time, parse_status = self.cal.parse(time_str)
+            struct_time, parse_status = self.cal.parse(time_str, sourceTime=now.timetuple())
             if parse_status > 0:
                 return datetime(*struct_time[:6])
         except Exception as e:
             print(f"Error parsing time: {e}")
         return None
 
+    def _resolve_time(
+        self, time_str: str, now: datetime
+    ) -> Tuple[Optional[TimeResolution], Optional[datetime]]:
+        """Parse a time expression and work out how it moves with the clock.
+
+        The expression is also parsed against a second time today and a time
+        on another day. If the result keeps its distance from the clock, it
+        is an offset; if it keeps its distance from midnight, it is anchored
+        to the day. Either holds on any date if the other-day probe agrees,
+        and only today otherwise (e.g. "friday", "next monday"). Anything
+        else is not cached.
+
+        Returns:
+            The resolution, or None if it can't be reused, and the time now
+        """
+        result = self._parse_at(time_str, now)
+        if result is None:
+            return None, None
+        # A probe on the same date, and one on another weekday
+        step = timedelta(hours=1, minutes=1, seconds=1)
+        same_day = now - step if (now - step).date() == now.date() else now + step
+        other_day = now - timedelta(days=1) - step
+        offset = result - now
+
+        same_day_result = self._parse_at(time_str, same_day)
+        other_day_result = self._parse_at(time_str, other_day)
+
+        def midnight(moment: datetime) -> datetime:
+            return datetime.combine(moment.date(), datetime.min.time())
+
+        if same_day_result is not None and same_day_result - same_day == offset:
+            kind, delta = OFFSET, offset
+            any_day = other_day_result is not None and other_day_result - other_day == offset
+        elif same_day_result == result:
+            kind, delta = ANCHORED, result - midnight(now)
+            any_day = other_day_result is not None and other_day_result - midnight(other_day) == delta
+        else:
+            return None, result
+        return TimeResolution(kind, delta, None if any_day else now.date()), result
+
     def get_example_commands(self) -> Dict[str, List[str]]:
         """Get example commands for each intent."""
         examples = {
@@ -0,0 +1,153 @@
+"""Replay logged transcripts through intent recognition.
+
+Reads JSONL transcript logs (plain or gzipped), for example the output of
+``voice_assistant.asr.batch``, recognizes them in batches with
+``IntentRecognizer.recognize_many`` and reports the intent distribution,
+the unmatched rate, the most common unmatched utterances and throughput.
+Run it before and after changing intent patterns to see what moved.
+
+    python -m voice_assistant.nlu.replay logs/2026-10-*.jsonl.gz
+    python -m voice_assistant.nlu.replay transcripts.jsonl --output intents.jsonl --json report.json
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime
+from typing import IO, Iterator, List, Optional
+
+from voice_assistant.nlu.intent_recognizer import IntentRecognizer
+
+
+def _open(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_batches(paths: List[str], field: str = "text", batch_size: int = 10000) -> Iterator[List[dict]]:
+    """Log records that have a ``field`` string, in batches; bad lines are skipped."""
+    batch = []
+    for path in paths:
+        with _open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get(field), str):
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+    if batch:
+        yield batch
+
+
+def replay(
+    paths: List[str],
+    field: str = "text",
+    batch_size: int = 10000,
+    output: Optional[IO[str]] = None,
+    now: Optional[datetime] = None,
+    top_unmatched: int = 20
+) -> dict:
+    """Recognize every logged transcript and summarize the results.
+
+    Args:
+        paths: JSONL log files, optionally gzipped
+        field: Record field holding the transcript
+        batch_size: Records per ``recognize_many`` call
+        output: Where to write each record with its ``intent`` added
+        now: Clock relative times resolve against, fixed for the whole replay
+        top_unmatched: Most common unmatched utterances to report
+    """
+    recognizer = IntentRecognizer()
+    now = now or datetime.now()
+    intents, unmatched = Counter(), Counter()
+    total = 0
+    recognize_s = 0.0
+    start = time.perf_counter()
+
+    for batch in read_batches(paths, field, batch_size):
+        texts = [record[field] for record in batch]
+        started = time.perf_counter()
+        results = recognizer.recognize_many(texts, now)
+        recognize_s += time.perf_counter() - started
+
+        total += len(batch)
+        for text, intent in zip(texts, results):
+            if intent is None:
+                unmatched[" ".join(text.lower().split())] += 1
+            else:
+                intents[intent.name] += 1
+        if output is not None:
+            for record, intent in zip(batch, results):
+                record["intent"] = asdict(intent) if intent else None
+                output.write(json.dumps(record) + "\n")
+
+    wall = time.perf_counter() - start
+    unmatched_count = sum(unmatched.values())
+    return {
+        "utterances": total,
+        "distinct_unmatched": len(unmatched),
+        "intents": dict(intents.most_common()),
+        "unmatched": unmatched_count,
+        "unmatched_rate": unmatched_count / total if total else 0.0,
+        "top_unmatched": unmatched.most_common(top_unmatched),
+        "wall_s": wall,
+        "recognize_s": recognize_s,
+        "utterances_per_s": total / recognize_s if recognize_s else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("logs", nargs="+", help="JSONL transcript logs (.jsonl or .jsonl.gz)")
+    parser.add_argument("--field", default="text", help="Record field holding the transcript")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Utterances per batch")
+    parser.add_argument("--output", help="Write every record with its recognized intent to this JSONL file")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--top-unmatched", type=int, default=20, help="Unmatched utterances to list")
+    args = parser.parse_args(argv)
+
+    print(f"🔁 Replaying {len(args.logs)} log file(s)...")
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        report = replay(args.logs, args.field, args.batch_size, output, top_unmatched=args.top_unmatched)
+    finally:
+        if output is not None:
+            output.close()
+
+    total = report["utterances"]
+    if not total:
+        print(f"❌ No records with a \"{args.field}\" field found")
+        return 1
+
+    print(f"\n📊 {total} utterances in {report['wall_s']:.2f} s")
+    print(f"Utterances/sec: {report['utterances_per_s']:,.0f} (recognition only)")
+    print(f"Unmatched:      {report['unmatched']} ({report['unmatched_rate']:.1%}), "
+          f"{report['distinct_unmatched']} distinct\n")
+    print(f"{'intent':<20}{'count':>10}{'share':>8}")
+    for name, count in report["intents"].items():
+        print(f"{name:<20}{count:>10}{count / total:>8.1%}")
+    if report["top_unmatched"]:
+        print("\nMost common unmatched:")
+        for text, count in report["top_unmatched"]:
+            print(f"{count:>8}  {text}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.output:
+        print(f"\n✅ Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""Event-driven task reminders from an in-memory min-heap.
+
+The dispatcher thread sleeps until the earliest pending reminder is due,
+instead of polling the database. Reminders are loaded from the database in
+time order, ``batch`` at a time; the next batch is read only once the
+loaded ones have fired, so an idle assistant makes no queries at all.
+``schedule`` adds a reminder created in this process and wakes the thread
+if it is now the earliest.
+
+Firing claims the reminders in the database first, so each is delivered at
+most once and never for a task completed in the meantime.
+"""
+import heapq
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from voice_assistant import metrics
+from voice_assistant.db.database import Database
+
+# Longest sleep between looks at the clock, so wall-clock jumps are noticed
+MAX_SLEEP = 60.0
+
+
+class ReminderDispatcher:
+    """Fires task reminders at their due time.
+
+    Args:
+        db: Task database
+        on_due: Called on the dispatcher thread with the due tasks (dicts
+            with ``id``, ``title`` and ``reminder_time``)
+        user_id: Whose reminders to fire; None for the local assistant
+        batch: Reminders loaded from the database per query
+        clock: Returns the current local time
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        on_due: Callable[[List[Dict[str, Any]]], None],
+        user_id: Optional[int] = None,
+        batch: int = 1000,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.db = db
+        self.on_due = on_due
+        self.user_id = user_id
+        self.batch = batch
+        self.clock = clock
+
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._cancelled = set()
+        # Every pending reminder up to this time is in the heap; None before
+        # the first load, datetime.max once all of them are
+        self._loaded_until: Optional[datetime] = None
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self.loads = 0
+        self.fired = 0
+        self._lateness = metrics.registry.histogram(
+            "balancebuddy_reminder_lateness_seconds", "Reminder delivery time after its due time")
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the dispatcher thread; returns as soon as it wakes."""
+        if self._thread is not None:
+            with self._wakeup:
+                self._stopping = True
+                self._wakeup.notify()
+            self._thread.join()
+            self._thread = None
+
+    def schedule(self, task_id: int, title: str, reminder_time: datetime):
+        """Add a reminder just stored in the database."""
+        with self._wakeup:
+            if self._loaded_until is None or reminder_time > self._loaded_until:
+                return  # a later load reads it from the database
+            earliest = self._heap[0][0] if self._heap else None
+            heapq.heappush(self._heap, (reminder_time, task_id, title))
+            if earliest is None or reminder_time < earliest:
+                self._wakeup.notify()
+
+    def cancel(self, task_id: int):
+        """Drop a pending reminder, e.g. because its task was completed."""
+        with self._wakeup:
+            if any(entry[1] == task_id for entry in self._heap):
+                self._cancelled.add(task_id)
+
+    def _load(self):
+        """Read the next batch of pending reminders; called with the lock held."""
+        tasks = self.db.get_due_tasks(
+            datetime.max, user_id=self.user_id, limit=self.batch, after=self._loaded_until)
+        self.loads += 1
+        for task in tasks:
+            heapq.heappush(self._heap, (task["reminder_time"], task["id"], task["title"]))
+        # A full batch may have stopped partway through its last timestamp;
+        # the rest of that timestamp comes with the next load
+        self._loaded_until = tasks[-1]["reminder_time"] if len(tasks) == self.batch else datetime.max
+
+    def _pop_due(self, now: datetime) -> List[Tuple[datetime, int, str]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if entry[1] in self._cancelled:
+                self._cancelled.discard(entry[1])
+            else:
+                due.append(entry)
+        return due
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if self._stopping:
+                    return
+                if not self._heap and self._loaded_until != datetime.max:
+                    self._load()
+                now = self.clock()
+                due = self._pop_due(now)
+                if not due and not self._heap and self._loaded_until != datetime.max:
+                    continue  # only cancelled reminders were left; load the next batch
+                if not due:
+                    timeout = None
+                    if self._heap:
+                        timeout = min(max((self._heap[0][0] - now).total_seconds(), 0.0), MAX_SLEEP)
+                    self._wakeup.wait(timeout)
+                    continue
+            self._fire(due)
+
+    def _fire(self, due: List[Tuple[datetime, int, str]]):
+        with metrics.stage("reminder_fire"):
+            claimed = set(self.db.claim_reminders(task_id for _, task_id, _ in due))
+            tasks = []
+            for reminder_time, task_id, title in due:
+                if task_id in claimed:
+                    claimed.discard(task_id)  # queued twice, delivered once
+                    tasks.append({"id": task_id, "title": title, "reminder_time": reminder_time})
+            if not tasks:
+                return
+            delivered = self.clock()
+            for task in tasks:
+                self._lateness.observe((delivered - task["reminder_time"]).total_seconds())
+            self.fired += len(tasks)
+            try:
+                self.on_due(tasks)
+            except Exception as e:
+                print(f"Error delivering reminders: {e}")
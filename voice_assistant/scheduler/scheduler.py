@@ -1,7 +1,6 @@
 """Scheduler for BalanceBuddy notifications."""
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from plyer import notification
 from datetime import datetime, time
 import pytz
 
@@ -72,6 +71,7 @@ class NotificationScheduler:
             
     def _show_meal_notification(self, meal_type: str):
         """Show a meal reminder notification."""
+        from plyer import notification  # deferred: only needed when a reminder fires
         notification.notify(
             title='BalanceBuddy Meal Reminder',
             message=f"Time for {meal_type}! Check your meal plan.",
@@ -81,6 +81,7 @@ class NotificationScheduler:
         
     def _show_workout_notification(self):
         """Show a workout reminder notification."""
+        from plyer import notification
         notification.notify(
             title='BalanceBuddy Workout Reminder',
             message="Time to work out! Check your exercise plan.",
@@ -0,0 +1,150 @@
+"""Cold start profiling: import time per module and initialization steps.
+
+Import cost is measured in a fresh interpreter with ``python -X importtime``
+so nothing is cached, and attributed to modules and top-level packages.
+Initialization after import is timed with ``step``; the durations are
+exported as ``balancebuddy_startup_seconds{step=...}`` and printed at
+startup when ``BALANCEBUDDY_PROFILE_STARTUP`` is set:
+
+    with startup.step("database"):
+        Database(db_url=DATABASE_URL)
+
+The command line profiles an entry point and can enforce a budget, e.g. in
+CI, failing when the cold import gets slower or pulls in a heavy package:
+
+    python -m voice_assistant.startup voice_assistant.api.server --budget-ms 1500 --forbid scipy vosk
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+from voice_assistant import metrics
+
+PROFILE_ENV = "BALANCEBUDDY_PROFILE_STARTUP"
+
+_steps: Dict[str, float] = {}
+
+
+def enabled() -> bool:
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+@contextmanager
+def step(name: str):
+    """Time one initialization step of the process."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _steps[name] = time.perf_counter() - started
+
+
+def print_steps():
+    """Print the initialization steps timed so far, slowest first."""
+    print("\n⏱️ Startup steps:")
+    for name, seconds in sorted(_steps.items(), key=lambda item: -item[1]):
+        print(f"   {name:<24}{seconds * 1000:>9.1f} ms")
+
+
+def _collect_metrics():
+    for name, seconds in list(_steps.items()):
+        yield ("balancebuddy_startup_seconds", "gauge", "Time spent in a startup step",
+               {"step": name}, seconds)
+
+
+metrics.registry.register_collector(_collect_metrics)
+
+
+def profile_import(module: str, python: str = sys.executable) -> dict:
+    """Import ``module`` in a fresh interpreter and break down where the time went.
+
+    Returns:
+        ``wall_s`` for the import statement, the names of all ``loaded``
+        modules, and per module ``self_s``/``cumulative_s`` in import order
+    """
+    code = (
+        "import sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - started)\n"
+        "print('\\n'.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run([python, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "name": name.strip(),
+            "self_s": int(self_us) / 1e6,
+            "cumulative_s": int(cumulative_us) / 1e6,
+        })
+    wall, *loaded = result.stdout.split()
+    return {"module": module, "wall_s": float(wall), "loaded": loaded, "modules": modules}
+
+
+def by_package(profile: dict) -> Dict[str, float]:
+    """Own import time summed per top-level package, slowest first."""
+    totals = defaultdict(float)
+    for entry in profile["modules"]:
+        totals[entry["name"].split(".")[0]] += entry["self_s"]
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the cold import of an entry point")
+    parser.add_argument("modules", nargs="*", default=["voice_assistant.api.server"], help="Modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module; the fastest counts")
+    parser.add_argument("--top", type=int, default=15, help="Packages and modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if a cold import takes longer")
+    parser.add_argument("--forbid", nargs="+", default=[], help="Fail if any of these packages get imported")
+    parser.add_argument("--json", help="Write the profiles to this file")
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    profiles = []
+    for module in args.modules:
+        profile = min((profile_import(module) for _ in range(args.repeat)), key=lambda p: p["wall_s"])
+        profiles.append(profile)
+        wall_ms = profile["wall_s"] * 1000
+        print(f"\n🚀 {module}: {wall_ms:.0f} ms cold import (best of {args.repeat}), "
+              f"{len(profile['loaded'])} modules loaded")
+
+        print(f"\n{'package':<32}{'self ms':>10}")
+        for package, seconds in list(by_package(profile).items())[:args.top]:
+            print(f"{package:<32}{seconds * 1000:>10.1f}")
+        print(f"\n{'module':<48}{'self ms':>10}{'cum ms':>10}")
+        for entry in sorted(profile["modules"], key=lambda e: -e["self_s"])[:args.top]:
+            print(f"{entry['name']:<48}{entry['self_s'] * 1000:>10.1f}{entry['cumulative_s'] * 1000:>10.1f}")
+
+        if args.budget_ms is not None and wall_ms > args.budget_ms:
+            failures.append(f"{module} took {wall_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+        loaded = set(profile["loaded"])
+        for package in args.forbid:
+            if package in loaded:
+                failures.append(f"{module} imports {package}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(profiles, f, indent=2)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    if args.budget_ms is not None or args.forbid:
+        print("\n✅ Within the cold start budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
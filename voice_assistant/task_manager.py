@@ -1,53 +1,44 @@
 """Task manager module for handling tasks and reminders."""
-import os
 from datetime import datetime
-import threading
-import time
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-from plyer import notification
+from voice_assistant import metrics
 from voice_assistant.db.database import Database
+from voice_assistant.scheduler.reminders import ReminderDispatcher
 
 class TaskManager:
-    def __init__(self, db_path: str = "tasks.db"):
-        """Initialize task manager."""
-        self.db = Database(db_path)
-        self._stop_event = threading.Event()
-        self._reminder_thread = None
+    def __init__(self, db_url: str = "sqlite:///balancebuddy.db", db: Optional[Database] = None):
+        """Initialize task manager.
+
+        Args:
+            db_url: Database to open when ``db`` isn't given
+            db: The application's database, shared with its other components
+        """
+        self.db = db or Database(db_url)
+        # Sleeps until the next reminder is due; no polling
+        self.reminders = ReminderDispatcher(self.db, self._deliver_reminders)
 
     def start_reminder_checker(self):
-        """Start the reminder checking thread."""
-        if self._reminder_thread is None:
-            self._stop_event.clear()
-            self._reminder_thread = threading.Thread(target=self._check_reminders)
-            self._reminder_thread.daemon = True
-            self._reminder_thread.start()
+        """Start the reminder dispatcher thread."""
+        self.reminders.start()
 
     def stop_reminder_checker(self):
-        """Stop the reminder checking thread."""
-        if self._reminder_thread is not None:
-            self._stop_event.set()
-            self._reminder_thread.join()
-            self._reminder_thread = None
+        """Stop the reminder dispatcher thread."""
+        self.reminders.stop()
 
-    def _check_reminders(self):
-        """Check for due reminders periodically."""
-        while not self._stop_event.is_set():
-            due_reminders = self.db.get_due_reminders()
-            
-            for reminder in due_reminders:
-                self._show_notification(
-                    title="Task Reminder",
-                    message=f"Don't forget: {reminder['title']}"
-                )
-                self.db.mark_reminder_triggered(reminder['id'])
-            
-            # Sleep for 30 seconds before next check
-            time.sleep(30)
+    def _deliver_reminders(self, due_reminders: List[Dict[str, Any]]):
+        """Notify about reminders that just came due."""
+        for reminder in due_reminders:
+            self._show_notification(
+                title="Task Reminder",
+                message=f"Don't forget: {reminder['title']}"
+            )
 
+    @metrics.timed(metrics.STAGE_SECONDS, stage="notification")
     def _show_notification(self, title: str, message: str):
         """Show a system notification."""
         try:
+            from plyer import notification  # deferred: only needed when a reminder fires
             notification.notify(
                 title=title,
                 message=message,
@@ -61,13 +52,15 @@ class TaskManager:
         """Add a new task with optional reminder."""
         task_id = self.db.add_task(title, reminder_time)
         print(f"✅ Added task: {title}")
-        if reminder_time:
+        if reminder_time and task_id is not None:
+            self.reminders.schedule(task_id, title, reminder_time)
             print(f"⏰ Reminder set for: {reminder_time}")
         return task_id
 
     def complete_task(self, task_id: int) -> bool:
         """Mark a task as completed."""
         if self.db.complete_task(task_id):
+            self.reminders.cancel(task_id)
             print(f"✅ Marked task {task_id} as completed")
             return True
         print(f"❌ Task {task_id} not found")
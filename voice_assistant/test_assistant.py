@@ -1,22 +1,29 @@
 """Test script for the complete voice assistant flow."""
 import time
+from voice_assistant.audio.bus import CaptureBus
 from voice_assistant.wake_word.processor import WakeWordProcessor
 from voice_assistant.nlu.command_processor import CommandProcessor
 from voice_assistant.nlu.intent_recognizer import Intent
 
 class VoiceAssistant:
     def __init__(self):
+        # One microphone stream shared by wake word spotting and commands
+        self.capture_bus = CaptureBus()
+
         # Initialize command processor first (this will download model if needed)
         self.command_processor = CommandProcessor(
             on_command=self._handle_command,
             on_listening=self._on_listening,
-            on_processing=self._on_processing
+            on_processing=self._on_processing,
+            bus=self.capture_bus
         )
         
         # Initialize wake word detector
         self.wake_word_processor = WakeWordProcessor(
             wake_phrases=["hey buddy", "hey balance buddy", "okay buddy"],
-            callback=self._on_wake_word
+            callback=self._on_wake_word,
+            bus=self.capture_bus,
+            streaming=True
         )
         
         self.is_running = False
@@ -39,7 +46,8 @@ class VoiceAssistant:
                 
         print("\n⌨️  Press Ctrl+C to exit")
         
-        # Start wake word detection
+        # Open the microphone once, then start wake word detection
+        self.capture_bus.start()
         self.wake_word_processor.start()
         
         try:
@@ -54,6 +62,7 @@ class VoiceAssistant:
         self.is_running = False
         self.wake_word_processor.stop()
         self.command_processor.stop_listening()
+        self.capture_bus.stop()
         
     def _on_wake_word(self, audio_data):
         """Called when wake word is detected."""
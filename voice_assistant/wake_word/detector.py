@@ -1,12 +1,16 @@
 """Wake word detection using webrtcvad for Voice Activity Detection."""
 import webrtcvad
-import sounddevice as sd
-import queue
 import threading
 import time
+from contextlib import nullcontext
 from typing import Callable, Optional
 import numpy as np
 
+from voice_assistant import metrics
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.gate import EnergyGate
+from voice_assistant.audio.sources import AudioSource
+
 class WakeWordDetector:
     def __init__(
         self,
@@ -15,7 +19,8 @@ class WakeWordDetector:
         vad_mode: int = 3,  # 0-3, 3 is most aggressive
         silence_threshold: float = 0.3,  # seconds (reduced for faster response)
         min_speech_duration: float = 0.1,  # seconds (reduced for better detection)
-        gain_factor: float = 2.0,  # amplify quiet sounds
+        ring_frames: int = 64,  # ~2 s of buffered capture frames
+        energy_gate: bool = True,  # skip VAD/ASR on frames at the noise floor
     ):
         self.sample_rate = sample_rate
         self.frame_duration = frame_duration
@@ -23,8 +28,6 @@ class WakeWordDetector:
         self.vad = webrtcvad.Vad(vad_mode)
         self.silence_threshold = silence_threshold
         self.min_speech_duration = min_speech_duration
-        self.gain_factor = gain_factor
-        self.audio_queue = queue.Queue()
         self.is_listening = False
         self._stop_event = threading.Event()
         
@@ -33,114 +36,241 @@ class WakeWordDetector:
         self.last_debug_time = 0
         self.debug_interval = 1  # seconds
 
-    def start_listening(self, callback: Optional[Callable] = None):
-        """Start listening for wake word."""
+        # Normalization buffers are allocated once; this runs ~33 times a
+        # second forever, so it must not create arrays of its own
+        self.ring_frames = ring_frames
+        self.subscription = None
+        self._scratch = np.zeros(self.frame_length, dtype=np.float32)
+        self._vad_frame = np.zeros(self.frame_length, dtype=np.int16)
+
+        # Runs on the raw frames, before normalization can amplify the noise
+        self.gate = EnergyGate(self.frame_length, max_batch=ring_frames) if energy_gate else None
+        self.reset_stream()  # frames_processed is the stream position, in frames
+
+        # Looked up once; observing is then a bisect and a few increments
+        self._gate_time = metrics.stage_histogram("gate")
+        self._preprocess_time = metrics.stage_histogram("preprocess")
+        self._vad_time = metrics.stage_histogram("vad")
+        self._frames_total = metrics.registry.counter(
+            "balancebuddy_wake_frames_total", "Frames seen by the wake word detector", path="all")
+        self._frames_gated = metrics.registry.counter(
+            "balancebuddy_wake_frames_total", "Frames seen by the wake word detector", path="gated")
+
+    def start_listening(
+        self,
+        callback: Optional[Callable] = None,
+        source: Optional[AudioSource] = None,
+        bus: Optional[CaptureBus] = None,
+        frame_callback: Optional[Callable[[np.ndarray], None]] = None,
+        end_callback: Optional[Callable[[], None]] = None
+    ):
+        """Start listening for wake word.
+
+        Bursts and utterances can be consumed at the same time. A burst is cut
+        every ``min_speech_duration`` of speech; an utterance runs from the
+        first speech frame until ``silence_threshold`` of silence.
+
+        Args:
+            callback: Called with each voiced burst as an int16 array
+            frame_callback: Streaming mode; called with every frame of an
+                utterance, pauses included, as it arrives
+            end_callback: Streaming mode; called when an utterance ends
+            source: Where audio comes from; defaults to the microphone. Offline
+                sources (WAV, PCM, arrays) end the loop once exhausted.
+            bus: Shared capture bus to subscribe to instead of opening
+                ``source``; the bus stays open when listening stops.
+        """
         self.is_listening = True
         self._stop_event.clear()
+        self.reset_stream()
 
-        def audio_callback(indata, frames, time_info, status):
-            if status:
-                print(f"Error in audio stream: {status}")
-                return
-            
-            # Convert float32 to int16 for VAD
-            # Process audio data
-            audio_data = indata.flatten()
-            
-            # Calculate RMS and apply gain if needed
-            rms = np.sqrt(np.mean(audio_data**2))
-            if self.debug:
-                print(f"\rAudio level: {rms:.4f}", end="")
-            
-            # Apply gain if sound is quiet
-            if rms < 0.1:
-                audio_data = audio_data * self.gain_factor
-            
-            # Normalize to [-1, 1]
-            if np.max(np.abs(audio_data)) > 0:
-                audio_data = audio_data / np.max(np.abs(audio_data))
-            
-            # Convert to 16-bit integer
-            audio_data = (audio_data * 32767).astype(np.int16)
-            
-            # Debug audio level occasionally
-            if len(audio_data) > 0:
-                rms = np.sqrt(np.mean(audio_data.astype(np.float32)**2))
-                if rms > 2000:
-                    print(f"🎤 Sound level: {rms:.0f} RMS")
-            
-            self.audio_queue.put(audio_data)
-
-        # Start audio stream
-        with sd.InputStream(
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype=np.float32,
-            blocksize=self.frame_length,
-            device=None,  # Use default input device
-            callback=audio_callback
-        ):
-            print("🎤 Listening for wake word...")
-            speech_start_time = None
-            last_voice_time = time.time()
-            voice_frames = []
-            consecutive_speech_frames = 0
-            consecutive_silence_frames = 0
-            min_speech_frames = int(self.min_speech_duration * 1000 / self.frame_duration)
+        owns_bus = bus is None
+        if owns_bus:
+            bus = CaptureBus(
+                source,  # None opens the default microphone at its native format
+                sample_rate=self.sample_rate,
+                frame_duration=self.frame_duration
+            )
+        if bus.sample_rate != self.sample_rate or bus.frame_length != self.frame_length:
+            raise ValueError(
+                f"Audio must be {self.sample_rate} Hz in {self.frame_duration} ms frames, "
+                f"got {bus.sample_rate} Hz in {bus.frame_duration} ms frames"
+            )
+
+        self.subscription = subscription = bus.subscribe("wake_word", capacity=self.ring_frames)
+        if self._stop_event.is_set():  # stopped while subscribing
+            subscription.close()
 
+        with (bus if owns_bus else nullcontext()), subscription:
+            print("🎤 Listening for wake word...")
             while not self._stop_event.is_set():
                 try:
-                    audio_frame = self.audio_queue.get(timeout=0.1)  # Reduced timeout for responsiveness
-                    
-                    # Check if this frame contains speech
-                    try:
-                        is_speech = self.vad.is_speech(
-                            audio_frame.tobytes(),
-                            self.sample_rate
-                        )
-                    except Exception as e:
-                        print(f"VAD error: {e}")
+                    # Drain everything captured since the last pass in one go
+                    audio_frames = subscription.read_many(timeout=0.1)  # Reduced timeout for responsiveness
+                    if audio_frames is None:
+                        # Offline sources end the loop once fully consumed
+                        if subscription.finished:
+                            self.flush(callback, end_callback)
+                            break
                         continue
+                    self.process_frames(audio_frames, callback, frame_callback, end_callback)
 
-                    current_time = time.time()
-                    
-                    if is_speech:
-                        consecutive_silence_frames = 0
-                        consecutive_speech_frames += 1
-                        voice_frames.append(audio_frame)
-                        last_voice_time = current_time
-                        print(f"Speech frames: {consecutive_speech_frames}")
-                        
-                        # If we have enough continuous speech, process it
-                        if consecutive_speech_frames >= min_speech_frames:
-                            if callback and len(voice_frames) > 0:
-                                audio_data = np.concatenate(voice_frames)
-                                callback(audio_data)
-                            # Reset for next detection
-                            voice_frames = []
-                            consecutive_speech_frames = 0
-                            
-                    else:  # Not speech
-                        consecutive_speech_frames = max(0, consecutive_speech_frames - 0.5)  # Slower decrease
-                        consecutive_silence_frames += 1
-                        
-                        # If we have voice frames but hit silence threshold
-                        if voice_frames and (current_time - last_voice_time) > self.silence_threshold:
-                            if callback and len(voice_frames) > 0:
-                                audio_data = np.concatenate(voice_frames)
-                                callback(audio_data)
-                            # Reset for next detection
-                            voice_frames = []
-                            consecutive_speech_frames = 0
-
-                except queue.Empty:
-                    # Timeout is normal, just continue
-                    continue
                 except Exception as e:
                     print(f"❌ Error: {e}")
                     break
 
+        self.is_listening = False
+
+    def reset_stream(self):
+        """Forget all per-stream state before starting on a new stream."""
+        self.frames_processed = 0
+        if self.gate:
+            self.gate.reset()
+        # Time is measured on the stream clock so offline sources that
+        # run faster than real time see the same silence gaps as the mic
+        self._stream_time = 0.0
+        self._last_voice_time = 0.0
+        self._voice_frames = []
+        self._in_utterance = False
+        self._speech_frames = 0
+        self._silence_frames = 0
+
+    def process_frames(
+        self,
+        audio_frames: np.ndarray,
+        callback: Optional[Callable] = None,
+        frame_callback: Optional[Callable[[np.ndarray], None]] = None,
+        end_callback: Optional[Callable[[], None]] = None
+    ):
+        """Run VAD over consecutive int16 frames and fire the callbacks.
+
+        ``start_listening`` calls this for every batch it reads; callers that
+        schedule audio themselves, such as the multi-stream engine, call it
+        directly after ``reset_stream``.
+        """
+        frame_seconds = self.frame_duration / 1000
+        min_speech_frames = int(self.min_speech_duration * 1000 / self.frame_duration)
+
+        gate_open = None
+        if self.gate:
+            started = time.perf_counter()
+            gate_open = self.gate.process(audio_frames)
+            self._gate_time.observe(time.perf_counter() - started)
+            self._frames_gated.inc(len(gate_open) - int(np.count_nonzero(gate_open)))
+        self._frames_total.inc(len(audio_frames))
+
+        for index, raw_frame in enumerate(audio_frames):
+            audio_frame = self._vad_frame
+            if gate_open is None or gate_open[index]:
+                started = time.perf_counter()
+                self._preprocess(raw_frame, audio_frame)
+                preprocessed = time.perf_counter()
+
+                # Check if this frame contains speech
+                try:
+                    is_speech = self.vad.is_speech(
+                        audio_frame.tobytes(),
+                        self.sample_rate
+                    )
+                except Exception as e:
+                    print(f"VAD error: {e}")
+                    continue
+                self._preprocess_time.observe(preprocessed - started)
+                self._vad_time.observe(time.perf_counter() - preprocessed)
+                gated = False
+            else:
+                # Background noise: no VAD, and nothing to decode
+                is_speech = False
+                gated = True
+
+            self.frames_processed += 1
+            self._stream_time += frame_seconds
+            current_time = self._stream_time
+
+            self._in_utterance = self._in_utterance or is_speech
+            if frame_callback and self._in_utterance:
+                if gated:
+                    self.gate.asr_frames_saved += 1
+                else:
+                    frame_callback(audio_frame)
+
+            if is_speech:
+                self._silence_frames = 0
+                self._speech_frames += 1
+                self._voice_frames.append(audio_frame.copy())  # the buffer gets reused
+                self._last_voice_time = current_time
+                if self.debug:
+                    print(f"Speech frames: {self._speech_frames}")
+
+                # If we have enough continuous speech, process it
+                if self._speech_frames >= min_speech_frames:
+                    if callback and len(self._voice_frames) > 0:
+                        audio_data = np.concatenate(self._voice_frames)
+                        callback(audio_data)
+                    # Reset for next detection
+                    self._voice_frames = []
+                    self._speech_frames = 0
+
+            else:  # Not speech
+                self._speech_frames = max(0, self._speech_frames - 0.5)  # Slower decrease
+                self._silence_frames += 1
+
+                # If we have voice frames but hit silence threshold
+                if self._voice_frames and (current_time - self._last_voice_time) > self.silence_threshold:
+                    if callback and len(self._voice_frames) > 0:
+                        audio_data = np.concatenate(self._voice_frames)
+                        callback(audio_data)
+                    # Reset for next detection
+                    self._voice_frames = []
+                    self._speech_frames = 0
+
+                # Enough silence closes the utterance
+                if self._in_utterance and (current_time - self._last_voice_time) > self.silence_threshold:
+                    self._in_utterance = False
+                    if end_callback:
+                        end_callback()
+
+    def flush(
+        self,
+        callback: Optional[Callable] = None,
+        end_callback: Optional[Callable[[], None]] = None
+    ):
+        """Hand over whatever is pending when a stream ends."""
+        if callback and self._voice_frames:
+            callback(np.concatenate(self._voice_frames))
+        if end_callback and self._in_utterance:
+            end_callback()
+        self._voice_frames = []
+        self._in_utterance = False
+
+    def _preprocess(self, frame: np.ndarray, out: np.ndarray):
+        """Peak-normalize a raw int16 capture frame into an int16 VAD frame.
+
+        Works entirely in preallocated buffers. Quiet frames need no separate
+        gain: scaling to the peak already brings them up to full range.
+        """
+        samples = self._scratch
+        np.copyto(samples, frame)
+
+        peak = max(samples.max(), -samples.min())
+        if peak > 0:
+            np.multiply(samples, 32767 / peak, out=samples)
+        else:
+            samples.fill(0)
+
+        # Convert to 16-bit integer
+        np.copyto(out, samples, casting="unsafe")
+
+        if self.debug:
+            now = time.monotonic()
+            if now - self.last_debug_time >= self.debug_interval:
+                self.last_debug_time = now
+                rms = np.sqrt(np.dot(frame, frame.astype(np.float32)) / len(frame)) / 32768
+                print(f"\rAudio level: {rms:.4f}", end="")
+
     def stop_listening(self):
         """Stop listening for wake word."""
         self._stop_event.set()
+        if self.subscription is not None:
+            self.subscription.close()
         self.is_listening = False
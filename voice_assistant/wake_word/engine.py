@@ -0,0 +1,328 @@
+"""Wake word detection for many audio streams on one host.
+
+Each stream keeps its own ``WakeWordProcessor`` (detector, recognizer,
+cooldowns) inside one worker process, so VAD and decoder state never mix
+between streams. Workers are forked after the model is loaded and share it
+copy-on-write; there is one per core by default.
+
+Capture stays in the parent: every stream has its own ``CaptureBus``, and a
+dispatcher thread visits the streams round-robin, handing each at most
+``quantum_frames`` per turn with a bounded number of chunks in flight. A busy
+stream therefore can't starve the others; its backlog waits in its own ring.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from voice_assistant.asr.models import (
+    DEFAULT_MODEL, DEFAULT_SPOTTING_MODEL, default_model_path, registry
+)
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.sources import AudioSource
+from voice_assistant.metrics import summarize
+
+
+def create_processor(config: dict):
+    """Default processor factory: a quiet ``WakeWordProcessor`` for one stream."""
+    from voice_assistant.wake_word.processor import WakeWordProcessor
+
+    processor = WakeWordProcessor(
+        wake_phrases=config["wake_phrases"],
+        sample_rate=config["sample_rate"],
+        model_path=config["model_path"],
+        use_grammar=config["use_grammar"],
+        streaming=config["streaming"]
+    )
+    processor.detector.debug = False
+    return processor
+
+
+def _worker_main(config: dict, factory: Callable[[dict], Any], inbox, outbox):
+    """Worker process: owns the processors of the streams assigned to it."""
+    processors = {}
+
+    def create(stream_id: str):
+        processor = factory(config)
+        frame_seconds = processor.detector.frame_duration / 1000
+        processor.callback = lambda audio_data: outbox.put((
+            "detection", stream_id,
+            processor.detector.frames_processed * frame_seconds,
+            time.monotonic()
+        ))
+        return processor
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        kind, stream_id = message[0], message[1]
+        try:
+            if kind == "frames":
+                frames, queued_at = message[2], message[3]
+                processor = processors.get(stream_id)
+                if processor is None:
+                    processor = processors[stream_id] = create(stream_id)
+                started = time.monotonic()
+                processor.process_frames(frames)
+                outbox.put(("done", stream_id, len(frames), queued_at, started, time.monotonic()))
+            elif kind == "end":
+                processor = processors.pop(stream_id, None)
+                if processor is not None:
+                    processor.finish_stream()
+                outbox.put(("ended", stream_id))
+        except Exception as e:
+            print(f"❌ Error in stream {stream_id}: {e}")
+            processors.pop(stream_id, None)
+            outbox.put(("ended", stream_id))
+
+
+class _Stream:
+    """Parent-side bookkeeping for one stream."""
+
+    def __init__(self, stream_id: str, bus: CaptureBus, worker: int, history: int):
+        self.stream_id = stream_id
+        self.bus = bus
+        self.subscription = bus.subscribe("engine", capacity=256)
+        self.worker = worker
+        # Written by one thread each, so no lock is needed
+        self.chunks_sent = 0
+        self.chunks_done = 0
+        self.frames = 0
+        self.ending = False
+        self.ended = threading.Event()
+        self.detections: List[float] = []
+        # Recent chunks only, so stats stay cheap on long runs
+        self.latency = deque(maxlen=history)  # dispatch to result
+        self.queue_wait = deque(maxlen=history)
+        self.compute = deque(maxlen=history)
+
+
+class WakeWordEngine:
+    """Schedules wake word detection for N streams across a process pool.
+
+    Args:
+        wake_phrases: Phrases that wake the assistant, shared by all streams
+        callback: Called as ``callback(stream_id, stream_offset_s)`` on a
+            confirmed detection, from the engine's result thread
+        model_path: Vosk model directory; downloaded if not provided
+        workers: Worker processes; defaults to the number of cores
+        quantum_frames: Most frames a stream gets per scheduling turn
+        max_in_flight: Chunks per stream queued at its worker at once
+        processor_factory: Builds a stream's processor inside its worker from
+            the engine config; anything with ``process_frames``,
+            ``finish_stream``, a ``callback`` and a ``detector`` tracking
+            ``frames_processed`` works. Defaults to ``create_processor``.
+    """
+
+    def __init__(
+        self,
+        wake_phrases: Optional[List[str]] = None,
+        callback: Optional[Callable[[str, float], None]] = None,
+        sample_rate: int = 16000,
+        model_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        use_grammar: bool = True,
+        streaming: bool = True,
+        quantum_frames: int = 8,
+        max_in_flight: int = 2,
+        stats_history: int = 1000,
+        processor_factory: Optional[Callable[[dict], Any]] = None,
+    ):
+        self.processor_factory = processor_factory or create_processor
+        if model_path is None and self.processor_factory is create_processor:
+            model_path = default_model_path(DEFAULT_SPOTTING_MODEL if use_grammar else DEFAULT_MODEL)
+        self.config = {
+            "wake_phrases": wake_phrases or ["hey buddy"],
+            "sample_rate": sample_rate,
+            "model_path": model_path,
+            "use_grammar": use_grammar,
+            "streaming": streaming,
+        }
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.num_workers = workers or os.cpu_count() or 1
+        self.quantum_frames = quantum_frames
+        self.max_in_flight = max_in_flight
+        self.stats_history = stats_history
+
+        self._streams: Dict[str, _Stream] = {}
+        self._lock = threading.Lock()
+        self._work_ready = threading.Event()
+        self._workers = []
+        self._inboxes = []
+        self._outbox = None
+        self._threads = []
+        self.is_running = False
+
+    def start(self):
+        if self.is_running:
+            return
+        if "fork" in multiprocessing.get_all_start_methods():
+            if self.processor_factory is create_processor:
+                # Children inherit the loaded model instead of each reading a copy
+                registry.preload([self.config["model_path"]])
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+
+        self._outbox = context.Queue()
+        for _ in range(self.num_workers):
+            inbox = context.Queue()
+            worker = context.Process(
+                target=_worker_main,
+                args=(self.config, self.processor_factory, inbox, self._outbox),
+                daemon=True
+            )
+            worker.start()
+            self._inboxes.append(inbox)
+            self._workers.append(worker)
+
+        self.is_running = True
+        self._threads = [
+            threading.Thread(target=self._dispatch, daemon=True),
+            threading.Thread(target=self._collect, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        print(f"🚀 Wake word engine running {self.num_workers} workers")
+
+    def stop(self):
+        if not self.is_running:
+            return
+        self.is_running = False
+        self._work_ready.set()
+        for stream_id in list(self._streams):
+            self.remove_stream(stream_id)
+        for inbox in self._inboxes:
+            inbox.put(None)
+        self._outbox.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers, self._inboxes, self._threads = [], [], []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def add_stream(self, stream_id: str, source: AudioSource) -> CaptureBus:
+        """Start detecting on ``source``; it is opened on its own capture bus."""
+        # Any rate or channel count; the bus resamples to the engine's format
+        bus = CaptureBus(source, sample_rate=self.sample_rate, name=stream_id)
+        with self._lock:
+            if stream_id in self._streams:
+                raise ValueError(f"Stream already exists: {stream_id}")
+            # Pin to the least loaded worker; its state lives there for good
+            load = [0] * self.num_workers
+            for stream in self._streams.values():
+                load[stream.worker] += 1
+            worker = load.index(min(load))
+            self._streams[stream_id] = _Stream(stream_id, bus, worker, self.stats_history)
+        bus.start()
+        self._work_ready.set()
+        return bus
+
+    def remove_stream(self, stream_id: str):
+        """Stop capturing a stream and drop its state in the worker."""
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return
+        stream.subscription.close()
+        stream.bus.stop()
+        if self._inboxes and not stream.ending:
+            self._inboxes[stream.worker].put(("end", stream_id))
+        stream.ended.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every offline stream has been fully processed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for stream in list(self._streams.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not stream.ended.wait(remaining):
+                return False
+        return True
+
+    def _dispatch(self):
+        """Round-robin over the streams, a bounded chunk at a time."""
+        while self.is_running:
+            sent = False
+            with self._lock:
+                streams = list(self._streams.values())
+            for stream in streams:
+                in_flight = stream.chunks_sent - stream.chunks_done
+                if stream.ending or in_flight >= self.max_in_flight:
+                    continue
+                frames = stream.subscription.read_many(max_frames=self.quantum_frames, timeout=0)
+                if frames is not None:
+                    # Ring frames are views; the worker needs its own copy
+                    chunk = np.array(frames)
+                    stream.chunks_sent += 1
+                    self._inboxes[stream.worker].put(("frames", stream.stream_id, chunk, time.monotonic()))
+                    sent = True
+                elif stream.subscription.finished:
+                    stream.ending = True
+                    self._inboxes[stream.worker].put(("end", stream.stream_id))
+            if not sent:
+                self._work_ready.wait(0.005)
+                self._work_ready.clear()
+
+    def _collect(self):
+        """Apply worker results: latency samples, detections, stream ends."""
+        while True:
+            try:
+                message = self._outbox.get(timeout=0.5)
+            except queue.Empty:
+                if not self.is_running:
+                    break
+                continue
+            if message is None:
+                break
+            kind, stream_id = message[0], message[1]
+            stream = self._streams.get(stream_id)
+            if kind == "done":
+                frames, queued_at, started, finished = message[2:]
+                if stream is not None:
+                    stream.chunks_done += 1
+                    stream.frames += frames
+                    stream.latency.append(finished - queued_at)
+                    stream.queue_wait.append(started - queued_at)
+                    stream.compute.append(finished - started)
+                self._work_ready.set()
+            elif kind == "detection":
+                offset = message[2]
+                if stream is not None:
+                    stream.detections.append(offset)
+                print(f"\n🎯 Wake word on stream {stream_id} at {offset:.2f} s")
+                if self.callback:
+                    self.callback(stream_id, offset)
+            elif kind == "ended" and stream is not None:
+                stream.ended.set()
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-stream frame counts, detections and latency percentiles."""
+        report = {}
+        for stream_id, stream in list(self._streams.items()):
+            report[stream_id] = {
+                "worker": stream.worker,
+                "frames": stream.frames,
+                "audio_s": stream.frames * stream.bus.frame_duration / 1000,
+                "dropped": stream.subscription.ring.dropped,
+                "detections": list(stream.detections),
+                "latency": summarize(stream.latency),
+                "queue_wait": summarize(stream.queue_wait),
+                "compute": summarize(stream.compute),
+            }
+        return report
@@ -0,0 +1,155 @@
+"""Matching transcripts against many wake phrases at once.
+
+All phrase variants are compiled into one token trie, so a transcript is
+scanned once per start word however many phrases are configured. Matching
+works on whole words: "body" no longer fires inside "somebody".
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Common ways the recognizer mishears wake words
+WORD_VARIATIONS = {
+    'hey': ['hi', 'hello', 'hay'],
+    'hello': ['hey', 'hi', 'helo'],
+    'hi': ['hey', 'hello'],
+    'buddy': ['buddie', 'budi', 'body']
+}
+
+_PHRASE = ""  # trie key holding the phrase that ends at a node; words are never empty
+
+
+def expand_wake_phrases(wake_phrases: Iterable[str]) -> List[str]:
+    """Wake phrases plus their spaceless, key word and misheard variants.
+
+    Each variant appears once, in the order it was first produced, even when
+    several phrases expand to the same text.
+    """
+    expanded = {}  # insertion-ordered set
+    for phrase in wake_phrases:
+        words = phrase.lower().split()
+        if not words:
+            continue
+        expanded[" ".join(words)] = None
+
+        # Variant without spaces
+        expanded["".join(words)] = None
+
+        if len(words) > 1:
+            # Just the key word (e.g. 'buddy')
+            expanded[words[-1]] = None
+
+            # First and last words (e.g. 'hey buddy')
+            if len(words) > 2:
+                expanded[f"{words[0]} {words[-1]}"] = None
+
+            # Swap in known mishearings, one word at a time
+            for i, word in enumerate(words):
+                for variant in WORD_VARIATIONS.get(word, ()):
+                    expanded[" ".join(words[:i] + [variant] + words[i + 1:])] = None
+    return list(expanded)
+
+
+class WakePhraseMatcher:
+    """Finds wake phrases in a transcript, exactly or within one word.
+
+    Args:
+        primary_phrases: The configured wake phrases
+        variants: Every phrase that counts as a hit anywhere in the transcript,
+            usually ``expand_wake_phrases(primary_phrases)``
+    """
+
+    def __init__(self, primary_phrases: Iterable[str], variants: Iterable[str]):
+        self.primary_phrases = {" ".join(p.lower().split()) for p in primary_phrases}
+        self.primary_phrases.discard("")
+
+        self._trie: Dict[str, dict] = {}
+        for variant in variants:
+            words = variant.lower().split()
+            if not words:
+                continue
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node.setdefault(_PHRASE, " ".join(words))
+
+        # Word-level edit distance 1 against the primary phrases, as hash
+        # lookups: phrases by their words, phrases with one word deleted, and
+        # phrases with one word deleted at a known position (substitution)
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        self._deletions: Dict[Tuple[str, ...], str] = {}
+        self._substitutions: Dict[Tuple[int, Tuple[str, ...]], str] = {}
+        for phrase in sorted(self.primary_phrases):
+            words = tuple(phrase.split())
+            self._phrases.setdefault(words, phrase)
+            if len(words) < 2:
+                continue  # a single word has to match exactly
+            for j in range(len(words)):
+                rest = words[:j] + words[j + 1:]
+                self._deletions.setdefault(rest, phrase)
+                self._substitutions.setdefault((j, rest), phrase)
+        self._lengths = sorted({len(words) for words in self._phrases})
+        self._vocabulary = {word for words in self._phrases for word in words}
+
+    def find_exact(self, text: str) -> Optional[str]:
+        """The primary phrase the whole transcript equals, if any."""
+        return text if text in self.primary_phrases else None
+
+    def find_variant(self, words: List[str]) -> Optional[str]:
+        """The first variant occurring as whole words, scanning left to right."""
+        trie = self._trie
+        for start in range(len(words)):
+            node = trie
+            for word in words[start:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                phrase = node.get(_PHRASE)
+                if phrase is not None:
+                    return phrase
+        return None
+
+    def find_close(self, words: List[str]) -> Optional[str]:
+        """A primary phrase within one inserted, deleted or substituted word."""
+        if self._vocabulary.isdisjoint(words):
+            return None  # the usual case for background chatter
+        count = len(words)
+        for start in range(count):
+            for length in self._lengths:
+                # One word of the phrase is missing from the transcript
+                if length > 1 and start + length - 1 <= count:
+                    phrase = self._deletions.get(tuple(words[start:start + length - 1]))
+                    if phrase is not None:
+                        return phrase
+                if start + length <= count:
+                    window = tuple(words[start:start + length])
+                    if length > 1:
+                        # One word of the phrase was heard as another
+                        for j in range(length):
+                            phrase = self._substitutions.get((j, window[:j] + window[j + 1:]))
+                            if phrase is not None:
+                                return phrase
+                if start + length + 1 <= count:
+                    # One extra word inside the phrase
+                    window = tuple(words[start:start + length + 1])
+                    for j in range(1, length):
+                        phrase = self._phrases.get(window[:j] + window[j + 1:])
+                        if phrase is not None:
+                            return phrase
+        return None
+
+    def match(self, text: str, allow_close: bool = True) -> Optional[Tuple[str, str]]:
+        """Check a transcript; returns ``(kind, phrase)`` for a hit.
+
+        ``kind`` is "exact", "variant" or "close".
+        """
+        phrase = self.find_exact(text)
+        if phrase is not None:
+            return "exact", phrase
+        words = text.split()
+        phrase = self.find_variant(words)
+        if phrase is not None:
+            return "variant", phrase
+        if allow_close:
+            phrase = self.find_close(words)
+            if phrase is not None:
+                return "close", phrase
+        return None
@@ -3,6 +3,9 @@ import threading
 import time
 import numpy as np
 from typing import Callable, Optional, List
+from voice_assistant import metrics
+from voice_assistant.audio.bus import CaptureBus
+from voice_assistant.audio.sources import AudioSource
 from voice_assistant.wake_word.detector import WakeWordDetector
 from voice_assistant.wake_word.recognizer import WakeWordRecognizer
 
@@ -12,7 +15,11 @@ class WakeWordProcessor:
         wake_phrases: List[str] = ["hey buddy"],
         callback: Optional[Callable] = None,
         sample_rate: int = 16000,
-        model_path: Optional[str] = None
+        model_path: Optional[str] = None,
+        source: Optional[AudioSource] = None,
+        use_grammar: bool = True,
+        bus: Optional[CaptureBus] = None,
+        streaming: bool = False
     ):
         if isinstance(wake_phrases, str):
             wake_phrases = [wake_phrases]
@@ -20,6 +27,11 @@ class WakeWordProcessor:
         self.wake_phrases = [phrase.lower() for phrase in wake_phrases]
         self.callback = callback
         self.sample_rate = sample_rate
+        self.source = source  # None means the default microphone
+        self.bus = bus  # shared capture bus, takes precedence over source
+        # Streaming decodes each utterance incrementally with one recognizer
+        # instead of decoding every burst from a cold state
+        self.streaming = streaming
         
         # Initialize components
         self.detector = WakeWordDetector(sample_rate=sample_rate)
@@ -38,7 +50,8 @@ class WakeWordProcessor:
         self.recognizer = WakeWordRecognizer(
             wake_phrases=self.wake_phrases,
             model_path=model_path,
-            sample_rate=sample_rate
+            sample_rate=sample_rate,
+            use_grammar=use_grammar
         )
         
         self.detection_thread = None
@@ -46,7 +59,13 @@ class WakeWordProcessor:
         self.last_detection_time = 0
         self.detection_cooldown = 1.0  # reduced cooldown between detections
         self.consecutive_detections = 0
-        self.max_consecutive_detections = 2  # reduced number of detections needed
+        # Bursts split one phrase into pieces that each may match, so burst
+        # mode asks for two hits; a streamed utterance yields at most one
+        self.max_consecutive_detections = 1 if streaming else 2
+
+        self._asr_time = metrics.stage_histogram("wake_asr")
+        self._detections = metrics.registry.counter(
+            "balancebuddy_wake_detections_total", "Confirmed wake word detections")
 
     def start(self):
         if self.is_active:
@@ -72,30 +91,83 @@ class WakeWordProcessor:
 
     def _run_detection(self):
         """Run the wake word detection loop."""
-        def on_voice_detected(audio_data: np.ndarray):
-            current_time = time.time()
-            
-            if current_time - self.last_detection_time < self.detection_cooldown:
-                return
-            
-            if self.recognizer.accept_waveform(audio_data):
-                if current_time - self.last_detection_time > self.detection_cooldown * 2:
-                    self.consecutive_detections = 0
-                
-                self.consecutive_detections += 1
-                print(f"\n🎯 Wake word detection {self.consecutive_detections}/{self.max_consecutive_detections}")
-                
-                if self.consecutive_detections >= self.max_consecutive_detections:
-                    print("\n🎙️ Wake word confirmed! Listening for command...")
-                    if self.callback:
-                        self.callback()
-                    self.consecutive_detections = 0
-                
-                self.last_detection_time = current_time
-                
+        if self.streaming:
+            self.recognizer.reset()
+        self.detector.start_listening(
+            source=self.source,
+            bus=self.bus,
+            **self._detector_callbacks()
+        )
+
+    def _detector_callbacks(self) -> dict:
+        if self.streaming:
+            # Feed utterances frame by frame into one long-lived recognizer
+            return {"frame_callback": self._on_frame, "end_callback": self._on_utterance_end}
+        return {"callback": self._on_voice_detected}
+
+    def process_frames(self, frames: np.ndarray):
+        """Run detection on frames pushed by the caller instead of a source.
+
+        Used by the multi-stream engine, which owns the audio and schedules
+        many processors itself.
+        """
+        self.detector.process_frames(frames, **self._detector_callbacks())
+
+    def finish_stream(self):
+        """Flush the pending burst or utterance once pushed audio ends."""
+        callbacks = self._detector_callbacks()
+        self.detector.flush(callbacks.get("callback"), callbacks.get("end_callback"))
+        self.detector.reset_stream()
+        self.recognizer.reset()
+
+    def _on_voice_detected(self, audio_data: np.ndarray):
+        current_time = time.time()
+
+        if current_time - self.last_detection_time < self.detection_cooldown:
+            return
+
+        with self._asr_time.time():
+            detected = self.recognizer.accept_waveform(audio_data)
+        if detected:
+            self._on_detection(audio_data, current_time)
+
+        self.recognizer.reset()
+
+    def _on_frame(self, frame: np.ndarray):
+        current_time = time.time()
+        if current_time - self.last_detection_time < self.detection_cooldown:
+            return
+        with self._asr_time.time():
+            detected = self.recognizer.accept_frame(frame)
+        if detected:
+            self._on_detection(frame, current_time)
+            # Don't detect the same phrase again from later partials
             self.recognizer.reset()
 
-        self.detector.start_listening(callback=on_voice_detected)
+    def _on_utterance_end(self):
+        current_time = time.time()
+        with self._asr_time.time():
+            detected = self.recognizer.end_utterance()
+        if detected:
+            if current_time - self.last_detection_time >= self.detection_cooldown:
+                self._on_detection(None, current_time)
+
+    def _on_detection(self, audio_data: Optional[np.ndarray], current_time: float):
+        """Count a wake word hit and fire the callback once confirmed."""
+        if current_time - self.last_detection_time > self.detection_cooldown * 2:
+            self.consecutive_detections = 0
+        
+        self.consecutive_detections += 1
+        print(f"\n🎯 Wake word detection {self.consecutive_detections}/{self.max_consecutive_detections}")
+        
+        if self.consecutive_detections >= self.max_consecutive_detections:
+            print("\n🎙️ Wake word confirmed! Listening for command...")
+            self._detections.inc()
+            if self.callback:
+                self.callback(audio_data)
+            self.consecutive_detections = 0
+        
+        self.last_detection_time = current_time
 
     def __enter__(self):
         self.start()
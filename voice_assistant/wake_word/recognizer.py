@@ -1,117 +1,104 @@
 """Wake word recognition using Vosk for offline speech recognition."""
-from vosk import Model, KaldiRecognizer
 import json
 import numpy as np
 from pathlib import Path
 import os
 
+from voice_assistant.asr.models import (
+    DEFAULT_MODEL, DEFAULT_SPOTTING_MODEL, default_model_path, get_model, new_recognizer
+)
+from voice_assistant.wake_word.matcher import WakePhraseMatcher, expand_wake_phrases
+
+# Garbage token that absorbs everything outside the wake grammar
+GARBAGE_TOKEN = "[unk]"
+
+# Mishearings that are everyday words themselves. Transcripts containing them
+# still match, but in a grammar they would let ordinary speech ("hey, body
+# scan") decode as a wake phrase
+GRAMMAR_EXCLUDED_WORDS = {"body"}
+
 class WakeWordRecognizer:
     def __init__(
         self,
         wake_phrases: list[str] = ["hey buddy"],
         model_path: str = None,
-        sample_rate: int = 16000
+        sample_rate: int = 16000,
+        use_grammar: bool = True
     ):
+        """Set up wake phrase spotting.
+
+        Args:
+            wake_phrases: Phrases that wake the assistant
+            model_path: Vosk model directory; downloaded if not provided
+            sample_rate: Audio sample rate in Hz
+            use_grammar: Restrict decoding to the wake phrase variants plus a
+                garbage token instead of running the full vocabulary
+        """
         # Download small model if not provided
         if model_path is None:
-            model_path = self._get_default_model()
+            model_path = self._get_default_model(
+                DEFAULT_SPOTTING_MODEL if use_grammar else DEFAULT_MODEL
+            )
             
         try:
             if not os.path.exists(model_path):
                 raise ValueError(f"Model path does not exist: {model_path}")
                 
-            print("🎯 Loading speech recognition model...")
-            self.model = Model(model_path)
-            self.recognizer = KaldiRecognizer(self.model, sample_rate)
-            print("✅ Model loaded successfully!\n")
+            # Shared with every other component using the same model
+            self.model = get_model(model_path)
             
         except Exception as e:
             print(f"\n❌ Error loading model: {e}")
             print("Please ensure the model is downloaded correctly.")
             raise
         # Make wake phrases more flexible
-        self.wake_phrases = []
-        self.primary_phrases = [phrase.lower() for phrase in wake_phrases]
-        
-        for phrase in wake_phrases:
-            phrase = phrase.lower()
-            self.wake_phrases.append(phrase)
-            
-            # Add variants without spaces
-            self.wake_phrases.append(phrase.replace(" ", ""))
-            
-            # Add common variations
-            words = phrase.split()
-            if len(words) > 1:
-                # Just the key words (e.g. 'buddy')
-                self.wake_phrases.append(words[-1])
-                
-                # First and last words (e.g. 'hey buddy')
-                if len(words) > 2:
-                    self.wake_phrases.append(f"{words[0]} {words[-1]}")
-                    
-                # Handle common word variations
-                variations = {
-                    'hey': ['hi', 'hello', 'hay'],
-                    'hello': ['hey', 'hi', 'helo'],
-                    'hi': ['hey', 'hello'],
-                    'buddy': ['buddie', 'budi', 'body']
-                }
-                
-                # Add variations of first and last words
-                for i, word in enumerate(words):
-                    if word in variations:
-                        for variant in variations[word]:
-                            variant_phrase = list(words)
-                            variant_phrase[i] = variant
-                            self.wake_phrases.append(' '.join(variant_phrase))
-        
-        # Remove duplicates while preserving order
-        self.wake_phrases = list(dict.fromkeys(self.wake_phrases))
+        self.primary_phrases = [" ".join(phrase.lower().split()) for phrase in wake_phrases]
+        self.wake_phrases = expand_wake_phrases(wake_phrases)
+        self.matcher = WakePhraseMatcher(self.primary_phrases, self.wake_phrases)
         print("Available wake phrases and variations:")
         for phrase in self.wake_phrases:
             print(f"  - {phrase}")
+
+        self.grammar = None
+        if use_grammar:
+            if self._supports_grammar(model_path):
+                self.grammar = self._build_grammar(model_path)
+            else:
+                print("⚠️  Model has no runtime grammar support, spotting with the full vocabulary")
+        self.use_grammar = self.grammar is not None
+
+        self.recognizer = new_recognizer(
+            model_path,
+            sample_rate,
+            json.dumps(self.grammar) if self.use_grammar else None
+        )
+        self._last_partial = ""
+
+    @staticmethod
+    def _supports_grammar(model_path: str) -> bool:
+        """Only models shipping a lookahead graph accept a runtime grammar.
+
+        Large models such as vosk-model-en-us-0.22 use a static HCLG graph;
+        Vosk silently ignores a grammar passed to them.
+        """
+        graph = Path(model_path) / "graph"
+        return (graph / "HCLr.fst").exists() and (graph / "Gr.fst").exists()
+
+    def _build_grammar(self, model_path: str) -> list[str]:
+        """Wake phrase variants the model can spell, plus the garbage token."""
+        phrases = [p for p in self.wake_phrases if GRAMMAR_EXCLUDED_WORDS.isdisjoint(p.split())]
+        words_file = Path(model_path) / "graph" / "words.txt"
+        if words_file.exists():
+            # A phrase with an out-of-vocabulary word would otherwise be
+            # truncated by Vosk into something looser, e.g. just "hey"
+            with open(words_file, encoding="utf-8") as f:
+                vocabulary = {line.split()[0] for line in f if line.strip()}
+            phrases = [p for p in phrases if all(w in vocabulary for w in p.split())]
+        return phrases + [GARBAGE_TOKEN]
         
-    def _get_default_model(self) -> str:
-        """Download and return path to the default small Vosk model."""
-        import urllib.request
-        import zipfile
-        import sys
-        
-        model_dir = Path.home() / ".cache" / "vosk"
-        model_path = model_dir / "vosk-model-en-us-0.22"
-        
-        if not model_path.exists():
-            print("\n📥 Downloading Vosk speech recognition model...")
-            print("This may take a few minutes depending on your internet speed.")
-            model_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Download and extract model
-            model_url = "https://alphacephei.com/vosk/models/vosk-model-en-us-0.22.zip"
-            zip_path = model_dir / "model.zip"
-            
-            try:
-                # Show download progress
-                def progress(count, block_size, total_size):
-                    percent = int(count * block_size * 100 / total_size)
-                    sys.stdout.write(f"\rDownloading: {percent}% [{percent * '=' + (100-percent) * ' '}]")
-                    sys.stdout.flush()
-                
-                urllib.request.urlretrieve(model_url, zip_path, reporthook=progress)
-                print("\n\n📦 Extracting model...")
-                
-                with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                    zip_ref.extractall(model_dir)
-                    
-                zip_path.unlink()  # Remove zip file
-                print("✅ Model ready!\n")
-                
-            except Exception as e:
-                print(f"\n❌ Error downloading model: {e}")
-                print("Please check your internet connection and try again.")
-                raise
-            
-        return str(model_path)
+    def _get_default_model(self, model_name: str = DEFAULT_MODEL) -> str:
+        """Download and return path to a default Vosk model."""
+        return default_model_path(model_name)
         
     def accept_waveform(self, audio_data: np.ndarray) -> bool:
         """Process audio data and check for wake word.
@@ -127,32 +114,12 @@ class WakeWordRecognizer:
         
         # Process the audio
         if self.recognizer.AcceptWaveform(audio_bytes):
-            result = json.loads(self.recognizer.Result())
-            text = result.get("text", "").lower().strip()
+            text = self._clean_text(json.loads(self.recognizer.Result()).get("text", ""))
             
             if text:  # Only print if we got some text
                 print(f"\n🎙️ Heard: {text}")
-            
-                # First check primary phrases with exact match
-                for phrase in self.primary_phrases:
-                    if phrase == text:
-                        print(f"✅ Found exact wake phrase: {phrase}")
-                        return True
-                
-                # Then check all variations with partial match
-                for phrase in self.wake_phrases:
-                    if phrase in text:
-                        print(f"✅ Found wake phrase variation: {phrase}")
-                        return True
-                        
-                # Check for close matches (allow one word to be different)
-                text_words = set(text.split())
-                for phrase in self.primary_phrases:
-                    phrase_words = set(phrase.split())
-                    common_words = text_words & phrase_words
-                    if len(common_words) >= max(len(phrase_words) - 1, 1):
-                        print(f"✅ Found close match to wake phrase: {phrase}")
-                        return True
+                if self._matches(text):
+                    return True
         
         # Also check partial results for debugging
         partial = json.loads(self.recognizer.PartialResult())
@@ -161,7 +128,69 @@ class WakeWordRecognizer:
             print(f"\r🔊 Listening: {partial_text}", end="")
             
         return False
-        
+
+    def accept_frame(self, frame: np.ndarray) -> bool:
+        """Feed the next frame of an ongoing utterance (streaming mode).
+
+        The recognizer keeps its state between frames, so an utterance is
+        decoded once, incrementally. Partial results are checked as they
+        change, which spots the wake phrase before the utterance ends.
+
+        Returns:
+            bool: True if wake word detected
+        """
+        if self.recognizer.AcceptWaveform(frame.tobytes()):
+            # Vosk found an endpoint inside the utterance
+            self._last_partial = ""
+            text = self._clean_text(json.loads(self.recognizer.Result()).get("text", ""))
+            if text:
+                print(f"\n🎙️ Heard: {text}")
+                return self._matches(text)
+            return False
+
+        partial = self._clean_text(json.loads(self.recognizer.PartialResult()).get("partial", ""))
+        if not partial or partial == self._last_partial:
+            return False
+        self._last_partial = partial
+        print(f"\r🔊 Listening: {partial}", end="")
+        # Partials are still changing, so only accept clear phrase matches
+        return self._matches(partial, allow_close=False)
+
+    def end_utterance(self) -> bool:
+        """Finish the current utterance and reset for the next one.
+
+        Returns:
+            bool: True if the final transcript contains the wake word
+        """
+        text = self._clean_text(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        self.reset()
+        if not text:
+            return False
+        print(f"\n🎙️ Heard: {text}")
+        return self._matches(text)
+
+    def _clean_text(self, text: str) -> str:
+        text = text.lower().strip()
+        if self.use_grammar:
+            # Drop garbage tokens so only grammar words are matched
+            text = " ".join(w for w in text.split() if w != GARBAGE_TOKEN)
+        return text
+
+    def _matches(self, text: str, allow_close: bool = True) -> bool:
+        """Check a transcript against the wake phrases."""
+        match = self.matcher.match(text, allow_close)
+        if match is None:
+            return False
+        kind, phrase = match
+        if kind == "exact":
+            print(f"✅ Found exact wake phrase: {phrase}")
+        elif kind == "variant":
+            print(f"✅ Found wake phrase variation: {phrase}")
+        else:
+            print(f"✅ Found close match to wake phrase: {phrase}")
+        return True
+
     def reset(self):
         """Reset the recognizer state."""
         self.recognizer.Reset()
+        self._last_partial = ""